@@ -0,0 +1,218 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Event, Ticket, User
+
+# Una ruta empeoró si su p95 o su memoria superan la línea base en más de esta proporción
+REGRESSION_THRESHOLD = 0.2
+# Diferencias de latencia por debajo de este valor se consideran ruido
+MIN_LATENCY_DELTA_MS = 1.0
+# Eventos distintos sobre los que se reparten los pedidos de cada ruta
+SAMPLE_EVENTS = 10
+# Segundos máximos de medición por ruta: las rutas muy lentas se miden con menos pedidos
+TIME_BUDGET = 30
+
+
+class Route:
+    """Pedido a medir: nombre, método, rol del usuario y cómo armar la URL y los datos."""
+
+    def __init__(self, name, method, role, url, data=None):
+        self.name = name
+        self.method = method
+        self.role = role
+        self.url = url
+        self.data = data
+
+
+def purchase_data(context, i):
+    return {
+        "quantity": 1,
+        "type": "general",
+        "card_number": "4111111111111111",
+        "card_expiry": "12/30",
+        "card_cvv": "123",
+        "card_name": "Benchmark",
+    }
+
+
+def event_id(context, i):
+    return context["events"][i % len(context["events"])]
+
+
+ROUTES = [
+    Route("events", "get", "buyer", lambda context, i: reverse("events")),
+    Route("events_organizer", "get", "organizer", lambda context, i: reverse("events")),
+    Route("event_detail", "get", "buyer", lambda context, i: reverse("event_detail", args=[event_id(context, i)])),
+    Route("ticket_compra_get", "get", "buyer",
+          lambda context, i: reverse("ticket_compra", args=[event_id(context, i)])),
+    Route("ticket_compra_post", "post", "buyer",
+          lambda context, i: reverse("ticket_compra", args=[event_id(context, i)]), data=purchase_data),
+    Route("mis_tickets", "get", "buyer", lambda context, i: reverse("Mis_tickets")),
+    Route("event_tickets", "get", "organizer", lambda context, i: reverse("tickets", args=[event_id(context, i)])),
+    Route("user_notifications", "get", "buyer", lambda context, i: reverse("user_notifications")),
+    Route("refound_admin", "get", "organizer", lambda context, i: reverse("refound_admin")),
+    Route("categorias", "get", "buyer", lambda context, i: reverse("categorias")),
+]
+
+
+def build_context(prefix="perf"):
+    """
+    Elige los actores sobre los datos de seed_perf: el primer comprador, el organizador con
+    más eventos y los próximos eventos más vendidos en los que el comprador aún no compró.
+    """
+    try:
+        buyer = User.objects.get(username=f"{prefix}_user_0")
+        organizer = User.objects.get(username=f"{prefix}_org_0")
+    except User.DoesNotExist:
+        raise ValueError(f"No hay datos de seed_perf con el prefijo '{prefix}'")
+
+    events = list(
+        Event.objects.filter(scheduled_at__gte=timezone.now(), status="Activo")
+        .exclude(Exists(Ticket.objects.filter(user=buyer, event=OuterRef("pk"))))
+        .order_by("-tickets_sold")
+        .values_list("pk", flat=True)[:SAMPLE_EVENTS]
+    )
+    if not events:
+        raise ValueError("No hay eventos próximos para medir")
+    return {"buyer": buyer, "organizer": organizer, "events": events}
+
+
+class QueryCounter:
+    """Cuenta las consultas ejecutadas, sin el límite ni el costo del registro de DEBUG."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure_route(route, clients, context, requests=50, warmup=5, time_budget=TIME_BUDGET):
+    """
+    Latencias (ms), consultas por pedido y memoria asignada (pico, KiB) de una ruta.
+    Cada pedido corre en una transacción que se revierte, así los POST no se acumulan.
+    Se deja de medir al agotar `time_budget` segundos, con al menos un pedido medido.
+    """
+    client = clients[route.role]
+
+    def send(i):
+        data = route.data(context, i) if route.data else None
+        with transaction.atomic():
+            response = getattr(client, route.method)(route.url(context, i), data)
+            transaction.set_rollback(True)
+        if response.status_code >= 400:
+            raise ValueError(f"{route.name} respondió {response.status_code}")
+        return response
+
+    deadline = time.monotonic() + time_budget
+    for i in range(warmup):
+        if time.monotonic() > deadline:
+            break
+        send(i)
+
+    timings = []
+    queries = []
+    deadline = time.monotonic() + time_budget
+    for i in range(requests):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            send(i)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        if time.monotonic() > deadline:
+            break
+
+    # La memoria se mide aparte: tracemalloc hace más lento cada pedido
+    tracemalloc.start()
+    try:
+        send(requests)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "requests": len(timings),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+        "p99_ms": round(percentile(timings, 0.99), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "queries": max(queries),
+        "memory_kb": round(peak / 1024),
+    }
+
+
+def run(routes=None, prefix="perf", requests=50, warmup=5, time_budget=TIME_BUDGET, on_result=None):
+    """
+    Mide las rutas con el cliente de pruebas sobre la base actual y devuelve los resultados.
+    Si se pasa `on_result`, se llama con (nombre, resultado) al terminar cada ruta.
+    """
+    context = build_context(prefix)
+    clients = {"buyer": Client(), "organizer": Client()}
+    clients["buyer"].force_login(context["buyer"])
+    clients["organizer"].force_login(context["organizer"])
+
+    results = {}
+    # El cliente de pruebas usa el host "testserver"; las métricas por pedido se apagan
+    # para no sumar su costo ni sus logs a lo que se mide
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], REQUEST_METRICS_SAMPLE_RATE=0):
+        for route in ROUTES:
+            if routes and route.name not in routes:
+                continue
+            results[route.name] = measure_route(route, clients, context, requests, warmup, time_budget)
+            if on_result:
+                on_result(route.name, results[route.name])
+
+    return {
+        "created_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "dataset": {"events": Event.objects.count(), "tickets": Ticket.objects.count()},
+        "routes": results,
+    }
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compara contra una línea base. Devuelve una lista de regresiones (ruta, métrica, antes,
+    ahora): más consultas que antes, o p95 o memoria peor que la tolerancia `threshold`.
+    """
+    regressions = []
+    for name, current in results["routes"].items():
+        previous = baseline.get("routes", {}).get(name)
+        if previous is None:
+            continue
+        if current["queries"] > previous["queries"]:
+            regressions.append((name, "queries", previous["queries"], current["queries"]))
+        p95_limit = max(previous["p95_ms"] * (1 + threshold), previous["p95_ms"] + MIN_LATENCY_DELTA_MS)
+        if current["p95_ms"] > p95_limit:
+            regressions.append((name, "p95_ms", previous["p95_ms"], current["p95_ms"]))
+        if current["memory_kb"] > previous["memory_kb"] * (1 + threshold):
+            regressions.append((name, "memory_kb", previous["memory_kb"], current["memory_kb"]))
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+        f.write("\n")
@@ -0,0 +1,83 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Valor centinela: distingue "no está en cache" de un None cacheado
+_MISSING = object()
+
+
+def _version_key(namespace):
+    return f"version:{namespace}"
+
+
+def get_version(namespace):
+    """
+    Versión actual de un espacio de claves. Las claves que la incluyen quedan obsoletas
+    cuando se llama a bump_version. Si la versión se perdió del cache se reinicia con un
+    valor único, para no reutilizar fragmentos viejos.
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(namespace):
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
+
+
+def versioned_key(namespace, *parts):
+    """Clave dentro de `namespace` atada a su versión actual."""
+    return ":".join([namespace, str(get_version(namespace)), *map(str, parts)])
+
+
+def jittered(timeout, jitter=None):
+    """TTL con una variación aleatoria de ±jitter, para que las claves no expiren a la vez."""
+    if timeout is None:
+        return None
+    if jitter is None:
+        jitter = getattr(settings, "CACHE_TTL_JITTER", 0)
+    return max(1, round(timeout * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def get_or_compute(key, compute, timeout, lock_timeout=10, poll_interval=0.05):
+    """
+    Devuelve el valor cacheado en `key` o lo calcula con `compute()`.
+    Ante un fallo solo un proceso recalcula (single-flight): el resto espera a que el
+    valor aparezca, hasta `lock_timeout` segundos, y recién entonces calcula por su cuenta.
+    """
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f"lock:{key}"
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            value = compute()
+            cache.set(key, value, jittered(timeout))
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+    return compute()
+
+
+def event_detail_namespace(event_id):
+    return f"event_detail:{event_id}"
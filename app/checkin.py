@@ -0,0 +1,186 @@
+import threading
+from collections import OrderedDict
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import ticket_codes
+from .models import Event, Ticket
+
+# Resultados de un escaneo
+CHECKED_IN = "checked_in"
+ALREADY_CHECKED_IN = "already_checked_in"
+INVALID = "invalid"
+# El código no tiene el formato de ticket_codes (dígito verificador incorrecto, mal tipeado)
+MALFORMED = "malformed"
+
+# Eventos con el índice cargado en memoria por proceso; se descarta el usado hace más tiempo
+MAX_INDEXED_EVENTS = 32
+# Códigos por consulta al leer el estado de un lote
+BATCH_CHUNK_SIZE = 500
+# Escaneos máximos por pedido en el modo por lotes
+MAX_BATCH_SCANS = 10000
+
+
+def _check_in_sql():
+    """
+    UPDATE condicional de un ticket por evento y código. Se arma a mano para ejecutarlo con
+    executemany en los lotes: con el ORM, un CASE por ticket cuesta más que la consulta.
+    """
+    quote = connection.ops.quote_name
+    column = {name: quote(Ticket._meta.get_field(name).column) for name in ("checked_in_at", "event", "ticket_code")}
+    return (
+        f"UPDATE {quote(Ticket._meta.db_table)} SET {column['checked_in_at']} = %s "
+        f"WHERE {column['event']} = %s AND {column['ticket_code']} = %s AND {column['checked_in_at']} IS NULL"
+    )
+
+
+class EventCodeIndex:
+    """
+    Códigos de los tickets de un evento precargados en memoria: código -> momento de ingreso
+    (None si todavía no ingresó). Los re-escaneos y los códigos de tickets ya ingresados se
+    responden sin ir a la base; un código ausente se busca en la base, por los tickets
+    comprados después de cargar el índice. La base es la fuente de verdad: el ingreso se
+    registra con un UPDATE condicional, así dos puertas no aceptan el mismo ticket.
+    """
+
+    def __init__(self, event_id):
+        self.event_id = event_id
+        # Lanza Event.DoesNotExist si el evento no existe
+        self.organizer_id = Event.objects.values_list("organizer_id", flat=True).get(pk=event_id)
+        self.codes = dict(
+            Ticket.objects.filter(event_id=event_id).values_list("ticket_code", "checked_in_at").iterator()
+        )
+
+    def resolve(self, raw_code):
+        """
+        Código tal como está guardado, o None si está mal formado. Se aceptan minúsculas,
+        guiones y espacios, y se descarta sin consultar la base un código cuyo dígito
+        verificador no coincide. Los códigos anteriores a ticket_codes se reconocen si
+        están en el índice, tal como se escribieron.
+        """
+        code = raw_code.strip()
+        if code in self.codes:
+            return code
+        code = ticket_codes.normalize(code)
+        return code if ticket_codes.is_valid(code) else None
+
+    def _tickets(self, codes):
+        return Ticket.objects.filter(event_id=self.event_id, ticket_code__in=codes)
+
+    def _check_in_params(self, code, scanned_at):
+        return [connection.ops.adapt_datetimefield_value(scanned_at), self.event_id, code]
+
+    def _lookup(self, code):
+        """Estado actual del código en la base: (existe, momento de ingreso)."""
+        rows = self._tickets([code]).values_list("checked_in_at", flat=True)[:1]
+        if not rows:
+            self.codes.pop(code, None)
+            return False, None
+        self.codes[code] = rows[0]
+        return True, rows[0]
+
+    def scan(self, code, scanned_at=None):
+        """Registra el ingreso de `code`. Devuelve (resultado, momento de ingreso)."""
+        try:
+            checked_in_at = self.codes[code]
+        except KeyError:
+            exists, checked_in_at = self._lookup(code)
+            if not exists:
+                return INVALID, None
+
+        if checked_in_at is not None:
+            return ALREADY_CHECKED_IN, checked_in_at
+
+        scanned_at = scanned_at or timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(_check_in_sql(), self._check_in_params(code, scanned_at))
+            updated = cursor.rowcount
+        if updated:
+            self.codes[code] = scanned_at
+            return CHECKED_IN, scanned_at
+
+        # Otro proceso lo registró antes, o el ticket se borró
+        exists, checked_in_at = self._lookup(code)
+        return (ALREADY_CHECKED_IN, checked_in_at) if exists else (INVALID, None)
+
+    def scan_many(self, scans):
+        """
+        Registra una lista de escaneos (código, momento) sincronizada por un lector sin
+        conexión. Vale el primer escaneo de cada código: un UPDATE condicional por código en
+        un solo executemany y una lectura del estado final por bloque de códigos.
+        Devuelve (resultado, momento) por escaneo.
+        """
+        first_scan = {}
+        for code, scanned_at in scans:
+            first_scan.setdefault(code, scanned_at)
+        codes = list(first_scan)
+
+        # Los que ya figuran como ingresados en memoria no necesitan el UPDATE
+        pending = [code for code in codes if self.codes.get(code) is None]
+        current = {}
+        with transaction.atomic():
+            if pending:
+                with connection.cursor() as cursor:
+                    cursor.executemany(
+                        _check_in_sql(), [self._check_in_params(code, first_scan[code]) for code in pending]
+                    )
+            for start in range(0, len(codes), BATCH_CHUNK_SIZE):
+                chunk = codes[start:start + BATCH_CHUNK_SIZE]
+                current.update(self._tickets(chunk).values_list("ticket_code", "checked_in_at"))
+
+        for code in codes:
+            if code in current:
+                self.codes[code] = current[code]
+            else:
+                self.codes.pop(code, None)
+
+        results = []
+        seen = set()
+        for code, scanned_at in scans:
+            if code not in current:
+                results.append((INVALID, None))
+            elif code not in seen and current[code] == first_scan[code]:
+                results.append((CHECKED_IN, current[code]))
+            else:
+                results.append((ALREADY_CHECKED_IN, current[code]))
+            seen.add(code)
+        return results
+
+    def forget(self, code):
+        self.codes.pop(code, None)
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_index(event_id):
+    """Índice de códigos del evento, cargándolo la primera vez. Lanza Event.DoesNotExist."""
+    with _indexes_lock:
+        index = _indexes.get(event_id)
+        if index is not None:
+            _indexes.move_to_end(event_id)
+            return index
+
+    # La carga se hace fuera del lock para no frenar los escaneos de otros eventos
+    index = EventCodeIndex(event_id)
+    with _indexes_lock:
+        index = _indexes.setdefault(event_id, index)
+        _indexes.move_to_end(event_id)
+        while len(_indexes) > MAX_INDEXED_EVENTS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def forget(event_id, code):
+    """Quita un código del índice del evento, si está cargado (por ejemplo al borrar el ticket)."""
+    with _indexes_lock:
+        index = _indexes.get(event_id)
+    if index is not None:
+        index.forget(code)
+
+
+def clear():
+    with _indexes_lock:
+        _indexes.clear()
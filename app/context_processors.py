@@ -0,0 +1,12 @@
+from .models import NotificationUser
+
+
+def unread_notifications(request):
+    """
+    Expone el contador de notificaciones no leídas para el badge del navbar.
+    Se evalúa de forma perezosa: solo se consulta si la plantilla lo usa.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {"unread_notifications_count": lambda: NotificationUser.unread_count(user.pk)}
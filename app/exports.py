@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from .models import Ticket
+
+# Filas que se leen de la base y se escriben juntas en cada fragmento de la respuesta
+CHUNK_SIZE = 2000
+
+TICKET_EXPORT_FIELDS = [
+    "ticket_code", "username", "email", "first_name", "last_name",
+    "type", "quantity", "unit_price", "total_price", "buy_date", "checked_in_at",
+]
+
+
+def ticket_rows(event_id, chunk_size=CHUNK_SIZE):
+    """
+    Tickets de un evento como tuplas en el orden de TICKET_EXPORT_FIELDS.
+    Usuario y precios salen de la misma consulta, que se recorre con un cursor del lado
+    del servidor: en memoria solo hay un bloque de `chunk_size` filas a la vez.
+    """
+    rows = (
+        Ticket.with_prices(Ticket.objects.filter(event_id=event_id))
+        .order_by("buy_date", "id")
+        .values_list(
+            "ticket_code", "user__username", "user__email", "user__first_name", "user__last_name",
+            "type", "quantity", "unit_price", "total_price", "buy_date", "checked_in_at",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        yield tuple(value.isoformat() if isinstance(value, datetime) else value for value in row)
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(fields, rows, chunk_size=CHUNK_SIZE):
+    """Genera el CSV por fragmentos: primero el encabezado, antes de ejecutar la consulta."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(fields)
+    yield flush()
+    for batch in _batched(rows, chunk_size):
+        writer.writerows(batch)
+        yield flush()
+
+
+def stream_ndjson(fields, rows, chunk_size=CHUNK_SIZE):
+    """Genera un objeto JSON por línea, agrupando `chunk_size` líneas por fragmento."""
+    for batch in _batched(rows, chunk_size):
+        yield "".join(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n" for row in batch)
+
+
+FORMATS = {
+    "csv": (stream_csv, "text/csv; charset=utf-8"),
+    "ndjson": (stream_ndjson, "application/x-ndjson; charset=utf-8"),
+}
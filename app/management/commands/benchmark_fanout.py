@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.models import Notification, NotificationUser, User
+
+PREFIX = "bench_fanout_"
+
+
+class Command(BaseCommand):
+    help = "Mide filas/segundo del envío de notificaciones a 1k, 10k y 100k destinatarios"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, nargs="+", default=[1000, 10000, 100000])
+        parser.add_argument("--chunk-size", type=int, default=Notification.FAN_OUT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        sizes = sorted(options["recipients"])
+        chunk_size = options["chunk_size"]
+
+        # Todo corre en una transacción que se revierte al final: la base queda intacta
+        with transaction.atomic():
+            User.objects.bulk_create(
+                (User(username=f"{PREFIX}{i}") for i in range(sizes[-1])),
+                batch_size=5000,
+            )
+            ids = list(User.objects.filter(username__startswith=PREFIX).order_by("pk").values_list("pk", flat=True))
+
+            for size in sizes:
+                users = User.objects.filter(username__startswith=PREFIX, pk__lte=ids[size - 1])
+                notification = Notification.objects.create(title="Benchmark", message="-", priority="LOW")
+
+                started = time.perf_counter()
+                rows = notification.fan_out(users, chunk_size=chunk_size)
+                elapsed = time.perf_counter() - started
+
+                created = NotificationUser.objects.filter(notification=notification).count()
+                if created != size:
+                    raise CommandError(f"Se esperaban {size} destinatarios y se crearon {created}")
+                self.stdout.write(
+                    f"{size:>7} destinatarios: {rows} filas en {elapsed:.2f}s "
+                    f"({rows / elapsed:,.0f} filas/s)"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,169 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app.models import (
+    Comment,
+    Event,
+    NotificationUser,
+    Rating,
+    RefoundRequest,
+    RefoundStatus,
+    Ticket,
+)
+from app.pagination import PAGE_SIZE
+from app.sweeper import BATCH_SIZE
+
+
+def sample(queryset, fields, size):
+    # Muestras tomadas de filas existentes: las claves frecuentes aparecen en proporción a su uso
+    return list(queryset.order_by("?").values_list(*fields)[:size])
+
+
+# Consultas calientes con la misma forma que las vistas: nombre, índices que las sirven,
+# cómo obtener parámetros de prueba y cómo ejecutarlas
+HOT_QUERIES = [
+    (
+        "eventos_proximos",
+        ["event_schedule_status_idx"],
+        lambda size: [()],
+        lambda: list(
+            Event.objects.filter(scheduled_at__gte=timezone.now())
+            .exclude(status__in=["Cancelado", "Finalizado"])
+            .order_by("scheduled_at", "id")[:PAGE_SIZE + 1]
+        ),
+    ),
+    (
+        "eventos_organizador",
+        ["event_organizer_schedule_idx"],
+        lambda size: sample(Event.objects.all(), ["organizer_id"], size),
+        lambda organizer_id: list(
+            Event.objects.filter(organizer_id=organizer_id, scheduled_at__gte=timezone.now())
+            .exclude(status__in=["Cancelado", "Finalizado"])
+            .order_by("scheduled_at", "id")[:PAGE_SIZE + 1]
+        ),
+    ),
+    (
+        "eventos_vencidos",
+        ["event_schedule_status_idx"],
+        lambda size: [()],
+        lambda: list(Event.due_for_finalization().order_by().values_list("pk", flat=True)[:BATCH_SIZE]),
+    ),
+    (
+        "tickets_usuario_evento",
+        ["ticket_user_event_idx"],
+        lambda size: sample(Ticket.objects.all(), ["user_id", "event_id"], size),
+        lambda user_id, event_id: Ticket.objects.filter(user_id=user_id, event_id=event_id).aggregate(
+            total=Sum("quantity")
+        ),
+    ),
+    (
+        "tickets_evento_total",
+        ["ticket_event_recent_idx"],
+        lambda size: sample(Ticket.objects.all(), ["event_id"], size),
+        lambda event_id: Ticket.objects.filter(event_id=event_id).aggregate(total=Sum("quantity")),
+    ),
+    (
+        "tickets_evento_recientes",
+        ["ticket_event_recent_idx"],
+        lambda size: sample(Ticket.objects.all(), ["event_id"], size),
+        lambda event_id: list(Ticket.objects.filter(event_id=event_id).order_by("-buy_date")[:PAGE_SIZE]),
+    ),
+    (
+        "comentarios_evento",
+        ["comment_event_recent_idx"],
+        lambda size: sample(Comment.objects.all(), ["event_id"], size),
+        lambda event_id: list(Comment.objects.filter(event_id=event_id).order_by("-created_at", "-id")[:11]),
+    ),
+    (
+        "resenas_evento",
+        ["rating_event_recent_idx"],
+        lambda size: sample(Rating.objects.all(), ["event_id"], size),
+        lambda event_id: list(Rating.objects.filter(event_id=event_id).order_by("-created_at", "-id")[:11]),
+    ),
+    (
+        "notificaciones_no_leidas",
+        ["notifuser_inbox_read_idx"],
+        lambda size: sample(NotificationUser.objects.all(), ["user_id"], size),
+        lambda user_id: NotificationUser.objects.filter(user_id=user_id, read=False).count(),
+    ),
+    (
+        "reembolso_pendiente",
+        ["refound_user_status_idx"],
+        lambda size: sample(RefoundRequest.objects.all(), ["user_id"], size),
+        lambda user_id: RefoundRequest.objects.filter(user_id=user_id, status=RefoundStatus.PENDING).exists(),
+    ),
+]
+
+
+def find_index(name):
+    for model in (Event, Ticket, Comment, Rating, NotificationUser, RefoundRequest):
+        for index in model._meta.indexes:
+            if index.name == name:
+                return model, index
+    raise CommandError(f"No existe el índice {name}")
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def measure(run, params):
+    """Latencias en ms (una por juego de parámetros, tras una pasada de calentamiento) y plan."""
+    for args in params:
+        run(*args)
+
+    timings = []
+    for args in params:
+        started = time.perf_counter()
+        run(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        run(*params[0])
+    return timings, explain(queries[-1]["sql"])
+
+
+class Command(BaseCommand):
+    help = "Compara latencia y plan de las consultas calientes con y sin sus índices"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=50,
+                            help="Juegos de parámetros por consulta, tomados de la base")
+        parser.add_argument("--only", action="append", choices=[query[0] for query in HOT_QUERIES],
+                            help="Medir solo esta consulta (se puede repetir)")
+
+    def handle(self, *args, **options):
+        for name, index_names, sampler, run in HOT_QUERIES:
+            if options["only"] and name not in options["only"]:
+                continue
+            params = sampler(options["samples"])
+            if not params:
+                self.stdout.write(f"{name}: sin datos, se omite")
+                continue
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} ({', '.join(index_names)})"))
+            with connection.schema_editor(collect_sql=True) as editor:
+                statements = [str(index.remove_sql(model, editor)) for model, index in map(find_index, index_names)]
+
+            # Los índices se borran dentro de una transacción que se revierte: la base queda intacta
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for statement in statements:
+                        cursor.execute(statement)
+                self.report("sin índice", *measure(run, params))
+                transaction.set_rollback(True)
+            self.report("con índice", *measure(run, params))
+
+    def report(self, label, timings, plan):
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        self.stdout.write(f"  {label}: p50 {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms")
+        for line in plan:
+            self.stdout.write(f"    {line}")
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from app.models import Notification, NotificationUser, User
+
+PREFIX = "bench_update_"
+
+
+def legacy_update(notification, users):
+    """Implementación anterior de Notification.update, solo para comparar."""
+    notification.users.set(users)
+    NotificationUser.objects.filter(notification=notification).delete()
+    for user in users:
+        NotificationUser.objects.create(user=user, notification=notification)
+
+
+class Command(BaseCommand):
+    help = "Compara la actualización de destinatarios anterior con la basada en diferencias"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=5000)
+        parser.add_argument("--churn", type=float, default=0.1,
+                            help="Proporción de destinatarios que se reemplazan")
+
+    def handle(self, *args, **options):
+        size = options["recipients"]
+        changed = int(size * options["churn"])
+
+        # Todo corre en una transacción que se revierte al final: la base queda intacta
+        with transaction.atomic():
+            User.objects.bulk_create(
+                (User(username=f"{PREFIX}{i}") for i in range(size + changed)),
+                batch_size=5000,
+            )
+            ids = list(User.objects.filter(username__startswith=PREFIX).order_by("pk").values_list("pk", flat=True))
+            before = User.objects.filter(pk__in=ids[:size])
+            after = User.objects.filter(pk__in=ids[changed:size + changed])
+
+            for name, update in (("anterior", legacy_update), ("diferencial", self.diff_update)):
+                notification = Notification.objects.create(title="Benchmark", message="-", priority="LOW")
+                notification.fan_out(before)
+
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    update(notification, list(after) if name == "anterior" else after)
+                    elapsed = time.perf_counter() - started
+
+                recipients = notification.users.count()
+                if recipients != size:
+                    raise CommandError(f"{name}: se esperaban {size} destinatarios y quedaron {recipients}")
+                self.stdout.write(
+                    f"{name:>12}: {size} destinatarios, {changed} cambios -> "
+                    f"{elapsed:.3f}s, {len(queries)} consultas"
+                )
+
+            transaction.set_rollback(True)
+
+    def diff_update(self, notification, users):
+        notification.set_recipients(users)
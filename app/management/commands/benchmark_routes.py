@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia, consultas y memoria de las rutas principales sobre los datos de seed_perf "
+        "y las compara con una línea base"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Pedidos medidos por ruta")
+        parser.add_argument("--warmup", type=int, default=5, help="Pedidos previos sin medir")
+        parser.add_argument("--time-budget", type=float, default=benchmarks.TIME_BUDGET,
+                            help="Segundos máximos de medición por ruta")
+        parser.add_argument("--route", action="append", dest="routes",
+                            choices=[route.name for route in benchmarks.ROUTES],
+                            help="Medir solo esta ruta (se puede repetir)")
+        parser.add_argument("--prefix", default="perf", help="Prefijo usado al correr seed_perf")
+        parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+        parser.add_argument("--baseline", help="Resultados JSON anteriores contra los que comparar")
+        parser.add_argument("--threshold", type=float, default=benchmarks.REGRESSION_THRESHOLD,
+                            help="Tolerancia de empeoramiento de p95 y memoria (0.2 = 20%%)")
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'ruta':<20} {'pedidos':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'consultas':>10} {'KiB':>8}"
+        )
+        try:
+            results = benchmarks.run(
+                options["routes"], options["prefix"], options["requests"], options["warmup"],
+                options["time_budget"], on_result=self.report,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options["output"]:
+            benchmarks.save(results, options["output"])
+            self.stdout.write(f"Resultados guardados en {options['output']}")
+
+        if options["baseline"]:
+            regressions = benchmarks.compare(results, benchmarks.load(options["baseline"]), options["threshold"])
+            for name, metric, before, after in regressions:
+                self.stdout.write(self.style.ERROR(f"{name}: {metric} {before} -> {after}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} métricas empeoraron respecto de {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS("Sin regresiones respecto de la línea base"))
+
+    def report(self, name, route):
+        self.stdout.write(
+            f"{name:<20} {route['requests']:>8} {route['p50_ms']:>9.2f} {route['p95_ms']:>9.2f} "
+            f"{route['p99_ms']:>9.2f} {route['queries']:>10} {route['memory_kb']:>8}"
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app import ticket_codes
+
+
+class Command(BaseCommand):
+    help = "Mide códigos de ticket generados por segundo, de a uno y en lote, y verifica que no se repitan"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000, help="Códigos a generar en cada medición")
+
+    def handle(self, *args, **options):
+        count = options["count"]
+
+        started = time.perf_counter()
+        single = [ticket_codes.allocate() for _ in range(count)]
+        self.report("allocate()", count, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        batch = ticket_codes.allocate_many(count)
+        self.report("allocate_many()", count, time.perf_counter() - started)
+
+        codes = single + batch
+        if len(set(codes)) != len(codes):
+            raise CommandError(f"Se repitieron {len(codes) - len(set(codes))} códigos")
+        if codes != sorted(codes):
+            raise CommandError("Los códigos no quedaron en orden de emisión")
+
+        started = time.perf_counter()
+        invalid = sum(not ticket_codes.is_valid(code) for code in batch)
+        self.report("is_valid()", count, time.perf_counter() - started)
+        if invalid:
+            raise CommandError(f"{invalid} códigos no pasaron is_valid()")
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(f"{label:<16} {count:,} códigos en {elapsed:.2f}s ({count / elapsed:,.0f} códigos/s)")
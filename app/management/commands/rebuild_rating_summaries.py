@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Event, RatingSummary
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero el resumen de calificaciones (cantidad, suma e histograma) de los eventos"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, action="append", dest="events",
+                            help="Id de evento a recalcular (se puede repetir)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        events = Event.objects.order_by("pk")
+        if options["events"]:
+            events = events.filter(pk__in=options["events"])
+
+        revisados = 0
+        corregidos = 0
+        last_pk = 0
+        aggregates = RatingSummary.aggregates(prefix="ratings__")
+        while True:
+            # Se recorre por rangos de pk, calculando el resumen real de cada lote en una consulta
+            batch = list(
+                events.filter(pk__gt=last_pk)
+                .annotate(**{f"real_{name}": expr for name, expr in aggregates.items()})
+                .values("pk", *(f"real_{name}" for name in aggregates))[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]["pk"]
+            revisados += len(batch)
+
+            stored = {
+                summary.event_id: summary
+                for summary in RatingSummary.objects.filter(event_id__in=[row["pk"] for row in batch])
+            }
+            for row in batch:
+                real = {name: row[f"real_{name}"] for name in aggregates}
+                summary = stored.get(row["pk"])
+                if summary is None:
+                    if not real["count"]:
+                        continue
+                elif all(getattr(summary, name) == value for name, value in real.items()):
+                    continue
+                corregidos += 1
+                self.stdout.write(f"Evento {row['pk']}: resumen recalculado ({real['count']} calificaciones)")
+                RatingSummary.rebuild(row["pk"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{revisados} eventos revisados, {corregidos} corregidos"
+        ))
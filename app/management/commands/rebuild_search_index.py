@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de eventos (necesario tras altas masivas o loaddata)"
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        total = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} eventos indexados con {type(backend).__name__}"
+        ))
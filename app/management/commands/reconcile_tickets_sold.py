@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from app.models import Event, Ticket
+
+
+class Command(BaseCommand):
+    help = "Recalcula Event.tickets_sold a partir de los tickets y corrige los eventos desfasados"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, action="append", dest="events",
+                            help="Id de evento a reconciliar (se puede repetir)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Solo informa los desfasajes, sin corregirlos")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+
+        sold = (
+            Ticket.objects.filter(event=OuterRef("pk"))
+            .values("event")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        events = Event.objects.order_by("pk")
+        if options["events"]:
+            events = events.filter(pk__in=options["events"])
+
+        revisados = 0
+        corregidos = 0
+        last_pk = 0
+        while True:
+            # Se recorre por rangos de pk para no cargar todos los eventos en memoria
+            batch = list(
+                events.filter(pk__gt=last_pk)
+                .annotate(actual=Coalesce(Subquery(sold), 0))
+                .values_list("pk", "tickets_sold", "actual")[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            revisados += len(batch)
+
+            for pk, stored, actual in batch:
+                if stored == actual:
+                    continue
+                corregidos += 1
+                self.stdout.write(f"Evento {pk}: tickets_sold={stored}, real={actual}")
+                if not dry_run:
+                    # Un único UPDATE con la suma como subconsulta, atómico frente a compras concurrentes
+                    Event.objects.filter(pk=pk).update(tickets_sold=Coalesce(Subquery(sold), 0))
+
+        accion = "a corregir" if dry_run else "corregidos"
+        self.stdout.write(self.style.SUCCESS(
+            f"{revisados} eventos revisados, {corregidos} {accion}"
+        ))
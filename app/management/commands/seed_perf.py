@@ -0,0 +1,439 @@
+import random
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from app.models import (
+    Category,
+    Comment,
+    Event,
+    Favorite,
+    Notification,
+    NotificationUser,
+    Rating,
+    RatingSummary,
+    RefoundReason,
+    RefoundRequest,
+    RefoundStatus,
+    Ticket,
+    User,
+    Venue,
+)
+from app.search import get_backend
+
+DEFAULT_PASSWORD = "perf-eventhub"
+
+# Volúmenes por defecto (~10M filas); --scale los multiplica y cada opción los reemplaza
+VOLUMES = {
+    "users": 100_000,
+    "organizers": 1_000,
+    "categories": 20,
+    "venues": 500,
+    "events": 1_000_000,
+    "tickets": 5_000_000,
+    "ratings": 500_000,
+    "comments": 500_000,
+    "favorites": 1_000_000,
+    "refunds": 100_000,
+    "notifications": 20_000,
+    "deliveries": 2_000_000,
+}
+
+DAY = 86400
+# Los eventos se reparten entre dos años atrás y uno adelante de la fecha de referencia
+PAST_DAYS = 730
+FUTURE_DAYS = 365
+
+WORDS = (
+    "concierto festival teatro jazz rock tango cine feria taller charla muestra arte danza "
+    "folklore electrónica orquesta stand-up gastronomía vino cerveza maratón torneo ajedrez "
+    "literatura poesía fotografía diseño tecnología startups ciencia infantil familiar noche "
+    "verano invierno primavera otoño aire libre parque centro cultural club estadio sala "
+    "homenaje gira aniversario lanzamiento clásico acústico sinfónico barroco latino indie"
+).split()
+CITIES = ["Buenos Aires", "Córdoba", "Rosario", "Mendoza", "La Plata", "Mar del Plata", "Salta", "Tucumán"]
+# Frecuencias acumuladas de cada puntaje (1 a 5; la mayoría de las reseñas son buenas)
+# y de cada cantidad de entradas por compra (1 a 4)
+RATING_CUM_WEIGHTS = [5, 13, 28, 60, 100]
+QUANTITY_CUM_WEIGHTS = [60, 85, 95, 100]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def zipf_counts(rng, total, size, cap, exponent=0.9):
+    """
+    Reparte `total` entre `size` elementos según una ley de Zipf en orden aleatorio:
+    unos pocos enormes y una cola larga. Ningún elemento supera `cap`.
+    """
+    weights = [(rank + 1) ** -exponent for rank in range(size)]
+    scale = total / sum(weights) if weights else 0
+    rng.shuffle(weights)
+    counts = array("l")
+    for weight in weights:
+        expected = weight * scale
+        count = int(expected)
+        # Redondeo aleatorio: la suma se mantiene cerca de `total`
+        if rng.random() < expected - count:
+            count += 1
+        counts.append(min(count, cap))
+    return counts
+
+
+def cumulative(weights):
+    total = 0
+    result = []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Permite guardar fechas históricas en campos auto_now_add durante la carga masiva."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un conjunto de datos sintético y determinístico (misma semilla, mismos datos) "
+        "para pruebas de carga y rendimiento"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--scale", type=float, default=1.0,
+                            help="Multiplica todos los volúmenes por defecto (~10M filas con 1.0)")
+        for name, default in VOLUMES.items():
+            parser.add_argument(f"--{name}", type=int, help=f"Cantidad de {name} (por defecto {default:,})")
+        parser.add_argument("--prefix", default="perf",
+                            help="Prefijo de usuarios y códigos, para distinguir cargas sucesivas")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD,
+                            help="Contraseña de todos los usuarios generados")
+        parser.add_argument("--chunk-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.prefix = options["prefix"]
+        self.chunk_size = options["chunk_size"]
+        self.volumes = {
+            name: options[name] if options[name] is not None else max(1, round(default * options["scale"]))
+            for name, default in VOLUMES.items()
+        }
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError("Se necesita un motor que devuelva los ids en bulk_create (SQLite 3.35+, PostgreSQL)")
+        if User.objects.filter(username__startswith=f"{self.prefix}_").exists():
+            raise CommandError(f"Ya hay datos con el prefijo '{self.prefix}': usar otro --prefix")
+
+        if connection.vendor == "sqlite":
+            # Con el cache por defecto (2 MiB) cada alta en los índices de tablas grandes lee del disco
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA cache_size = -262144")
+
+        # Fechas relativas al día de la carga, para que siempre haya eventos próximos
+        self.anchor = datetime.now(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        started = time.perf_counter()
+        self.total_rows = 0
+
+        self.seed_users(options["password"])
+        self.seed_catalog()
+        self.seed_events()
+        self.seed_tickets()
+        self.seed_ratings()
+        self.seed_comments()
+        self.seed_favorites()
+        self.seed_refunds()
+        self.seed_notifications()
+
+        self.step("Índice de búsqueda", get_backend().rebuild)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.total_rows:,} filas en {elapsed:.1f}s ({self.total_rows / elapsed:,.0f} filas/s)"
+        ))
+
+    # Utilidades
+
+    def at(self, offset):
+        return self.anchor + timedelta(seconds=offset)
+
+    def insert(self, label, model, objects, ids=None, **kwargs):
+        """
+        Inserta `objects` con bulk_create por bloques e informa filas por segundo.
+        Si se pasa `ids`, le agrega las claves primarias generadas, en orden.
+        """
+        started = time.perf_counter()
+        rows = 0
+        for chunk in chunked(objects, self.chunk_size):
+            model.objects.bulk_create(chunk, **kwargs)
+            rows += len(chunk)
+            if ids is not None:
+                ids.extend(obj.pk for obj in chunk)
+        self.report(label, rows, time.perf_counter() - started)
+        self.total_rows += rows
+        return rows
+
+    def step(self, label, func):
+        started = time.perf_counter()
+        func()
+        self.stdout.write(f"{label}: {time.perf_counter() - started:.1f}s")
+
+    def report(self, label, rows, elapsed):
+        rate = rows / elapsed if elapsed else rows
+        self.stdout.write(f"{label}: {rows:,} filas en {elapsed:.1f}s ({rate:,.0f} filas/s)")
+
+    def words(self, count):
+        return " ".join(self.rng.choices(WORDS, k=count))
+
+    # Generadores
+
+    def seed_users(self, password):
+        hashed = make_password(password)
+        joined = self.at(-PAST_DAYS * DAY)
+
+        def users(count, kind, is_organizer):
+            for i in range(count):
+                username = f"{self.prefix}_{kind}_{i}"
+                yield User(
+                    username=username, email=f"{username}@example.com", password=hashed,
+                    is_organizer=is_organizer, date_joined=joined,
+                )
+
+        self.organizer_ids = []
+        self.user_ids = []
+        self.insert("Organizadores", User, users(self.volumes["organizers"], "org", True), ids=self.organizer_ids)
+        self.insert("Usuarios", User, users(self.volumes["users"], "user", False), ids=self.user_ids)
+
+    def seed_catalog(self):
+        rng = self.rng
+        categories = [
+            Category(name=f"{word.capitalize()} {i}", description=self.words(8), is_active=rng.random() < 0.9)
+            for i, word in enumerate(rng.choices(WORDS, k=self.volumes["categories"]))
+        ]
+        venues = [
+            Venue(
+                name=f"Sala {self.words(2)} {i}", address=f"Calle {rng.randint(1, 9999)}",
+                city=rng.choice(CITIES), capacity=rng.choice([200, 500, 1000, 5000, 50000]),
+                contact=f"contacto{i}@example.com",
+            )
+            for i in range(self.volumes["venues"])
+        ]
+        self.insert("Categorías", Category, categories)
+        self.insert("Locaciones", Venue, venues)
+        self.category_ids = [category.pk for category in categories]
+        self.venue_ids = [venue.pk for venue in venues]
+
+    def seed_events(self):
+        rng = self.rng
+        size = self.volumes["events"]
+        # Compradores por evento: unos pocos eventos enormes y una cola larga de eventos chicos
+        self.buyers = zipf_counts(rng, self.volumes["tickets"], size, cap=len(self.user_ids))
+        # Los organizadores también siguen una cola larga: pocos publican la mayoría de los eventos
+        organizer_weights = cumulative((rank + 1) ** -1.0 for rank in range(len(self.organizer_ids)))
+        self.offsets = array("d")
+
+        def events():
+            for i in range(size):
+                offset = rng.uniform(-PAST_DAYS, FUTURE_DAYS) * DAY
+                self.offsets.append(offset)
+                if offset < 0:
+                    status = "Cancelado" if rng.random() < 0.03 else "Finalizado"
+                else:
+                    status = rng.choices(["Activo", "Reprogramado", "Cancelado"], weights=[95, 2, 3])[0]
+                yield Event(
+                    title=f"{self.words(3).capitalize()} {i}",
+                    description=self.words(rng.randint(8, 30)),
+                    scheduled_at=self.at(offset),
+                    organizer_id=rng.choices(self.organizer_ids, cum_weights=organizer_weights)[0],
+                    category_id=rng.choice(self.category_ids),
+                    venue_id=rng.choice(self.venue_ids),
+                    # Siempre alcanza para las entradas generadas (hasta 4 por comprador)
+                    capacity=max(4 * self.buyers[i], rng.choice([100, 200, 500, 1000])),
+                    status=status,
+                )
+
+        self.event_ids = array("q")
+        self.insert("Eventos", Event, events(), ids=self.event_ids)
+        # Eventos más populares reciben más reseñas, comentarios y favoritos
+        self.popularity = cumulative(count + 1 for count in self.buyers)
+
+    def seed_tickets(self):
+        rng = self.rng
+        refund_rate = self.volumes["refunds"] / max(1, sum(self.buyers))
+        self.refundable = []
+
+        def tickets():
+            code = 0
+            for i, count in enumerate(self.buyers):
+                if not count:
+                    continue
+                event_id = self.event_ids[i]
+                event_at = self.offsets[i]
+                for user_index in rng.sample(range(len(self.user_ids)), count):
+                    code += 1
+                    # Compra en los 90 días previos al evento, o en el último mes si aún no ocurrió
+                    bought = event_at - rng.uniform(0, 90) * DAY
+                    if bought > 0:
+                        bought = -rng.uniform(0, 30) * DAY
+                    ticket = Ticket(
+                        user_id=self.user_ids[user_index],
+                        event_id=event_id,
+                        ticket_code=f"{self.prefix}-{code:09d}",
+                        quantity=rng.choices((1, 2, 3, 4), cum_weights=QUANTITY_CUM_WEIGHTS)[0],
+                        type="vip" if rng.random() < 0.15 else "general",
+                        buy_date=self.at(bought),
+                    )
+                    if rng.random() < refund_rate:
+                        self.refundable.append(ticket)
+                    yield ticket
+
+        with explicit_dates(Ticket._meta.get_field("buy_date")):
+            self.insert("Tickets", Ticket, tickets())
+
+        def update_inventory():
+            # Un único UPDATE deja Event.tickets_sold igual a la suma real de cada evento
+            sold = Ticket.objects.filter(event=OuterRef("pk")).values("event").annotate(total=Sum("quantity"))
+            Event.objects.filter(pk__gte=self.event_ids[0], pk__lte=self.event_ids[-1]).update(
+                tickets_sold=Coalesce(Subquery(sold.values("total")), 0)
+            )
+
+        self.step("Inventario de eventos", update_inventory)
+
+    def seed_ratings(self):
+        rng = self.rng
+        past = [i for i, offset in enumerate(self.offsets) if offset < 0]
+        if not past:
+            return
+        weights = cumulative(self.buyers[i] + 1 for i in past)
+        summaries = {}
+
+        def ratings():
+            for _ in range(self.volumes["ratings"]):
+                i = rng.choices(past, cum_weights=weights)[0]
+                score = rng.choices((1, 2, 3, 4, 5), cum_weights=RATING_CUM_WEIGHTS)[0]
+                event_id = self.event_ids[i]
+                summary = summaries.setdefault(event_id, [0] * 5)
+                summary[score - 1] += 1
+                yield Rating(
+                    title=self.words(3).capitalize(), text=self.words(rng.randint(5, 40)), rating=score,
+                    user_id=rng.choice(self.user_ids), event_id=event_id,
+                    created_at=self.at(min(0, self.offsets[i] + rng.uniform(0, 30) * DAY)),
+                )
+
+        with explicit_dates(Rating._meta.get_field("created_at")):
+            self.insert("Reseñas", Rating, ratings())
+        self.insert("Resúmenes de reseñas", RatingSummary, (
+            RatingSummary(
+                event_id=event_id, count=sum(stars), total=sum(n * score for score, n in enumerate(stars, 1)),
+                **{f"star_{score}": n for score, n in enumerate(stars, 1)},
+            )
+            for event_id, stars in summaries.items()
+        ))
+
+    def seed_comments(self):
+        rng = self.rng
+
+        def comments():
+            for _ in range(self.volumes["comments"]):
+                i = rng.choices(range(len(self.event_ids)), cum_weights=self.popularity)[0]
+                yield Comment(
+                    title=self.words(3).capitalize(), text=self.words(rng.randint(5, 60)),
+                    user_id=rng.choice(self.user_ids), event_id=self.event_ids[i],
+                    created_at=self.at(min(0, self.offsets[i] + rng.uniform(-30, 30) * DAY)),
+                )
+
+        with explicit_dates(Comment._meta.get_field("created_at")):
+            self.insert("Comentarios", Comment, comments())
+
+    def seed_favorites(self):
+        rng = self.rng
+        indexes = range(len(self.event_ids))
+
+        def favorites():
+            for _ in range(self.volumes["favorites"]):
+                i = rng.choices(indexes, cum_weights=self.popularity)[0]
+                yield Favorite(user_id=rng.choice(self.user_ids), event_id=self.event_ids[i])
+
+        # Los pares repetidos se descartan en la base (unique_together)
+        self.insert("Favoritos", Favorite, favorites(), ignore_conflicts=True)
+
+    def seed_refunds(self):
+        rng = self.rng
+        pending_users = set()
+        statuses = list(RefoundStatus)
+        reasons = list(RefoundReason)
+
+        def refunds():
+            for ticket in self.refundable:
+                status = rng.choices(statuses, weights=[10, 70, 20])[0]
+                # Como en RefoundRequest.new: una sola solicitud pendiente por usuario
+                if status == RefoundStatus.PENDING:
+                    if ticket.user_id in pending_users:
+                        status = RefoundStatus.REJECTED
+                    else:
+                        pending_users.add(ticket.user_id)
+                approved = status == RefoundStatus.APPROVED
+                created_at = min(self.anchor, ticket.buy_date + timedelta(days=rng.uniform(0, 10)))
+                yield RefoundRequest(
+                    ticket=ticket, ticket_code=ticket.ticket_code, user_id=ticket.user_id,
+                    amount=(100 if ticket.type == "vip" else 50) * ticket.quantity,
+                    reason=self.words(rng.randint(5, 20)),
+                    refound_reason=rng.choice(reasons),
+                    status=status, approved=approved,
+                    approval_date=created_at + timedelta(days=1) if approved else None,
+                    created_at=created_at,
+                )
+
+        with explicit_dates(RefoundRequest._meta.get_field("created_at")):
+            self.insert("Reembolsos", RefoundRequest, refunds())
+        self.refundable = []
+
+    def seed_notifications(self):
+        rng = self.rng
+        size = self.volumes["notifications"]
+        indexes = range(len(self.event_ids))
+        notifications = []
+        for _ in range(size):
+            # La mayoría avisa sobre un evento; el resto son comunicados generales
+            event_id = None
+            if rng.random() < 0.8:
+                event_id = self.event_ids[rng.choices(indexes, cum_weights=self.popularity)[0]]
+            notifications.append(Notification(
+                title=self.words(3).capitalize()[:50], message=self.words(rng.randint(10, 40)),
+                priority=rng.choice(["HIGH", "MEDIUM", "LOW"]), event_id=event_id,
+                created_at=self.at(-rng.uniform(0, 365) * DAY),
+            ))
+        with explicit_dates(Notification._meta.get_field("created_at")):
+            self.insert("Notificaciones", Notification, notifications)
+
+        recipients = zipf_counts(rng, self.volumes["deliveries"], size, cap=len(self.user_ids))
+
+        def deliveries():
+            for notification, count in zip(notifications, recipients):
+                for user_index in rng.sample(range(len(self.user_ids)), count):
+                    read = rng.random() < 0.7
+                    yield NotificationUser(
+                        user_id=self.user_ids[user_index], notification_id=notification.pk,
+                        read=read, read_at=notification.created_at + timedelta(hours=1) if read else None,
+                        created_at=notification.created_at,
+                    )
+
+        self.insert("Destinatarios", NotificationUser, deliveries())
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.sweeper import BATCH_SIZE, sweep_event_status
+
+
+class Command(BaseCommand):
+    help = "Pasa a Finalizado, por lotes, los eventos cuya fecha ya pasó"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Solo cuenta los eventos vencidos, sin modificarlos")
+        parser.add_argument("--interval", type=int, default=0,
+                            help="Si es mayor a 0, repite el barrido cada N segundos")
+
+    def handle(self, *args, **options):
+        while True:
+            result = sweep_event_status(options["batch_size"], dry_run=options["dry_run"])
+            self.report(result)
+            if options["interval"] <= 0:
+                break
+            time.sleep(options["interval"])
+
+    def report(self, result):
+        if result["dry_run"]:
+            self.stdout.write(f"{result['rows']} eventos para finalizar (dry-run)")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['rows']} eventos finalizados en {result['batches']} lotes, "
+            f"{result['seconds']:.2f}s ({result['rows_per_second']:.0f} filas/s)"
+        ))
@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template as DjangoTemplate
+
+from . import reference_data
+
+logger = logging.getLogger(__name__)
+
+# Largo máximo del SQL repetido que se incluye en el log
+MAX_SQL_LENGTH = 500
+
+# Métricas del pedido en curso; None si el pedido no fue muestreado
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Métricas de un pedido. Se instala como execute_wrapper de la conexión para contar
+    consultas, sumar su duración y agrupar el SQL (sin parámetros) para detectar N+1.
+    Los tiempos son exclusivos: el de plantillas no incluye las consultas que dispara
+    el render y el de la vista es lo que resta del total.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_db_time = 0.0
+        self.total_time = 0.0
+        self.statements = Counter()
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if self._template_depth:
+                self.template_db_time += elapsed
+            self.statements[sql] += 1
+
+    @property
+    def view_time(self):
+        return max(0.0, self.total_time - self.db_time - self.template_time)
+
+    def duplicates(self, threshold):
+        """Consultas idénticas ejecutadas al menos `threshold` veces, de la más repetida a la menos."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def over_budget(self, query_budget, latency_budget_ms):
+        exceeded = []
+        if self.queries > query_budget:
+            exceeded.append("queries")
+        if self.total_time * 1000 > latency_budget_ms:
+            exceeded.append("latency")
+        return exceeded
+
+    def server_timing(self):
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} consultas"',
+            f"tpl;dur={self.template_time * 1000:.1f}",
+            f"view;dur={self.view_time * 1000:.1f}",
+            f"total;dur={self.total_time * 1000:.1f}",
+        ])
+
+
+class TimedTemplate(DjangoTemplate):
+    """Plantilla que suma su tiempo de render a las métricas del pedido en curso."""
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+
+        # Las plantillas renderizadas dentro de otra ya cuentan en el tiempo de la exterior
+        outermost = metrics._template_depth == 0
+        metrics._template_depth += 1
+        db_before = metrics.template_db_time
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics._template_depth -= 1
+            if outermost:
+                elapsed = time.perf_counter() - started
+                metrics.template_time += elapsed - (metrics.template_db_time - db_before)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Motor de plantillas de Django que mide el tiempo de render de cada pedido muestreado."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide una fracción de los pedidos (REQUEST_METRICS_SAMPLE_RATE): cantidad de consultas,
+    tiempo de base de datos, de plantillas y de la vista. Los publica en el header
+    Server-Timing y en un log JSON por pedido, que pasa a WARNING cuando el pedido supera
+    los presupuestos de consultas o latencia, o repite una misma consulta (N+1).
+    El SQL se registra sin parámetros, por lo que el log no incluye datos de usuarios.
+    El log incluye también los aciertos y fallos acumulados del cache de datos de referencia,
+    que se cuentan por proceso (campo pid).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.total_time = time.perf_counter() - started
+
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            timing = metrics.server_timing()
+            if response.has_header("Server-Timing"):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response["Server-Timing"] = timing
+        self.log(request, response, metrics)
+        return response
+
+    def log(self, request, response, metrics):
+        over_budget = metrics.over_budget(
+            settings.REQUEST_METRICS_QUERY_BUDGET, settings.REQUEST_METRICS_LATENCY_BUDGET_MS
+        )
+        duplicates = metrics.duplicates(settings.REQUEST_METRICS_DUPLICATE_THRESHOLD)
+        match = getattr(request, "resolver_match", None)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "template_ms": round(metrics.template_time * 1000, 2),
+            "view_ms": round(metrics.view_time * 1000, 2),
+            "total_ms": round(metrics.total_time * 1000, 2),
+            "over_budget": over_budget,
+            "duplicates": [{"sql": sql[:MAX_SQL_LENGTH], "count": count} for sql, count in duplicates],
+            "pid": os.getpid(),
+            "reference_data": reference_data.stats(),
+        }
+        level = logging.WARNING if over_budget or duplicates else logging.INFO
+        logger.log(level, json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_tickets_sold(apps, schema_editor):
+    Event = apps.get_model("app", "Event")
+    Ticket = apps.get_model("app", "Ticket")
+
+    sold = (
+        Ticket.objects.filter(event=OuterRef("pk"))
+        .values("event")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    Event.objects.update(tickets_sold=Coalesce(Subquery(sold), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_satisfactionsurvey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='tickets_sold',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_tickets_sold, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 20:59
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_created_at(apps, schema_editor):
+    Notification = apps.get_model("app", "Notification")
+    NotificationUser = apps.get_model("app", "NotificationUser")
+
+    created_at = Notification.objects.filter(pk=OuterRef("notification_id")).values("created_at")
+    NotificationUser.objects.update(created_at=Subquery(created_at))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0023_event_tickets_sold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationuser',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notificationuser',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='notifuser_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationuser',
+            index=models.Index(fields=['user', 'read', 'created_at', 'id'], name='notifuser_inbox_read_idx'),
+        ),
+    ]
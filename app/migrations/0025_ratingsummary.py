@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 21:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_summaries(apps, schema_editor):
+    Rating = apps.get_model("app", "Rating")
+    RatingSummary = apps.get_model("app", "RatingSummary")
+
+    stars = {f"star_{star}": Count("id", filter=Q(rating=star)) for star in range(1, 6)}
+    rows = (
+        Rating.objects.order_by()
+        .values("event_id")
+        .annotate(count=Count("id"), total=Sum("rating"), **stars)
+    )
+    RatingSummary.objects.bulk_create(
+        (RatingSummary(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_notificationuser_inbox_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='app.event')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('star_1', models.PositiveIntegerField(default=0)),
+                ('star_2', models.PositiveIntegerField(default=0)),
+                ('star_3', models.PositiveIntegerField(default=0)),
+                ('star_4', models.PositiveIntegerField(default=0)),
+                ('star_5', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_rating_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_ratingsummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['event', 'created_at', 'id'], name='comment_event_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['event', 'created_at', 'id'], name='rating_event_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_fts_table(apps, schema_editor):
+    # Solo en SQLite; con otros motores app.search usa otro backend
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS app_event_fts "
+        "USING fts5(title, description, tokenize='unicode61 remove_diacritics 2')"
+    )
+    # El título pesa más que la descripción en el ranking
+    schema_editor.execute("INSERT INTO app_event_fts(app_event_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+    schema_editor.execute(
+        "INSERT INTO app_event_fts(rowid, title, description) SELECT id, title, description FROM app_event"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS app_event_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0026_comment_rating_recent_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0027_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['scheduled_at', 'status'], name='event_schedule_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organizer', 'scheduled_at', 'id'], name='event_organizer_schedule_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='refoundrequest',
+            index=models.Index(fields=['user', 'status'], name='refound_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['user', 'event', 'quantity'], name='ticket_user_event_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['event', 'buy_date', 'quantity'], name='ticket_event_recent_idx'),
+        ),
+    ]
@@ -1,10 +1,53 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
 from datetime import datetime
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.db.models import Sum
+from django.core.cache import cache
+from django.db import OperationalError, connection, models, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
+from . import ticket_codes
+from .tasks import enqueue
+
+
+def retry_on_lock(func, timeout=10):
+    """
+    Ejecuta `func` (que abre su propia transacción) reintentando con espera aleatoria si la
+    base está bloqueada por otra escritura, como ocurre con SQLite durante una preventa.
+    Dentro de una transacción externa no se reintenta: el rollback lo maneja quien la abrió.
+    """
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except OperationalError:
+            if connection.in_atomic_block or time.monotonic() >= deadline:
+                raise
+            attempt += 1
+            time.sleep(random.uniform(0, min(0.1, 0.001 * 2 ** attempt)))
+
+
+# Locks por evento (en franjas) para que los hilos de un mismo proceso hagan fila en memoria
+# en lugar de competir por el bloqueo de la base. La garantía entre procesos la da el UPDATE.
+_RESERVATION_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+def reservation_lock(event_id):
+    return _RESERVATION_LOCKS[event_id % len(_RESERVATION_LOCKS)]
+
+
+def reservation_locks(event_ids):
+    """Locks de varios eventos, siempre en el mismo orden para que dos pedidos no se traben."""
+    stripes = sorted({event_id % len(_RESERVATION_LOCKS) for event_id in event_ids})
+    return [_RESERVATION_LOCKS[stripe] for stripe in stripes]
+
 
 class User(AbstractUser):
     is_organizer = models.BooleanField(default=False)
@@ -50,6 +93,29 @@ class Event(models.Model):
     venue = models.ForeignKey('Venue', on_delete=models.CASCADE, related_name='events', null=True, blank=True)
     capacity = models.IntegerField(default=0, blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="Activo")
+    # Inventario de entradas vendidas, mantenido con expresiones F por Ticket
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Listado de próximos y barrido de vencidos: rango por fecha, el estado se
+            # descarta desde el índice sin leer la fila
+            models.Index(fields=["scheduled_at", "status"], name="event_schedule_status_idx"),
+            models.Index(fields=["organizer", "scheduled_at", "id"], name="event_organizer_schedule_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Un save() completo nunca pisa el contador con un valor viejo en memoria;
+        # tickets_sold solo se modifica con UPDATE atómicos.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != "tickets_sold"
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
 
     @property
     def countdown(self):
@@ -65,31 +131,81 @@ class Event(models.Model):
     def is_organizer(self, user):
         return self.organizer == user
 
-    def check_and_update_agotado(self):
-        total = self.tickets.aggregate(total=Sum('quantity'))['total'] or 0 # type: ignore
-        total = int(total) if total is not None else 0
+    @property
+    def tickets_disponibles(self):
         capacity = int(self.capacity) if self.capacity is not None else 0
+        return max(0, capacity - self.tickets_sold)
+
+    @classmethod
+    def release_seats(cls, event_id, quantity):
+        """Devuelve `quantity` asientos al evento; si estaba agotado y hay lugar, vuelve a Activo."""
+        cls.objects.filter(pk=event_id).update(tickets_sold=Greatest(F("tickets_sold") - quantity, 0))
+        cls.objects.filter(pk=event_id, status="Agotado", capacity__gt=F("tickets_sold")).update(
+            status="Activo", updated_at=timezone.now()
+        )
 
-        if total >= capacity:
+    def check_and_update_agotado(self):
+        # Lectura O(1) del contador en lugar de sumar todos los tickets del evento; el estado
+        # también, porque otro pedido (o la devolución de asientos) pudo cambiarlo
+        self.refresh_from_db(fields=["tickets_sold", "status"])
+
+        if self.tickets_disponibles == 0:
             if self.status != "Agotado":
-                self.status = "Agotado"
-                self.save()
+                self._transition_status(self.status, "Agotado")
         else:
             if self.status == "Agotado":
-                self.status = "Activo"
-                self.save()
+                self._transition_status("Agotado", "Activo")
+
+    def _transition_status(self, old, new):
+        """
+        Cambia el estado con un UPDATE condicional de esa sola columna: no pisa con la copia en
+        memoria lo que otro pedido editó mientras tanto, y no repite una transición ya hecha.
+        """
+        updated = Event.objects.filter(pk=self.pk, status=old).update(status=new, updated_at=timezone.now())
+        if updated:
+            self.status = new
+        else:
+            self.refresh_from_db(fields=["status"])
 
     def __str__(self):
         return self.title
 
+    @property
+    def current_status(self):
+        """Estado efectivo calculado al leer, sin escribir en la base."""
+        if self.status == "Cancelado":
+            return self.status
+        if self.scheduled_at < timezone.now():
+            return "Finalizado"
+        if self.capacity is not None and self.capacity <= 0:
+            return "Agotado"
+        return self.status
+
     def check_and_update_status(self):
-        if self.status != "Cancelado":
-            if self.scheduled_at < timezone.now():
-                self.status = "Finalizado"
-                self.save()
-            elif self.capacity is not None and self.capacity <= 0:
-                self.status = "Agotado"
-                self.save()
+        # Solo se escribe cuando hay una transición real, y solo la columna status
+        status = self.current_status
+        if status != self.status:
+            self.status = status
+            self.save(update_fields=["status"])
+
+    @classmethod
+    def due_for_finalization(cls, now=None):
+        return cls.objects.filter(scheduled_at__lt=now or timezone.now()).exclude(
+            status__in=["Cancelado", "Finalizado"]
+        )
+
+    @classmethod
+    def finalize_due_batch(cls, batch_size, now=None):
+        """
+        Pasa a Finalizado hasta `batch_size` eventos vencidos con un único UPDATE,
+        sin traer las filas a Python. Devuelve la cantidad de eventos actualizados.
+        """
+        due = cls.due_for_finalization(now)
+        if connection.features.allow_sliced_subqueries_with_in:
+            pks = due.order_by().values("pk")[:batch_size]
+        else:
+            pks = list(due.values_list("pk", flat=True)[:batch_size])
+        return due.filter(pk__in=pks).update(status="Finalizado")
 
     @classmethod
     def validate(cls, title, description, scheduled_at, capacity=None):
@@ -184,13 +300,14 @@ class Event(models.Model):
         if not cambios:
             return
 
-        usuarios = User.objects.filter(tickets__event=self).distinct()
+        usuarios = User.objects.filter(tickets__event=self)
 
         titulo = "Cambio en evento"
         mensaje = f"Se han realizado cambios en el evento '{self.title}':\n\n" + "\n".join(cambios)
         prioridad = "HIGH"
 
-        Notification.new(titulo, mensaje, prioridad, usuarios, event=self)
+        # El envío a todos los asistentes no bloquea el request del organizador
+        Notification.new(titulo, mensaje, prioridad, usuarios, event=self, background=True)
 
 class Category(models.Model):
     name =models.CharField(max_length=100)
@@ -235,6 +352,11 @@ class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="comments")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["event", "created_at", "id"], name="comment_event_recent_idx"),
+        ]
+
     @classmethod
     def validate(cls, title, text):
         errors = {}
@@ -268,6 +390,93 @@ class Comment(models.Model):
         self.text = text.strip() if text else self.text
         self.save()
 
+
+class RatingSummary(models.Model):
+    """
+    Resumen persistido de las calificaciones de un evento: cantidad, suma e histograma 1-5.
+    Lo mantienen los receptores post_save/post_delete de Rating (también en los borrados en
+    cascada), y se reconstruye con el comando rebuild_rating_summaries.
+    """
+
+    STARS = range(1, 6)
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name="rating_summary")
+    count = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    star_1 = models.PositiveIntegerField(default=0)
+    star_2 = models.PositiveIntegerField(default=0)
+    star_3 = models.PositiveIntegerField(default=0)
+    star_4 = models.PositiveIntegerField(default=0)
+    star_5 = models.PositiveIntegerField(default=0)
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else 0
+
+    @property
+    def percentage(self):
+        return round(self.average * 20, 2)  # Escala de 0 a 100
+
+    @property
+    def histogram(self):
+        """Lista de (estrellas, cantidad, porcentaje) de 5 a 1."""
+        rows = []
+        for star in reversed(self.STARS):
+            amount = getattr(self, f"star_{star}")
+            rows.append((star, amount, round(amount * 100 / self.count) if self.count else 0))
+        return rows
+
+    @classmethod
+    def for_event(cls, event):
+        """Resumen del evento; uno vacío si todavía no tiene calificaciones."""
+        try:
+            return event.rating_summary
+        except cls.DoesNotExist:
+            return cls(event=event)
+
+    @classmethod
+    def aggregates(cls, prefix=""):
+        """
+        Expresiones que calculan el resumen desde la tabla de calificaciones.
+        `prefix` permite usarlas desde Event, por ejemplo "ratings__".
+        """
+        values = {"count": Count(f"{prefix}id"), "total": Coalesce(Sum(f"{prefix}rating"), 0)}
+        for star in cls.STARS:
+            values[f"star_{star}"] = Count(f"{prefix}id", filter=Q(**{f"{prefix}rating": star}))
+        return values
+
+    @classmethod
+    def rebuild(cls, event_id):
+        values = Rating.objects.filter(event_id=event_id).aggregate(**cls.aggregates())
+        summary, _ = cls.objects.update_or_create(event_id=event_id, defaults=values)
+        return summary
+
+    @classmethod
+    def apply(cls, event_id, old=None, new=None):
+        """
+        Aplica al resumen el cambio de una calificación de `old` a `new` estrellas
+        (None si no existía o ya no existe). Debe llamarse después de escribir la calificación.
+        """
+        if old == new:
+            return
+        deltas = {}
+        for value, sign in ((old, -1), (new, 1)):
+            if value is None:
+                continue
+            deltas["count"] = deltas.get("count", 0) + sign
+            deltas["total"] = deltas.get("total", 0) + sign * value
+            if value in cls.STARS:
+                key = f"star_{value}"
+                deltas[key] = deltas.get(key, 0) + sign
+
+        updates = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items() if delta}
+        if not updates:
+            return
+        if not cls.objects.filter(event_id=event_id).update(**updates) and new is not None:
+            # Sin resumen previo: se calcula completo, ya incluye el cambio recién escrito.
+            # Al borrar no: el resumen pudo borrarse en la misma cascada que el evento.
+            cls.rebuild(event_id)
+
 class Venue(models.Model):
     name = models.CharField(max_length=255)
     address = models.CharField(max_length=255, blank=True, null=True)
@@ -286,8 +495,63 @@ class Ticket(models.Model):
     ticket_code = models.CharField(max_length=100, unique=True)
     quantity = models.IntegerField(default=1)
     type = models.CharField(max_length=50, choices=[('general', 'General'), ('vip', 'VIP')], default='general')
+    # Momento del primer escaneo en la puerta (ver checkin.py)
+    checked_in_at = models.DateTimeField(null=True, blank=True)
+    # Pedido grupal en el que se compró, si se compró en uno
+    order = models.ForeignKey("Order", on_delete=models.SET_NULL, null=True, blank=True, related_name="tickets")
 
     MAX_TICKETS_PER_USER = 4
+    # Precio unitario por tipo de entrada
+    PRICES = {"general": 50, "vip": 100}
+
+    class Meta:
+        indexes = [
+            # Cubren SUM(quantity) por usuario y evento, y los tickets de un evento por fecha
+            models.Index(fields=["user", "event", "quantity"], name="ticket_user_event_idx"),
+            models.Index(fields=["event", "buy_date", "quantity"], name="ticket_event_recent_idx"),
+        ]
+
+    # Cantidad persistida, para aplicar solo la diferencia al inventario del evento
+    _saved_quantity = 0
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # None si la cantidad no se cargó (campo diferido)
+        instance._saved_quantity = instance.__dict__.get("quantity")
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            if self._saved_quantity is None:
+                self._saved_quantity = Ticket.objects.values_list("quantity", flat=True).get(pk=self.pk)
+            super().save(*args, **kwargs)
+            delta = int(self.quantity or 0) - self._saved_quantity
+            if delta:
+                Event.objects.filter(pk=self.event_id).update(
+                    tickets_sold=Greatest(F("tickets_sold") + delta, 0)
+                )
+        self._saved_quantity = int(self.quantity or 0)
+
+    def delete(self, *args, **kwargs):
+        # Los asientos los devuelve el receptor post_delete (signals.release_ticket_seats),
+        # que también corre en los borrados en cascada y por queryset
+        with transaction.atomic(savepoint=False):
+            if self._saved_quantity is None:
+                self._saved_quantity = Ticket.objects.values_list("quantity", flat=True).get(pk=self.pk)
+            result = super().delete(*args, **kwargs)
+        self._saved_quantity = 0
+        return result
+
+    @classmethod
+    def with_prices(cls, queryset):
+        """Anota unit_price y total_price calculados en la consulta a partir de PRICES (0 si el tipo no tiene precio)."""
+        unit_price = Case(
+            *[When(type=ticket_type, then=Value(price)) for ticket_type, price in cls.PRICES.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        return queryset.annotate(unit_price=unit_price, total_price=F("quantity") * unit_price)
 
     @classmethod
     def validate(cls, ticket_code, quantity):
@@ -303,7 +567,6 @@ class Ticket(models.Model):
 
     @classmethod
     def validate_max_per_user(cls, user, event, quantity):
-        from django.db.models import Sum
         errors = {}
 
         tickets_previos = cls.objects.filter(user=user, event=event).aggregate(
@@ -320,20 +583,65 @@ class Ticket(models.Model):
         return errors
     
     @classmethod
-    def new(cls, ticket_code, quantity, user, event):
+    def reserve(cls, ticket_code, quantity, user, event, type="general", check_capacity=True):
+        """
+        Compra atómica: reserva el cupo, valida el límite por usuario y crea el ticket
+        en una sola transacción. Devuelve (ticket, None) o (None, errors).
+        """
         errors = cls.validate(ticket_code, quantity)
+        if errors:
+            return None, errors
 
-        errors.update(cls.validate_max_per_user(user, event, quantity))
+        with reservation_lock(event.pk):
+            return retry_on_lock(
+                lambda: cls._reserve(ticket_code, quantity, user, event, type, check_capacity)
+            )
 
-        if len(errors.keys()) > 0:
+    @classmethod
+    def _reserve(cls, ticket_code, quantity, user, event, type, check_capacity):
+        with transaction.atomic():
+            # El UPDATE (condicional si se controla el cupo) reserva los asientos y bloquea
+            # la fila del evento hasta el commit, así dos compras concurrentes no sobrevenden.
+            events = Event.objects.filter(pk=event.pk)
+            if check_capacity:
+                events = events.exclude(status="Cancelado").filter(
+                    Q(capacity__isnull=True) | Q(tickets_sold__lte=F("capacity") - quantity)
+                )
+            reserved = events.update(tickets_sold=F("tickets_sold") + quantity)
+
+            if not reserved:
+                return None, cls._capacity_errors(event)
+
+            errors = cls.validate_max_per_user(user, event, quantity)
+            if errors:
+                transaction.set_rollback(True)
+                return None, errors
+
+            ticket = cls(ticket_code=ticket_code, quantity=quantity, user=user, event=event, type=type or "general")
+            # Los asientos ya se sumaron en la reserva
+            ticket._saved_quantity = quantity
+            ticket.save()
+
+        return ticket, None
+
+    @classmethod
+    def _capacity_errors(cls, event):
+        current = Event.objects.filter(pk=event.pk).values("status", "capacity", "tickets_sold").first()
+        if current is None or current["status"] == "Cancelado":
+            return {"capacity": "No se pueden comprar entradas para un evento cancelado."}
+
+        disponibles = max(0, (current["capacity"] or 0) - current["tickets_sold"])
+        if disponibles == 0:
+            return {"capacity": "No quedan entradas disponibles."}
+        return {"capacity": f"No quedan entradas disponibles. Solo quedan {disponibles} entradas."}
+
+    @classmethod
+    def new(cls, ticket_code, quantity, user, event):
+        ticket, errors = cls.reserve(ticket_code, quantity, user, event, check_capacity=False)
+
+        if ticket is None:
             return False, errors
 
-        Ticket.objects.create(
-            ticket_code=ticket_code,
-            quantity=quantity,
-            user=user,
-            event=event
-        )
         return True, {}
 
     def update(self, type, quantity):
@@ -342,6 +650,157 @@ class Ticket(models.Model):
 
         self.save()
 
+def _group_by_quantity(quantities):
+    """{evento: cantidad} -> {cantidad: [eventos]}, para tocar el inventario con un UPDATE por cantidad."""
+    groups = defaultdict(list)
+    for event_id, quantity in quantities.items():
+        groups[quantity].append(event_id)
+    return groups
+
+
+class Order(models.Model):
+    """Compra grupal: varias líneas (evento, tipo, cantidad) confirmadas juntas."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="orders")
+    created_at = models.DateTimeField(auto_now_add=True)
+    total = models.IntegerField(default=0)
+
+    MAX_LINES = 100
+
+    @classmethod
+    def validate_lines(cls, lines):
+        """Normaliza las líneas del carrito a (event_id, type, quantity). Devuelve (líneas, errors)."""
+        if not isinstance(lines, list) or not lines:
+            return [], {"lines": "El pedido debe tener al menos una línea"}
+        if len(lines) > cls.MAX_LINES:
+            return [], {"lines": f"Un pedido admite hasta {cls.MAX_LINES} líneas"}
+
+        parsed = []
+        errors = {}
+        for number, line in enumerate(lines, 1):
+            try:
+                event_id = int(line["event"])
+                quantity = int(line.get("quantity", 1))
+                ticket_type = line.get("type") or "general"
+            except (KeyError, TypeError, ValueError, AttributeError):
+                errors[f"line_{number}"] = "Cada línea necesita un evento y una cantidad válidos"
+                continue
+            if quantity <= 0:
+                errors[f"line_{number}"] = "La cantidad debe ser mayor a 0"
+            elif ticket_type not in Ticket.PRICES:
+                errors[f"line_{number}"] = "Tipo de entrada inválido"
+            else:
+                parsed.append((event_id, ticket_type, quantity))
+        return parsed, errors
+
+    @classmethod
+    def place(cls, user, lines):
+        """
+        Valida el carrito completo y crea todos sus tickets en una sola transacción.
+        El cupo y el límite por usuario se controlan una vez por pedido, con una cantidad
+        de consultas que no depende del número de líneas. Devuelve (order, None) o (None, errors).
+        """
+        lines, errors = cls.validate_lines(lines)
+        if errors:
+            return None, errors
+
+        quantities = defaultdict(int)
+        for event_id, _, quantity in lines:
+            quantities[event_id] += quantity
+
+        for event_id, quantity in quantities.items():
+            if quantity > Ticket.MAX_TICKETS_PER_USER:
+                errors[f"event_{event_id}"] = (
+                    f"No puedes comprar más de {Ticket.MAX_TICKETS_PER_USER} entradas por evento."
+                )
+        missing = set(quantities) - set(Event.objects.filter(pk__in=quantities).values_list("pk", flat=True))
+        for event_id in missing:
+            errors[f"event_{event_id}"] = "El evento no existe."
+        if errors:
+            return None, errors
+
+        with ExitStack() as stack:
+            for lock in reservation_locks(quantities):
+                stack.enter_context(lock)
+            order, errors = retry_on_lock(lambda: cls._place(user, lines, quantities))
+
+        if order is None:
+            return None, errors or cls._capacity_errors(quantities)
+
+        # Los eventos que se llenaron con este pedido pasan a Agotado
+        full = Event.objects.filter(pk__in=quantities, capacity__isnull=False, tickets_sold__gte=F("capacity"))
+        for event in full.exclude(status__in=["Agotado", "Cancelado"]):
+            event.check_and_update_agotado()
+        return order, None
+
+    @classmethod
+    def _place(cls, user, lines, quantities):
+        with transaction.atomic():
+            # Como en Ticket.reserve, el UPDATE condicional reserva los asientos y bloquea los
+            # eventos hasta el commit. Hay a lo sumo MAX_TICKETS_PER_USER cantidades distintas.
+            reserved = 0
+            for quantity, event_ids in _group_by_quantity(quantities).items():
+                reserved += (
+                    Event.objects.filter(pk__in=event_ids)
+                    .exclude(status="Cancelado")
+                    .filter(Q(capacity__isnull=True) | Q(tickets_sold__lte=F("capacity") - quantity))
+                    .update(tickets_sold=F("tickets_sold") + quantity)
+                )
+            if reserved != len(quantities):
+                # Los errores se arman después del rollback, con el inventario real
+                transaction.set_rollback(True)
+                return None, None
+
+            previous = dict(
+                Ticket.objects.filter(user=user, event_id__in=quantities)
+                .values("event")
+                .annotate(total=Sum("quantity"))
+                .values_list("event", "total")
+            )
+            errors = {}
+            for event_id, quantity in quantities.items():
+                already = previous.get(event_id, 0)
+                if already + quantity > Ticket.MAX_TICKETS_PER_USER:
+                    errors[f"event_{event_id}"] = (
+                        f"No puedes comprar más de {Ticket.MAX_TICKETS_PER_USER} entradas por evento. "
+                        f"Ya compraste {already} y solo puedes adquirir "
+                        f"{max(0, Ticket.MAX_TICKETS_PER_USER - already)} más."
+                    )
+            if errors:
+                transaction.set_rollback(True)
+                return None, errors
+
+            order = cls.objects.create(
+                user=user, total=sum(Ticket.PRICES[ticket_type] * quantity for _, ticket_type, quantity in lines)
+            )
+            # Los asientos ya se sumaron en la reserva: bulk_create no pasa por Ticket.save
+            Ticket.objects.bulk_create([
+                Ticket(order=order, user=user, event_id=event_id, type=ticket_type, quantity=quantity, ticket_code=code)
+                for (event_id, ticket_type, quantity), code in zip(lines, ticket_codes.allocate_many(len(lines)))
+            ])
+        return order, None
+
+    @classmethod
+    def _capacity_errors(cls, quantities):
+        errors = {}
+        for event in Event.objects.filter(pk__in=quantities).only("title", "status", "capacity", "tickets_sold"):
+            if event.status == "Cancelado":
+                errors[f"event_{event.pk}"] = f"No se pueden comprar entradas para {event.title}: el evento está cancelado."
+            elif event.capacity is not None and event.tickets_sold + quantities[event.pk] > event.capacity:
+                disponibles = max(0, event.capacity - event.tickets_sold)
+                errors[f"event_{event.pk}"] = f"No quedan entradas suficientes para {event.title}. Solo quedan {disponibles}."
+        return errors or {"capacity": "No quedan entradas disponibles."}
+
+    def cancel(self):
+        """
+        Anula el pedido: borra sus tickets y devuelve los asientos a cada evento. Los asientos
+        los devuelve el receptor post_delete de Ticket, uno por ticket borrado.
+        """
+        with transaction.atomic():
+            self.tickets.all().delete()
+            self.delete()
+
+
 class Rating(models.Model):
     title = models.CharField(max_length=100)
     text = models.TextField()
@@ -350,6 +809,34 @@ class Rating(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ratings")
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="ratings")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["event", "created_at", "id"], name="rating_event_recent_idx"),
+        ]
+
+    # Puntaje persistido, para aplicar solo la diferencia al resumen del evento
+    _saved_rating = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_rating = instance.__dict__.get("rating")
+        return instance
+
+    # El resumen lo ajustan los receptores de signals.py en la misma transacción que la escritura;
+    # acá solo se lee el puntaje persistido si no se cargó (campo diferido)
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            if not self._state.adding and self._saved_rating is None:
+                self._saved_rating = Rating.objects.values_list("rating", flat=True).get(pk=self.pk)
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            if self._saved_rating is None:
+                self._saved_rating = Rating.objects.values_list("rating", flat=True).get(pk=self.pk)
+            return super().delete(*args, **kwargs)
+
     @classmethod
     def validate(cls, rating,title):
         errors = {}
@@ -412,6 +899,10 @@ class RefoundRequest(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="refound_requests")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "status"], name="refound_user_status_idx"),
+        ]
 
     @classmethod
     def new(cls, amount, reason, refound_reason, ticket_code, user, status):
@@ -504,6 +995,8 @@ class Notification(models.Model):
         blank=True  # Añadí blank=True para formularios
     )
 
+    FAN_OUT_CHUNK_SIZE = 1000
+
     def __str__(self):
         user_count = self.users.count()
 
@@ -526,14 +1019,18 @@ class Notification(models.Model):
             errors["message"] = "Por favor ingrese un mensaje"
         if priority not in dict(cls.PRIORITY_CHOICES):
             errors["priority"] = "Prioridad inválida"
-        # Validación de usuarios
-        if not users:
+        # Validación de usuarios (con exists() para no traer todo el queryset)
+        if isinstance(users, models.QuerySet):
+            has_users = users.exists()
+        else:
+            has_users = bool(users)
+        if not has_users:
             errors["users"] = "Debe proporcionar al menos un usuario"
 
         return errors
 
     @classmethod
-    def new(cls, title, message, priority, users, event=None):
+    def new(cls, title, message, priority, users, event=None, background=False):
         errors = cls.validate(title, message, priority,users)
 
         if errors:
@@ -547,11 +1044,65 @@ class Notification(models.Model):
             event=event # Django se encarga del id internamente
         )
 
-#Esto actualiza la relación ManyToMany a través de la tabla intermedia 'NotificationUser
-        notification.users.set(users)
+        # Alta de destinatarios en la tabla intermedia 'NotificationUser' por lotes;
+        # con background=True se hace fuera del request
+        if background:
+            enqueue(notification.fan_out, users)
+        else:
+            notification.fan_out(users)
 
         return True, None
 
+    def fan_out(self, users, chunk_size=FAN_OUT_CHUNK_SIZE):
+        """
+        Inserta una fila NotificationUser por destinatario con bulk_create por lotes,
+        ignorando los que ya la tienen. Devuelve la cantidad de destinatarios nuevos.
+        """
+        if isinstance(users, models.QuerySet):
+            user_ids = users.order_by().values_list("pk", flat=True).distinct().iterator(chunk_size=chunk_size)
+        else:
+            user_ids = dict.fromkeys(getattr(user, "pk", user) for user in users)
+
+        total = 0
+        batch = []
+        for user_id in user_ids:
+            batch.append(user_id)
+            if len(batch) >= chunk_size:
+                total += self._insert_recipients(batch)
+                batch = []
+        if batch:
+            total += self._insert_recipients(batch)
+
+        return total
+
+    def _insert_recipients(self, user_ids):
+        # Los que ya tienen la fila (un reintento o dos altas solapadas) no suman al contador
+        existing = set(
+            NotificationUser.objects.filter(notification_id=self.pk, user_id__in=user_ids).values_list(
+                "user_id", flat=True
+            )
+        )
+        new_ids = [user_id for user_id in user_ids if user_id not in existing]
+        if not new_ids:
+            return 0
+        NotificationUser.objects.bulk_create(
+            [
+                NotificationUser(notification_id=self.pk, user_id=user_id, created_at=self.created_at)
+                for user_id in new_ids
+            ],
+            ignore_conflicts=True,
+        )
+        NotificationUser.adjust_unread(new_ids, 1)
+        return len(new_ids)
+
+    def delete(self, *args, **kwargs):
+        unread = list(
+            NotificationUser.objects.filter(notification=self, read=False).values_list("user_id", flat=True)
+        )
+        result = super().delete(*args, **kwargs)
+        NotificationUser.adjust_unread(unread, -1)
+        return result
+
     def update(self, title=None, message=None, priority=None, users=None, event=None):
         self.title = title or self.title
         self.message = message or self.message
@@ -564,23 +1115,94 @@ class Notification(models.Model):
         self.save()
 
         if users is not None:
-            # Actualizar la relación directa
-            self.users.set(users)
-            # Eliminar relaciones anteriores
-            NotificationUser.objects.filter(notification=self).delete()
+            self.set_recipients(users)
+
+    def set_recipients(self, users):
+        """
+        Deja como destinatarios exactamente a `users` aplicando solo la diferencia:
+        un DELETE para los que salen y alta por lotes de los nuevos. Los que siguen
+        conservan su estado de lectura.
+        """
+        if not isinstance(users, models.QuerySet):
+            users = User.objects.filter(pk__in=[getattr(user, "pk", user) for user in users])
+
+        user_ids = users.order_by().values("pk")
+        current = NotificationUser.objects.filter(notification=self)
 
-            # Crear nuevas relaciones
-            for user in users:
-                NotificationUser.objects.create(user=user, notification=self)
+        leaving = current.exclude(user_id__in=user_ids)
+        unread_leaving = list(leaving.filter(read=False).values_list("user_id", flat=True))
+        removed, _ = leaving.delete()
+        NotificationUser.adjust_unread(unread_leaving, -1)
+        added = self.fan_out(users.exclude(pk__in=current.values("user_id")))
+
+        return added, removed
 
 class NotificationUser(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     notification = models.ForeignKey('Notification', on_delete=models.CASCADE)
     read = models.BooleanField(default=False)
     read_at = models.DateTimeField(null=True, blank=True)
+    # Copia de notification.created_at para ordenar la bandeja sin join
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    # El contador cacheado expira igual, para corregir cualquier desfasaje
+    UNREAD_CACHE_TIMEOUT = 60 * 10
 
     class Meta:
         unique_together = ('user', 'notification')
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"], name="notifuser_inbox_idx"),
+            models.Index(fields=["user", "read", "created_at", "id"], name="notifuser_inbox_read_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.notification_id:
+            self.created_at = self.notification.created_at
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def unread_cache_key(user_id):
+        return f"notifications:unread:{user_id}"
+
+    @classmethod
+    def unread_count(cls, user_id):
+        """Cantidad de notificaciones no leídas del usuario, desde cache si está disponible."""
+        key = cls.unread_cache_key(user_id)
+        count = cache.get(key)
+        if count is None or count < 0:
+            count = cls.objects.filter(user_id=user_id, read=False).count()
+            cache.set(key, count, cls.UNREAD_CACHE_TIMEOUT)
+        return count
+
+    @classmethod
+    def adjust_unread(cls, user_ids, delta):
+        """
+        Ajusta los contadores cacheados; los que no están en cache se calculan al leerlos.
+
+        Un solo usuario se ajusta con un incr atómico. Para varios se borran sus contadores en una
+        sola llamada al cache y cada uno se recalcula con un COUNT la próxima vez que se lee.
+        """
+        user_ids = list(user_ids)
+        if len(user_ids) == 1:
+            try:
+                cache.incr(cls.unread_cache_key(user_ids[0]), delta)
+            except ValueError:
+                pass
+        elif user_ids:
+            cache.delete_many([cls.unread_cache_key(user_id) for user_id in user_ids])
+
+    def mark_read(self):
+        updated = NotificationUser.objects.filter(pk=self.pk, read=False).update(
+            read=True, read_at=timezone.now()
+        )
+        if updated:
+            NotificationUser.adjust_unread([self.user_id], -1)
+
+    @classmethod
+    def mark_all_read(cls, user):
+        updated = cls.objects.filter(user=user, read=False).update(read=True, read_at=timezone.now())
+        if updated:
+            cls.adjust_unread([user.pk], -updated)
 
 class Favorite(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="favorites")
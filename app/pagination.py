@@ -0,0 +1,89 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 20
+
+
+class KeysetPage:
+    """
+    Página acotada de resultados obtenida por paginación keyset (cursor).
+    A diferencia de OFFSET, el costo de pedir la página N es el mismo que el de la primera.
+    """
+
+    def __init__(self, object_list, has_next, next_cursor, is_first):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __contains__(self, item):
+        return item in self.object_list
+
+
+def encode_cursor(values):
+    raw = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, model, keys):
+    """Devuelve los valores del cursor convertidos al tipo de cada campo, o None si es inválido."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            return None
+        return [model._meta.get_field(key).to_python(value) for key, value in zip(keys, raw)]
+    except (binascii.Error, ValueError, ValidationError, FieldDoesNotExist):
+        return None
+
+
+def keyset_filter(keys, values, descending=False):
+    """
+    Arma la condición "fila posterior al cursor" para un orden compuesto, por ejemplo
+    (scheduled_at, id) > (v1, v2). El último campo de `keys` debe ser único.
+    """
+    lookup = "lt" if descending else "gt"
+    condition = Q()
+    for i, key in enumerate(keys):
+        previous = {keys[j]: values[j] for j in range(i)}
+        condition |= Q(**previous, **{f"{key}__{lookup}": values[i]})
+
+    # Rango redundante sobre el primer campo para que el motor pueda usar el índice
+    bound = "lte" if descending else "gte"
+    return Q(**{f"{keys[0]}__{bound}": values[0]}) & condition
+
+
+def keyset_paginate(queryset, keys, cursor=None, per_page=PAGE_SIZE, descending=False):
+    """
+    Pagina `queryset` ordenándolo por `keys` a partir de `cursor`.
+    Solo trae `per_page + 1` filas para saber si existe una página siguiente.
+    """
+    values = decode_cursor(cursor, queryset.model, keys)
+
+    ordering = [f"-{key}" if descending else key for key in keys]
+    queryset = queryset.order_by(*ordering)
+    if values is not None:
+        queryset = queryset.filter(keyset_filter(keys, values, descending))
+
+    rows = list(queryset[: per_page + 1])
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, key) for key in keys])
+
+    return KeysetPage(rows, has_next, next_cursor, is_first=values is None)
@@ -0,0 +1,76 @@
+import threading
+
+from .cache import bump_version, get_or_compute, get_version
+from .models import Category, Venue
+
+# El contenido se invalida por versión; el TTL solo acota cambios hechos por fuera del ORM
+REFERENCE_DATA_TIMEOUT = 60 * 60
+
+
+class ReferenceData:
+    """
+    Lista de datos de referencia (categorías, locaciones) cacheada en dos niveles:
+    memoria del proceso y cache compartido, ambos atados a una versión que se incrementa
+    al guardar o borrar un registro (ver signals.py).
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.namespace = f"reference:{name}"
+        self._local = None  # (versión, valores)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def get(self):
+        version = get_version(self.namespace)
+
+        local = self._local
+        if local is not None and local[0] == version:
+            self._count("local_hits")
+            return local[1]
+
+        computed = False
+
+        def load():
+            nonlocal computed
+            computed = True
+            return self.loader()
+
+        values = get_or_compute(f"{self.namespace}:{version}", load, REFERENCE_DATA_TIMEOUT)
+        self._count("misses" if computed else "shared_hits")
+
+        self._local = (version, values)
+        return values
+
+    def invalidate(self):
+        self._local = None
+        bump_version(self.namespace)
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        self._stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+
+active_categories = ReferenceData("categories", lambda: list(Category.objects.filter(is_active=True)))
+venues = ReferenceData("venues", lambda: list(Venue.objects.all()))
+
+
+def get_active_categories():
+    return active_categories.get()
+
+
+def get_venues():
+    return venues.get()
+
+
+def stats():
+    """Contadores de aciertos y fallos de cada lista, por nivel de cache."""
+    return {store.name: store.stats() for store in (active_categories, venues)}
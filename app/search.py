@@ -0,0 +1,154 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+
+from .models import Event
+
+# Resultados de búsqueda por pedido; se ordenan por relevancia, no se paginan por cursor
+SEARCH_LIMIT = 50
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Palabras tan frecuentes que no ayudan a rankear y encarecen la consulta
+STOPWORDS = frozenset(
+    "a al con de del el en es la las lo los o para por que se su sus un una y".split()
+)
+
+
+def search_terms(query):
+    """Palabras de la consulta del usuario, sin operadores, signos ni palabras vacías."""
+    terms = _TERM_RE.findall((query or "").lower())[:10]
+    return [term for term in terms if term not in STOPWORDS] or terms
+
+
+class SearchBackend:
+    """Interfaz de los backends de búsqueda de eventos."""
+
+    def index(self, event):
+        """Agrega o actualiza el evento en el índice."""
+
+    def remove(self, event_id):
+        """Quita el evento del índice."""
+
+    def rebuild(self):
+        """Reconstruye el índice completo. Devuelve la cantidad de eventos indexados."""
+        return 0
+
+    def search(self, queryset, query, limit):
+        """Hasta `limit` eventos de `queryset` que coinciden con `query`, por relevancia."""
+        raise NotImplementedError
+
+
+class SqliteFtsBackend(SearchBackend):
+    """
+    Búsqueda sobre la tabla virtual FTS5 app_event_fts (rowid = id del evento), con bm25.
+    Los filtros de `queryset` se aplican dentro de la consulta FTS (rowid IN ...), así la
+    ventana de `rank_window` coincidencias más nuevas, que acota el costo de términos muy
+    frecuentes, solo contiene eventos visibles.
+    """
+
+    table = "app_event_fts"
+    rank_window = 5000
+    chunk_size = 200
+
+    def index(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [event.pk])
+            cursor.execute(
+                f"INSERT INTO {self.table}(rowid, title, description) VALUES (%s, %s, %s)",
+                [event.pk, event.title, event.description],
+            )
+
+    def remove(self, event_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [event_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table}(rowid, title, description) SELECT id, title, description FROM app_event"
+            )
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')")
+        return Event.objects.count()
+
+    @staticmethod
+    def match_expression(terms):
+        # Cada palabra entre comillas, así la entrada del usuario nunca es sintaxis FTS;
+        # la última como prefijo para buscar mientras se escribe
+        quoted = ['"{}"'.format(term) for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def ranked_ids(self, query, queryset=None):
+        """Ids de los eventos de `queryset` (todos si es None) que coinciden, por relevancia."""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        condition, params = "", []
+        if queryset is not None:
+            subquery, params = queryset.order_by().values("pk").query.sql_with_params()
+            # Con "+" la condición no se pasa a FTS5, que si no la usaría para recorrer por rowid
+            # y evaluar el MATCH fila por fila
+            condition = f" AND +rowid IN ({subquery})"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM ("
+                f"SELECT rowid, rank FROM {self.table} WHERE {self.table} MATCH %s{condition} "
+                f"ORDER BY rowid DESC LIMIT %s"
+                f") ORDER BY rank",
+                [self.match_expression(terms), *params, self.rank_window],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def search(self, queryset, query, limit):
+        ids = self.ranked_ids(query, queryset)
+        results = []
+        # Un evento pudo dejar de ser visible entre las dos consultas: se completa por bloques
+        for start in range(0, len(ids), self.chunk_size):
+            chunk = ids[start:start + self.chunk_size]
+            found = queryset.in_bulk(chunk)
+            results.extend(found[pk] for pk in chunk if pk in found)
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+
+class SimpleSearchBackend(SearchBackend):
+    """
+    Respaldo para motores sin un índice configurado: icontains sobre título y descripción,
+    primero las coincidencias en el título.
+    """
+
+    def search(self, queryset, query, limit):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        condition = Q()
+        in_title = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(description__icontains=term)
+            in_title &= Q(title__icontains=term)
+        queryset = (
+            queryset.filter(condition)
+            .annotate(title_rank=Case(When(in_title, then=Value(0)), default=Value(1), output_field=IntegerField()))
+            .order_by("title_rank", "scheduled_at", "id")
+        )
+        return list(queryset[:limit])
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    path = getattr(settings, "SEARCH_BACKEND", "")
+    if not path:
+        path = "app.search.SqliteFtsBackend" if connection.vendor == "sqlite" else "app.search.SimpleSearchBackend"
+    return import_string(path)()
+
+
+def search_events(queryset, query, limit=SEARCH_LIMIT):
+    """Eventos de `queryset` que coinciden con `query`, de más a menos relevante."""
+    return get_backend().search(queryset, query, limit)
@@ -0,0 +1,127 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import checkin, reference_data, search
+from .cache import bump_version, event_detail_namespace
+from .models import Category, Comment, Event, Rating, RatingSummary, Ticket, User, Venue
+
+
+def _invalidate_event_detail(event_id):
+    namespace = event_detail_namespace(event_id)
+    bump_version(namespace)
+    # Otra vez al confirmar: un request concurrente pudo cachear datos previos al commit
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_event_detail(sender, instance, **kwargs):
+    _invalidate_event_detail(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Rating)
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_event_detail_from_related(sender, instance, **kwargs):
+    _invalidate_event_detail(instance.event_id)
+
+
+def _invalidate_event_details(events):
+    for event_id in events.values_list("pk", flat=True).iterator():
+        _invalidate_event_detail(event_id)
+
+
+# El detalle cachea el nombre del organizador y de la categoría: al renombrarlos se
+# invalidan sus eventos. Los guardados que no cambian el nombre (por ejemplo last_login) no.
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._cached_username = instance.__dict__.get("username")
+
+
+@receiver(post_save, sender=User)
+def invalidate_organizer_events(sender, instance, created=False, **kwargs):
+    if not created and instance.username != instance._cached_username:
+        _invalidate_event_details(Event.objects.filter(organizer_id=instance.pk))
+    instance._cached_username = instance.username
+
+
+@receiver(post_init, sender=Category)
+def remember_category_name(sender, instance, **kwargs):
+    instance._cached_name = instance.__dict__.get("name")
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category_events(sender, instance, created=False, **kwargs):
+    if not created and instance.name != instance._cached_name:
+        _invalidate_event_details(Event.objects.filter(category_id=instance.pk))
+    instance._cached_name = instance.name
+
+
+@receiver(post_save, sender=Rating)
+def add_rating_to_summary(sender, instance, created=False, raw=False, **kwargs):
+    # loaddata (raw) no ajusta el resumen: se reconstruye con rebuild_rating_summaries
+    if raw:
+        return
+    new = int(instance.rating)
+    RatingSummary.apply(instance.event_id, old=None if created else instance._saved_rating, new=new)
+    instance._saved_rating = new
+
+
+@receiver(post_delete, sender=Rating)
+def remove_rating_from_summary(sender, instance, **kwargs):
+    # Corre por cada fila también en cascadas (al borrar el usuario o el evento)
+    old = instance._saved_rating
+    if old is None:
+        old = instance.__dict__.get("rating")
+    if old is not None:
+        RatingSummary.apply(instance.event_id, old=int(old))
+    instance._saved_rating = None
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(sender, **kwargs):
+    reference_data.active_categories.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Venue)
+def invalidate_venues(sender, **kwargs):
+    reference_data.venues.invalidate()
+
+
+def _search_text(event):
+    # Desde __dict__ para no disparar consultas por campos diferidos
+    return event.__dict__.get("title"), event.__dict__.get("description")
+
+
+@receiver(post_init, sender=Event)
+def remember_indexed_text(sender, instance, **kwargs):
+    instance._indexed_text = _search_text(instance)
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, created=False, **kwargs):
+    # Los guardados que no cambian título ni descripción (por ejemplo el estado) no reindexan
+    text = _search_text(instance)
+    if not created and text == instance._indexed_text:
+        return
+    search.get_backend().index(instance)
+    instance._indexed_text = text
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    search.get_backend().remove(instance.pk)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seats(sender, instance, **kwargs):
+    # Corre por cada fila también en cascadas (al borrar el comprador) y en queryset.delete()
+    quantity = instance._saved_quantity
+    if quantity is None:
+        quantity = instance.__dict__.get("quantity") or 0
+    if quantity:
+        Event.release_seats(instance.event_id, quantity)
+
+
+@receiver(post_delete, sender=Ticket)
+def forget_checkin_code(sender, instance, **kwargs):
+    checkin.forget(instance.event_id, instance.ticket_code)
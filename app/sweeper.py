@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+
+def sweep_event_status(batch_size=BATCH_SIZE, dry_run=False, now=None):
+    """
+    Finaliza por lotes todos los eventos cuya fecha ya pasó.
+    Devuelve un resumen con filas, lotes, segundos y filas por segundo.
+    """
+    now = now or timezone.now()
+    started = time.perf_counter()
+    rows = 0
+    batches = 0
+
+    if dry_run:
+        rows = Event.due_for_finalization(now).count()
+    else:
+        while True:
+            updated = Event.finalize_due_batch(batch_size, now)
+            rows += updated
+            batches += 1
+            if updated < batch_size:
+                break
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "batches": batches,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0,
+        "dry_run": dry_run,
+    }
+
+
+class StatusSweeper(threading.Thread):
+    """Hilo en segundo plano que ejecuta el barrido de estados cada `interval` segundos."""
+
+    def __init__(self, interval, batch_size=BATCH_SIZE):
+        super().__init__(name="event-status-sweeper", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                result = sweep_event_status(self.batch_size)
+                if result["rows"]:
+                    logger.info("Eventos finalizados: %(rows)s en %(seconds).2fs", result)
+            except DatabaseError:
+                logger.exception("Falló el barrido de estados de eventos")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def start_sweeper(interval, batch_size=BATCH_SIZE):
+    """Inicia el barrido en proceso una sola vez por proceso."""
+    global _sweeper
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = StatusSweeper(interval, batch_size)
+            _sweeper.start()
+        return _sweeper
+
+
+def start_configured_sweeper():
+    """
+    Inicia el barrido en proceso si EVENT_STATUS_SWEEP_INTERVAL > 0. Lo llaman wsgi.py y
+    asgi.py, así corre solo en el proceso que sirve pedidos y no en migrate, shell ni tests.
+    """
+    interval = getattr(settings, "EVENT_STATUS_SWEEP_INTERVAL", 0)
+    if interval > 0:
+        return start_sweeper(interval)
+    return None
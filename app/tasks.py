@@ -0,0 +1,55 @@
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _run():
+    while True:
+        func, args, kwargs = _queue.get()
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception("Falló la tarea en segundo plano %s", getattr(func, "__name__", func))
+        finally:
+            # Las conexiones son por hilo: se liberan las del worker entre tareas
+            connections.close_all()
+            _queue.task_done()
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, name="eventhub-tasks", daemon=True)
+            _worker.start()
+
+
+def enqueue(func, *args, **kwargs):
+    """
+    Ejecuta `func` fuera del ciclo del request, en un hilo del mismo proceso.
+    La tarea se encola recién cuando la transacción actual hace commit, para que el
+    worker vea los datos. Con TASKS_EAGER (tests) se ejecuta en el momento.
+    """
+    if getattr(settings, "TASKS_EAGER", False):
+        func(*args, **kwargs)
+        return
+
+    def submit():
+        _ensure_worker()
+        _queue.put((func, args, kwargs))
+
+    transaction.on_commit(submit)
+
+
+def join():
+    """Espera a que terminen las tareas encoladas."""
+    _queue.join()
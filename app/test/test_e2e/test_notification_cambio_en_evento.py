@@ -1,5 +1,6 @@
 from datetime import timedelta
 
+from django.test import override_settings
 from django.utils import timezone
 from playwright.sync_api import expect
 
@@ -7,6 +8,7 @@ from app.models import Category, Event, Notification, NotificationUser, Ticket,
 from app.test.test_e2e.base import BaseE2ETest
 
 
+@override_settings(TASKS_EAGER=True)
 class BaseEventNotificationTest(BaseE2ETest):
     """
     Configuración-> usuarios, evento, venue, categoría y ticket inicial.
@@ -52,3 +52,27 @@ class OrganizerRatingVisibilityTest(TestCase):
 
         expected_avg = (3 + 5) / 2
         self.assertAlmostEqual(response.context["promedio_rating"], expected_avg, places=2)
+
+
+class RatingSummaryViewsTest(OrganizerRatingVisibilityTest):
+    """Las vistas de calificaciones mantienen el resumen que muestra el detalle del evento"""
+
+    def test_detalle_no_recorre_calificaciones(self):
+        self.client.login(username="organizer", password="pass")
+        response = self.client.get(reverse("event_detail", args=[self.event.pk]))
+
+        summary = response.context["rating_summary"]
+        self.assertEqual((summary.count, summary.star_3, summary.star_5), (2, 1, 1))
+        self.assertContains(response, "Calificaciones y Reseñas (2)")
+
+    def test_editar_y_borrar_desde_las_vistas(self):
+        rating = Rating.objects.get(user=self.user1)
+        self.client.login(username="user1", password="pass")
+
+        self.client.post(reverse("rating_update", args=[self.event.pk, rating.pk]), {"rating": "1"})
+        self.event.rating_summary.refresh_from_db()
+        self.assertEqual((self.event.rating_summary.total, self.event.rating_summary.star_1), (6, 1))
+
+        self.client.post(reverse("rating_delete", args=[self.event.pk, rating.pk]))
+        self.event.rating_summary.refresh_from_db()
+        self.assertEqual((self.event.rating_summary.count, self.event.rating_summary.total), (1, 5))
@@ -0,0 +1,191 @@
+import datetime
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app import checkin, ticket_codes
+from app.models import Event, Ticket, User
+
+
+class CheckinBaseTest(TestCase):
+    """Clase base para las pruebas del registro de ingresos en la puerta"""
+
+    def setUp(self):
+        checkin.clear()
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.buyer = User.objects.create_user(username="comprador", password="password123")
+        self.event = self.crear_evento("Evento")
+        self.otro_evento = self.crear_evento("Otro evento")
+        self.code1, self.code2, self.code3, self.otro1 = ticket_codes.allocate_many(4)
+        self.ticket = self.crear_ticket(self.code1)
+        self.crear_ticket(self.code2)
+        self.crear_ticket(self.otro1, event=self.otro_evento)
+        self.client = Client()
+        self.client.force_login(self.organizer)
+
+    def crear_evento(self, title):
+        return Event.objects.create(
+            title=title, description="Descripción", organizer=self.organizer,
+            scheduled_at=timezone.now() + datetime.timedelta(days=1), capacity=100,
+        )
+
+    def crear_ticket(self, code, event=None):
+        return Ticket.objects.create(user=self.buyer, event=event or self.event, ticket_code=code)
+
+    def escanear(self, code):
+        return self.client.post(reverse("ticket_checkin", args=[self.event.pk]), {"ticket_code": code}).json()
+
+    def sincronizar(self, scans):
+        return self.client.post(
+            reverse("ticket_checkin_batch", args=[self.event.pk]),
+            json.dumps({"scans": scans}),
+            content_type="application/json",
+        )
+
+
+class CheckinTest(CheckinBaseTest):
+    """Escaneos de a uno"""
+
+    def test_registra_el_ingreso(self):
+        data = self.escanear(self.code1)
+
+        self.assertEqual(data["result"], checkin.CHECKED_IN)
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.checked_in_at.isoformat(), data["checked_in_at"])
+
+    def test_reescanear_es_idempotente(self):
+        primero = self.escanear(self.code1)
+        index = checkin.get_index(self.event.pk)
+
+        # El re-escaneo se responde desde memoria
+        with self.assertNumQueries(0):
+            result, checked_in_at = index.scan(self.code1)
+
+        self.assertEqual(result, checkin.ALREADY_CHECKED_IN)
+        self.assertEqual(checked_in_at.isoformat(), primero["checked_in_at"])
+        self.assertEqual(self.escanear(self.code1)["result"], checkin.ALREADY_CHECKED_IN)
+
+    def test_codigo_inexistente_o_de_otro_evento(self):
+        self.assertEqual(self.escanear(self.code3)["result"], checkin.INVALID)
+        self.assertEqual(self.escanear(self.otro1)["result"], checkin.INVALID)
+
+    def test_codigo_normalizado(self):
+        tipeado = "-".join([self.code1[:6], self.code1[6:12], self.code1[12:]]).lower()
+
+        data = self.escanear(f" {tipeado} ")
+
+        self.assertEqual(data["result"], checkin.CHECKED_IN)
+        self.assertEqual(data["ticket_code"], self.code1)
+
+    def test_codigo_mal_formado(self):
+        # Un carácter cambiado: el dígito verificador no coincide
+        mal_leido = self.code1[:-2] + ("0" if self.code1[-2] != "0" else "1") + self.code1[-1]
+
+        for code in (mal_leido, "no-existe"):
+            index = checkin.get_index(self.event.pk)
+            with self.assertNumQueries(2):  # Solo la sesión y el usuario
+                response = self.client.post(reverse("ticket_checkin", args=[self.event.pk]), {"ticket_code": code})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()["result"], checkin.MALFORMED)
+            self.assertIs(checkin.get_index(self.event.pk), index)
+
+    def test_codigos_anteriores_a_ticket_codes(self):
+        self.crear_ticket("LEGACY-1")
+
+        self.assertEqual(self.escanear("LEGACY-1")["result"], checkin.CHECKED_IN)
+
+    def test_ticket_comprado_despues_de_cargar_el_indice(self):
+        self.escanear(self.code1)
+        self.crear_ticket(self.code3)
+
+        self.assertEqual(self.escanear(self.code3)["result"], checkin.CHECKED_IN)
+
+    def test_ticket_borrado_despues_de_cargar_el_indice(self):
+        self.escanear(self.code2)
+        self.ticket.delete()
+
+        self.assertEqual(self.escanear(self.code1)["result"], checkin.INVALID)
+
+    def test_ingreso_registrado_por_otro_proceso(self):
+        self.escanear(self.code2)
+        antes = timezone.now() - datetime.timedelta(minutes=5)
+        Ticket.objects.filter(pk=self.ticket.pk).update(checked_in_at=antes)
+
+        data = self.escanear(self.code1)
+
+        self.assertEqual(data["result"], checkin.ALREADY_CHECKED_IN)
+        self.assertEqual(data["checked_in_at"], antes.isoformat())
+
+    def test_solo_el_organizador_del_evento(self):
+        otro = User.objects.create_user(username="otro", password="password123", is_organizer=True)
+        self.client.force_login(otro)
+
+        response = self.client.post(reverse("ticket_checkin", args=[self.event.pk]), {"ticket_code": self.code1})
+
+        self.assertEqual(response.status_code, 403)
+        self.ticket.refresh_from_db()
+        self.assertIsNone(self.ticket.checked_in_at)
+
+    def test_evento_inexistente(self):
+        response = self.client.post(reverse("ticket_checkin", args=[self.event.pk + 100]), {"ticket_code": "x"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_solo_post(self):
+        response = self.client.get(reverse("ticket_checkin", args=[self.event.pk]))
+
+        self.assertEqual(response.status_code, 405)
+
+
+class CheckinBatchTest(CheckinBaseTest):
+    """Sincronización por lotes de lectores sin conexión"""
+
+    def test_sincroniza_escaneos(self):
+        scanned_at = timezone.now() - datetime.timedelta(minutes=10)
+        self.escanear(self.code2)
+
+        response = self.sincronizar([
+            {"ticket_code": self.code1, "scanned_at": scanned_at.isoformat()},
+            {"ticket_code": self.code1.lower()},
+            {"ticket_code": "mal-leido"},
+            {"ticket_code": self.code2},
+            {"ticket_code": self.otro1},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [r["result"] for r in data["results"]],
+            [
+                checkin.CHECKED_IN, checkin.ALREADY_CHECKED_IN, checkin.MALFORMED,
+                checkin.ALREADY_CHECKED_IN, checkin.INVALID,
+            ],
+        )
+        self.assertEqual(
+            data["summary"],
+            {checkin.CHECKED_IN: 1, checkin.ALREADY_CHECKED_IN: 2, checkin.INVALID: 1, checkin.MALFORMED: 1},
+        )
+        # Vale el momento del escaneo en el lector, no el de la sincronización
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.checked_in_at, scanned_at)
+
+    def test_consultas_por_bloque(self):
+        codes = [self.code1, self.code2, *ticket_codes.allocate_many(297)]
+        Ticket.objects.bulk_create(Ticket(user=self.buyer, event=self.event, ticket_code=code) for code in codes[2:])
+        scans = [{"ticket_code": code} for code in codes]
+
+        # Sesión y usuario, carga del índice, un executemany, una lectura y el savepoint del lote
+        with self.assertNumQueries(2 + 2 + 1 + 1 + 2):
+            response = self.sincronizar(scans)
+
+        self.assertEqual(response.json()["summary"][checkin.CHECKED_IN], 299)
+        self.assertEqual(Ticket.objects.filter(event=self.event, checked_in_at__isnull=True).count(), 0)
+
+    def test_formato_invalido(self):
+        for body in ("no es json", json.dumps({"otra": []}), json.dumps({"scans": [{"scanned_at": "ayer"}]})):
+            response = self.client.post(
+                reverse("ticket_checkin_batch", args=[self.event.pk]), body, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 400)
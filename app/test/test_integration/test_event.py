@@ -1,11 +1,27 @@
 import datetime
 from datetime import timedelta
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
-from app.models import Category, Event, Ticket, User, Venue
+from app import reference_data
+from app.models import (
+    Category,
+    Comment,
+    Event,
+    Favorite,
+    NotificationUser,
+    Rating,
+    Ticket,
+    User,
+    Venue,
+)
+from app.pagination import PAGE_SIZE
+from app.views import DETAIL_PAGE_SIZE
 
 
 class BaseEventTestCase(TestCase):
@@ -115,6 +131,182 @@ class EventsListViewTest(BaseEventTestCase):
         self.assertNotIn(past_event, response.context["events"])
 
 
+class EventsPaginationTest(BaseEventTestCase):
+    """Tests para la paginación por cursor del listado de eventos"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username="regular", password="password123")
+        base = timezone.now() + datetime.timedelta(days=3)
+        # Eventos con la misma fecha para verificar el desempate por id
+        for i in range(25):
+            Event.objects.create(
+                title=f"Evento paginado {i}",
+                description="Descripción",
+                scheduled_at=base + datetime.timedelta(hours=i // 2),
+                organizer=self.organizer,
+            )
+
+    def _recorrer_paginas(self, params):
+        vistos = []
+        cursor = None
+        while True:
+            query = dict(params)
+            if cursor:
+                query["cursor"] = cursor
+            response = self.client.get(reverse("events"), query)
+            self.assertEqual(response.status_code, 200)
+            page = response.context["page"]
+            self.assertLessEqual(len(page), PAGE_SIZE)
+            vistos.extend(event.pk for event in page)
+            if not page.has_next:
+                return vistos
+            cursor = page.next_cursor
+
+    def test_primera_pagina_acotada(self):
+        """La primera página trae como máximo PAGE_SIZE eventos y ofrece cursor siguiente"""
+        response = self.client.get(reverse("events"))
+        page = response.context["page"]
+        self.assertEqual(len(response.context["events"]), PAGE_SIZE)
+        self.assertTrue(page.has_next)
+        self.assertTrue(page.is_first)
+        self.assertIsNotNone(page.next_cursor)
+
+    def test_navegacion_conserva_los_filtros(self):
+        """La barra de paginación compartida arma los enlaces con los parámetros actuales"""
+        response = self.client.get(reverse("events"), {"order": "desc"})
+        cursor = response.context["page"].next_cursor
+
+        self.assertContains(response, 'aria-label="Paginación de eventos"')
+        self.assertContains(response, f'href="?order=desc&amp;cursor={cursor}"')
+        self.assertNotContains(response, "Primera página")
+
+        response = self.client.get(reverse("events"), {"order": "desc", "cursor": cursor})
+        self.assertContains(response, 'href="?order=desc"')
+
+    def test_recorrer_todas_las_paginas_ascendente(self):
+        """Recorrer todas las páginas devuelve cada evento una sola vez y en orden"""
+        vistos = self._recorrer_paginas({})
+        esperados = list(
+            Event.objects.order_by("scheduled_at", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(vistos, esperados)
+
+    def test_recorrer_todas_las_paginas_descendente(self):
+        """El orden descendente también se respeta entre páginas"""
+        vistos = self._recorrer_paginas({"order": "desc"})
+        esperados = list(
+            Event.objects.order_by("-scheduled_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(vistos, esperados)
+
+    def test_paginacion_respeta_filtros(self):
+        """La paginación mantiene los filtros de categoría"""
+        otros = Event.objects.filter(title__startswith="Evento paginado")[:3]
+        Event.objects.filter(pk__in=[e.pk for e in otros]).update(category=self.category)
+
+        vistos = self._recorrer_paginas({"category": self.category.pk})
+        self.assertEqual(sorted(vistos), sorted(e.pk for e in otros))
+
+    def test_cursor_invalido_devuelve_primera_pagina(self):
+        """Un cursor inválido se ignora y se muestra la primera página"""
+        response = self.client.get(reverse("events"), {"cursor": "no-es-un-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["page"].is_first)
+
+
+class EventsSearchTest(BaseEventTestCase):
+    """Tests de la búsqueda de eventos"""
+
+    def setUp(self):
+        super().setUp()
+        self.event1.title = "Concierto de tango"
+        self.event1.save()
+        Event.objects.create(
+            title="Tango del pasado",
+            description="Ya ocurrió",
+            scheduled_at=timezone.now() - datetime.timedelta(days=1),
+            organizer=self.organizer,
+        )
+        self.client.login(username="regular", password="password123")
+
+    def test_busqueda_en_el_listado(self):
+        response = self.client.get(reverse("events"), {"q": "tango"})
+
+        self.assertEqual([e.title for e in response.context["events"]], ["Concierto de tango"])
+        self.assertEqual(response.context["search_query"], "tango")
+        self.assertFalse(response.context["page"].has_next)
+
+    def test_endpoint_json(self):
+        response = self.client.get(reverse("event_search"), {"q": "tango"})
+
+        resultados = response.json()["results"]
+        self.assertEqual([r["title"] for r in resultados], ["Concierto de tango"])
+        self.assertEqual(resultados[0]["url"], reverse("event_detail", args=[self.event1.id]))
+
+    def test_endpoint_sin_consulta(self):
+        self.assertEqual(self.client.get(reverse("event_search")).json()["results"], [])
+
+
+class EventsQueryCountTest(BaseEventTestCase):
+    """Tests que verifican que el listado de eventos usa una cantidad fija de consultas"""
+
+    # sesión + usuario + página de eventos; categorías y locaciones salen del cache
+    EXPECTED_QUERIES = 3
+
+    def setUp(self):
+        super().setUp()
+        # El contador de no leídas y las listas de referencia se sirven desde cache una vez calculados
+        cache.clear()
+        NotificationUser.unread_count(self.regular_user.pk)
+        reference_data.get_active_categories()
+        reference_data.get_venues()
+
+    def _crear_eventos(self, cantidad):
+        Event.objects.all().delete()
+        base = timezone.now() + datetime.timedelta(days=1)
+        Event.objects.bulk_create(
+            Event(
+                title=f"Evento {i}",
+                description="Descripción",
+                scheduled_at=base + datetime.timedelta(minutes=i),
+                organizer=self.organizer,
+                category=self.category,
+                venue=self.venue,
+            )
+            for i in range(cantidad)
+        )
+
+    def _assert_consultas_constantes(self, cantidad):
+        self._crear_eventos(cantidad)
+        self.client.login(username="regular", password="password123")
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(reverse("events"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.category.name)
+        self.assertContains(response, self.venue.name)
+
+    def test_consultas_con_1_evento(self):
+        self._assert_consultas_constantes(1)
+
+    def test_consultas_con_100_eventos(self):
+        self._assert_consultas_constantes(100)
+
+    def test_consultas_con_1000_eventos(self):
+        self._assert_consultas_constantes(1000)
+
+    def test_consultas_con_favoritos(self):
+        """Marcar favoritos no agrega consultas"""
+        self._crear_eventos(100)
+        for event in Event.objects.all()[:10]:
+            Favorite.objects.create(user=self.regular_user, event=event)
+        self.client.login(username="regular", password="password123")
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(reverse("events"), {"favorites_only": "on"})
+        self.assertEqual(len(response.context["events"]), 10)
+        self.assertTrue(all(event.is_favorite for event in response.context["events"]))
+
+
 class EventDetailViewTest(BaseEventTestCase):
     """Tests para la vista de detalle de un evento"""
 
@@ -196,6 +388,196 @@ def test_event_detail_verificate_countdown(self):
     # Verificar que el evento es futuro
     self.assertTrue(future_event.scheduled_at > timezone.now())
 
+class EventDetailCommentsPaginationTest(BaseEventTestCase):
+    """Tests de la paginación de comentarios y reseñas en el detalle del evento"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client.login(username="regular", password="password123")
+
+    def _crear_comentarios(self, cantidad):
+        Comment.objects.bulk_create(
+            Comment(title=f"Comentario {i}", text="Texto", user=self.regular_user, event=self.event1)
+            for i in range(cantidad)
+        )
+
+    def _consultas_del_detalle(self):
+        self.client.get(reverse("event_detail", args=[self.event1.id]))
+        # Se mide el render completo, sin los fragmentos cacheados
+        cache.clear()
+        NotificationUser.unread_count(self.regular_user.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_primera_pagina_acotada(self):
+        self._crear_comentarios(DETAIL_PAGE_SIZE + 5)
+
+        response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+
+        self.assertEqual(len(response.context["todos_los_comentarios"]), DETAIL_PAGE_SIZE)
+        self.assertTrue(response.context["comments_page"].has_next)
+        self.assertContains(response, f"Comentario {DETAIL_PAGE_SIZE + 4}")
+        self.assertNotContains(response, "Comentario 0<")
+
+    def test_cargar_mas_devuelve_fragmento(self):
+        self._crear_comentarios(DETAIL_PAGE_SIZE + 5)
+        detalle = self.client.get(reverse("event_detail", args=[self.event1.id]))
+        cursor = detalle.context["comments_page"].next_cursor
+
+        response = self.client.get(reverse("event_comments", args=[self.event1.id]), {"cursor": cursor})
+
+        self.assertTemplateUsed(response, "app/partials/comment_list.html")
+        self.assertNotContains(response, "<html")
+        self.assertEqual(len(response.context["comments"]), 5)
+        self.assertContains(response, "Comentario 0<")
+        self.assertNotContains(response, "load-more")
+
+    def test_cargar_mas_en_json(self):
+        self._crear_comentarios(DETAIL_PAGE_SIZE + 5)
+
+        primera = self.client.get(reverse("event_comments", args=[self.event1.id]), {"format": "json"}).json()
+        segunda = self.client.get(
+            reverse("event_comments", args=[self.event1.id]),
+            {"format": "json", "cursor": primera["next_cursor"]},
+        ).json()
+
+        titulos = [c["title"] for c in primera["results"] + segunda["results"]]
+        self.assertEqual(titulos, [f"Comentario {i}" for i in reversed(range(DETAIL_PAGE_SIZE + 5))])
+        self.assertIsNone(segunda["next_cursor"])
+        self.assertEqual(primera["results"][0]["user"], "regular")
+
+    def test_resenas_en_json(self):
+        Rating.objects.create(user=self.regular_user, event=self.event1, rating=4, title="Buena", text="Texto")
+
+        data = self.client.get(reverse("event_ratings", args=[self.event1.id]), {"format": "json"}).json()
+
+        self.assertEqual([(r["title"], r["rating"]) for r in data["results"]], [("Buena", 4)])
+
+    def test_consultas_no_dependen_de_la_cantidad(self):
+        self._crear_comentarios(3)
+        pocas = self._consultas_del_detalle()
+
+        self._crear_comentarios(200)
+        Rating.objects.bulk_create(
+            Rating(user=self.organizer, event=self.event1, rating=5, title="R", text="T") for _ in range(50)
+        )
+        muchas = self._consultas_del_detalle()
+
+        self.assertEqual(pocas, muchas)
+
+
+class EventDetailFragmentCacheTest(BaseEventTestCase):
+    """Tests del cache de fragmentos del detalle de evento"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.event1.category = self.category
+        self.event1.save()
+        Comment.objects.create(title="Primer comentario", text="Texto", user=self.organizer, event=self.event1)
+        self.client.login(username="regular", password="password123")
+        self.url = reverse("event_detail", args=[self.event1.id])
+
+    def _consultas(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, [q["sql"] for q in ctx.captured_queries]
+
+    def test_segunda_visita_no_consulta_fragmentos(self):
+        _, primera = self._consultas()
+        response, segunda = self._consultas()
+
+        self.assertLess(len(segunda), len(primera))
+        self.assertFalse(any("app_comment" in sql or "app_category" in sql for sql in segunda))
+        self.assertContains(response, "Primer comentario")
+        self.assertContains(response, self.category.name)
+
+    def test_nuevo_comentario_invalida(self):
+        self.client.get(self.url)
+
+        Comment.objects.create(title="Comentario nuevo", text="Texto", user=self.regular_user, event=self.event1)
+
+        self.assertContains(self.client.get(self.url), "Comentario nuevo")
+
+    def test_editar_evento_invalida(self):
+        self.client.get(self.url)
+
+        self.event1.description = "Descripción actualizada"
+        self.event1.save()
+
+        self.assertContains(self.client.get(self.url), "Descripción actualizada")
+
+    def test_nueva_resena_invalida(self):
+        self.client.get(self.url)
+
+        Rating.objects.create(user=self.regular_user, event=self.event1, rating=4, title="Reseña nueva", text="Texto")
+
+        response = self.client.get(self.url)
+        self.assertContains(response, "Reseña nueva")
+        self.assertContains(response, "Calificaciones y Reseñas (1)")
+
+    def test_renombrar_categoria_invalida(self):
+        self.client.get(self.url)
+
+        self.category.name = "Congreso"
+        self.category.save()
+
+        self.assertContains(self.client.get(self.url), "Congreso")
+
+    def test_renombrar_organizador_invalida(self):
+        self.client.get(self.url)
+
+        self.organizer.username = "productora"
+        self.organizer.save()
+
+        self.assertContains(self.client.get(self.url), "productora")
+
+    def test_login_del_organizador_no_invalida(self):
+        self.client.get(self.url)
+
+        self.client.login(username="organizador", password="password123")
+        self.client.login(username="regular", password="password123")
+
+        _, consultas = self._consultas()
+        self.assertFalse(any("app_comment" in sql for sql in consultas))
+
+    def test_compra_de_tickets_no_invalida(self):
+        """Las entradas vendidas se muestran fuera de los fragmentos cacheados"""
+        self.client.get(self.url)
+
+        Ticket.objects.create(user=self.regular_user, event=self.event1, ticket_code="CACHE1", quantity=1)
+
+        _, consultas = self._consultas()
+        self.assertFalse(any("app_comment" in sql for sql in consultas))
+
+    def test_controles_por_usuario_fuera_del_cache(self):
+        self.client.get(self.url)
+        self.client.logout()
+        self.client.login(username="organizador", password="password123")
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, f'[data-owner="{self.organizer.pk}"] .owner-only')
+        self.assertContains(response, ".event-moderator { display: inline-block !important; }")
+        self.assertContains(response, 'id="detail-action-form"')
+
+    def test_comentario_invalido_muestra_errores(self):
+        """Un comentario vacío vuelve al detalle con los errores, con los fragmentos cacheados"""
+        self.client.get(self.url)
+
+        response = self.client.post(reverse("crear_comentario", args=[self.event1.id]), {"title": "", "text": ""})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "El título es requerido")
+        self.assertContains(response, "El texto es requerido")
+        self.assertContains(response, "Primer comentario")
+        self.assertEqual(Comment.objects.filter(event=self.event1).count(), 1)
+
+
 class EventFormViewTest(BaseEventTestCase):
     """Tests para la vista del formulario de eventos"""
 
@@ -440,6 +822,7 @@ class EventStatusIntegrationTest(BaseEventTestCase):
 
     def test_evento_agotado_y_vuelve_a_activo(self):
         self.event1.capacity=5
+        self.event1.save()
         self.client.login(username="organizador", password="password123")
         Ticket.objects.create(
             event=self.event1,
@@ -471,3 +854,23 @@ class EventStatusIntegrationTest(BaseEventTestCase):
 
         self.event1.refresh_from_db()
         self.assertEqual(self.event1.status, "Activo")
+
+    def test_detalle_de_evento_finalizado_no_escribe(self):
+        """Ver un evento ya finalizado no vuelve a guardarlo"""
+        self.client.login(username="organizador", password="password123")
+        self.event1.scheduled_at = timezone.now() - timedelta(days=3)
+        self.event1.save()
+
+        self.client.get(reverse("event_detail", args=[self.event1.pk]))
+        self.event1.refresh_from_db()
+        self.assertEqual(self.event1.status, "Finalizado")
+        updated_at = self.event1.updated_at
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("event_detail", args=[self.event1.pk]))
+        self.assertEqual(response.status_code, 200)
+
+        escrituras = [q["sql"] for q in queries if q["sql"].startswith("UPDATE \"app_event\"")]
+        self.assertEqual(escrituras, [])
+        self.event1.refresh_from_db()
+        self.assertEqual(self.event1.updated_at, updated_at)
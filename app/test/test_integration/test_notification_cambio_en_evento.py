@@ -1,12 +1,17 @@
 import datetime
 
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from app.models import Category, Event, Notification, Ticket, User, Venue
+from app import tasks
+from app.models import Category, Event, Notification, NotificationUser, Ticket, User, Venue
+from app.pagination import PAGE_SIZE
 
 
+# Las notificaciones por cambio de evento se envían en el momento, sin el hilo de tareas
+@override_settings(TASKS_EAGER=True)
 class BaseTest(TestCase):
     def setUp(self):
         self.client = Client()
@@ -166,4 +171,111 @@ class EventEditNoNotificationTest(BaseTest):
         self.assertLessEqual(
             notifications_count, 1,
             "No debería haberse creado más de una notificación si no hubo cambios."
-        )
\ No newline at end of file
+        )
+
+
+@override_settings(TASKS_EAGER=False)
+class UnreadBadgeTest(BaseTest):
+    """Tests del badge de notificaciones no leídas en el navbar"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.notif = Notification.objects.create(title="Aviso", message="Mensaje", priority="LOW")
+        self.notif.fan_out([self.user])
+        self.client.login(username="usuario_test", password="password123")
+
+    def test_badge_muestra_no_leidas(self):
+        response = self.client.get(reverse("events"))
+
+        self.assertEqual(response.context["unread_notifications_count"](), 1)
+        self.assertContains(response, 'aria-label="Notificaciones sin leer">1</span>', html=False)
+
+    def test_marcar_leida_actualiza_badge(self):
+        relacion = NotificationUser.objects.get(notification=self.notif, user=self.user)
+
+        self.client.post(reverse("mark_notification_read", args=[relacion.id]))
+        response = self.client.get(reverse("user_notifications"))
+
+        self.assertEqual(response.context["unread_count"], 0)
+        self.assertNotContains(response, "Notificaciones sin leer")
+
+
+class UserNotificationsInboxTest(BaseTest):
+    """Tests de la bandeja de notificaciones paginada"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        base = timezone.now()
+        for i in range(PAGE_SIZE + 5):
+            notif = Notification.objects.create(title=f"Aviso {i}", message=f"Mensaje {i}", priority="LOW")
+            Notification.objects.filter(pk=notif.pk).update(created_at=base - datetime.timedelta(minutes=i))
+            notif.refresh_from_db()
+            notif.fan_out([self.user])
+        # Las 5 más viejas quedan leídas
+        NotificationUser.objects.filter(user=self.user, created_at__lt=base - datetime.timedelta(minutes=PAGE_SIZE - 1)).update(read=True)
+        self.client.login(username="usuario_test", password="password123")
+
+    def test_recorrer_paginas_en_orden(self):
+        response = self.client.get(reverse("user_notifications"))
+        primera = response.context["not_users"]
+        self.assertEqual(len(primera), PAGE_SIZE)
+        self.assertEqual(primera[0].notification.title, "Aviso 0")
+        self.assertTrue(response.context["page"].has_next)
+
+        response = self.client.get(reverse("user_notifications"), {"cursor": response.context["page"].next_cursor})
+        segunda = response.context["not_users"]
+        self.assertEqual([n.notification.title for n in segunda], [f"Aviso {i}" for i in range(PAGE_SIZE, PAGE_SIZE + 5)])
+        self.assertFalse(response.context["page"].has_next)
+
+    def test_filtro_solo_no_leidas(self):
+        response = self.client.get(reverse("user_notifications"), {"unread": "1"})
+
+        self.assertEqual(len(response.context["not_users"]), PAGE_SIZE)
+        self.assertTrue(all(not n.read for n in response.context["not_users"]))
+        self.assertFalse(response.context["page"].has_next)
+
+    def test_consultas_no_dependen_de_la_cantidad(self):
+        NotificationUser.unread_count(self.user.pk)
+        # sesión + usuario + página (con notificación y evento en el mismo join)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("user_notifications"))
+        self.assertContains(response, "Mensaje 0")
+
+    def test_copia_fecha_de_la_notificacion(self):
+        relacion = NotificationUser.objects.select_related("notification").filter(user=self.user).first()
+        self.assertEqual(relacion.created_at, relacion.notification.created_at)
+
+
+@override_settings(TASKS_EAGER=False)
+class EventChangeNotificationBackgroundTest(TransactionTestCase):
+    """El envío por cambio de evento se hace fuera del request, después del commit"""
+
+    def setUp(self):
+        self.organizer = User.objects.create(username="organizador_bg", is_organizer=True)
+        self.event = Event.objects.create(
+            title="Evento masivo",
+            description="Descripción",
+            scheduled_at=timezone.now() + datetime.timedelta(days=5),
+            organizer=self.organizer,
+        )
+        User.objects.bulk_create(User(username=f"asistente_bg{i}") for i in range(50))
+        Ticket.objects.bulk_create(
+            Ticket(user=user, event=self.event, ticket_code=f"BG{user.pk}", quantity=1)
+            for user in User.objects.filter(username__startswith="asistente_bg")
+        )
+
+    def test_notificacion_se_envia_en_segundo_plano(self):
+        success, _ = self.event.update(
+            title=None,
+            description=None,
+            scheduled_at=self.event.scheduled_at + datetime.timedelta(days=1),
+            organizer=self.organizer,
+        )
+        self.assertTrue(success)
+
+        tasks.join()
+
+        notif = Notification.objects.get(event=self.event)
+        self.assertEqual(notif.users.count(), 50)
@@ -0,0 +1,165 @@
+import datetime
+import json
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from app import ticket_codes
+from app.models import Event, Order, Ticket, User
+
+PAYMENT = {
+    "card_number": "4111111111111111",
+    "card_expiry": "12/30",
+    "card_cvv": "123",
+    "card_name": "Empresa SA",
+}
+
+
+class OrderBaseTest(TestCase):
+    """Clase base para las pruebas de compras grupales"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.buyer = User.objects.create_user(username="empresa", password="password123")
+        self.event = self.crear_evento("Evento 1", capacity=10)
+        self.event2 = self.crear_evento("Evento 2", capacity=10)
+        self.client = Client()
+        self.client.force_login(self.buyer)
+
+    def crear_evento(self, title, capacity=100, **kwargs):
+        return Event.objects.create(
+            title=title, description="Descripción", organizer=self.organizer,
+            scheduled_at=timezone.now() + datetime.timedelta(days=5), capacity=capacity, **kwargs,
+        )
+
+    def comprar(self, lines, payment=PAYMENT):
+        return self.client.post(
+            reverse("order_create"), json.dumps({"lines": lines, "payment": payment}), content_type="application/json"
+        )
+
+    def vendidos(self, event):
+        event.refresh_from_db()
+        return event.tickets_sold
+
+
+class OrderCreateTest(OrderBaseTest):
+    """Un pedido crea todas sus líneas o ninguna"""
+
+    def test_pedido_con_varias_lineas(self):
+        response = self.comprar([
+            {"event": self.event.pk, "type": "general", "quantity": 2},
+            {"event": self.event.pk, "type": "vip", "quantity": 1},
+            {"event": self.event2.pk, "type": "vip", "quantity": 3},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        order = Order.objects.get(pk=data["order"])
+        self.assertEqual(order.total, 2 * 50 + 100 + 3 * 100)
+        self.assertEqual(data["total"], order.total)
+        self.assertEqual(order.tickets.count(), 3)
+        self.assertTrue(all(ticket_codes.is_valid(t["ticket_code"]) for t in data["tickets"]))
+        self.assertEqual((self.vendidos(self.event), self.vendidos(self.event2)), (3, 3))
+
+    def test_sin_cupo_no_se_crea_nada(self):
+        chico = self.crear_evento("Chico", capacity=1)
+
+        response = self.comprar([
+            {"event": self.event.pk, "quantity": 2},
+            {"event": chico.pk, "quantity": 2},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f"event_{chico.pk}", response.json()["errors"])
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Ticket.objects.exists())
+        self.assertEqual((self.vendidos(self.event), self.vendidos(chico)), (0, 0))
+
+    def test_limite_por_usuario_contando_compras_previas(self):
+        Ticket.objects.create(user=self.buyer, event=self.event, ticket_code="PREVIO", quantity=3)
+
+        response = self.comprar([{"event": self.event.pk, "quantity": 1}, {"event": self.event.pk, "quantity": 1}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Ya compraste 3", response.json()["errors"][f"event_{self.event.pk}"])
+        self.assertEqual(self.vendidos(self.event), 3)
+
+    def test_limite_por_usuario_dentro_del_pedido(self):
+        response = self.comprar([{"event": self.event.pk, "quantity": 3}, {"event": self.event.pk, "quantity": 2}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_evento_cancelado_o_inexistente(self):
+        cancelado = self.crear_evento("Cancelado", status="Cancelado")
+
+        response = self.comprar([{"event": cancelado.pk, "quantity": 1}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cancelado", response.json()["errors"][f"event_{cancelado.pk}"])
+
+        response = self.comprar([{"event": cancelado.pk + 100, "quantity": 1}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_lineas_invalidas(self):
+        for lines in ([], [{"quantity": 1}], [{"event": self.event.pk, "quantity": 0}],
+                      [{"event": self.event.pk, "type": "platea"}], "no es una lista"):
+            response = self.comprar(lines)
+            self.assertEqual(response.status_code, 400, lines)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_pago_que_no_es_un_objeto(self):
+        for payment in (["4111111111111111"], "4111111111111111", 123):
+            response = self.comprar([{"event": self.event.pk, "quantity": 1}], payment=payment)
+
+            self.assertEqual(response.status_code, 400, payment)
+            self.assertIn("payment", response.json()["errors"])
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.vendidos(self.event), 0)
+
+    def test_pago_rechazado_libera_los_asientos(self):
+        response = self.comprar([{"event": self.event.pk, "quantity": 2}], payment={"card_number": "123"})
+
+        self.assertEqual(response.status_code, 402)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(Ticket.objects.exists())
+        self.assertEqual(self.vendidos(self.event), 0)
+
+    def test_evento_lleno_pasa_a_agotado(self):
+        chico = self.crear_evento("Chico", capacity=2)
+
+        self.comprar([{"event": chico.pk, "quantity": 2}])
+
+        chico.refresh_from_db()
+        self.assertEqual(chico.status, "Agotado")
+
+    def test_cancelar_pedido(self):
+        order, _ = Order.place(self.buyer, [{"event": self.event.pk, "quantity": 2}, {"event": self.event2.pk}])
+
+        order.cancel()
+
+        self.assertFalse(Ticket.objects.exists())
+        self.assertEqual((self.vendidos(self.event), self.vendidos(self.event2)), (0, 0))
+
+
+class OrderQueriesTest(OrderBaseTest):
+    """El costo de un pedido no depende de la cantidad de líneas"""
+
+    def contar_consultas(self, lines):
+        with CaptureQueriesContext(connection) as queries:
+            order, errors = Order.place(self.buyer, lines)
+        self.assertIsNone(errors)
+        return len(queries)
+
+    def test_cincuenta_lineas_mismas_consultas_que_una(self):
+        una = self.contar_consultas([{"event": self.event.pk, "quantity": 1}])
+
+        eventos = [self.crear_evento(f"Evento grupal {i}") for i in range(12)]
+        lineas = [{"event": event.pk, "type": "vip" if i % 2 else "general"} for event in eventos for i in range(4)]
+        muchas = self.contar_consultas(lineas)
+
+        self.assertEqual(len(lineas), 48)
+        self.assertEqual(muchas, una)
+        self.assertEqual(Ticket.objects.filter(order__isnull=False).count(), 49)
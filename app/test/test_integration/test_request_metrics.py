@@ -0,0 +1,104 @@
+import datetime
+import json
+import os
+
+from django.conf import settings
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app import reference_data
+from app.models import Event, RefoundRequest, Ticket, User
+
+
+@override_settings(
+    REQUEST_METRICS_SAMPLE_RATE=1.0,
+    REQUEST_METRICS_QUERY_BUDGET=50,
+    REQUEST_METRICS_LATENCY_BUDGET_MS=60_000,
+    REQUEST_METRICS_DUPLICATE_THRESHOLD=3,
+)
+class RequestMetricsMiddlewareTest(TestCase):
+    """Pruebas del middleware que mide consultas y tiempos por pedido"""
+
+    def setUp(self):
+        self.client = Client()
+        self.organizer = User.objects.create_user(username="organizer", password="pass", is_organizer=True)
+        self.client.force_login(self.organizer)
+        event = Event.objects.create(
+            title="Evento", description="Descripción", organizer=self.organizer,
+            scheduled_at=timezone.now() + datetime.timedelta(days=3),
+        )
+        for i in range(4):
+            user = User.objects.create_user(username=f"user{i}", password="pass")
+            ticket = Ticket.objects.create(user=user, event=event, ticket_code=f"code-{i}")
+            RefoundRequest.objects.create(
+                amount=50, reason="Motivo", ticket_code=ticket.ticket_code, ticket=ticket, user=user
+            )
+
+    def get(self, name):
+        with self.assertLogs("app.metrics", "INFO") as logs:
+            response = self.client.get(reverse(name))
+        self.assertEqual(len(logs.records), 1)
+        return response, logs.records[0], json.loads(logs.records[0].getMessage())
+
+    def test_publica_server_timing_y_log(self):
+        response, _, record = self.get("categorias")
+
+        timing = response["Server-Timing"]
+        for metric in ("db;dur=", "tpl;dur=", "view;dur=", "total;dur="):
+            self.assertIn(metric, timing)
+        self.assertIn(f'desc="{record["queries"]} consultas"', timing)
+
+        self.assertEqual(record["view"], "categorias")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["queries"], 0)
+        self.assertGreater(record["template_ms"], 0)
+        # Los cuatro valores están redondeados a 2 decimales: hasta 4 × 0.005 ms de error, más margen
+        self.assertLessEqual(record["db_ms"] + record["template_ms"] + record["view_ms"], record["total_ms"] + 0.025)
+
+    def test_incluye_aciertos_del_cache_de_referencia(self):
+        reference_data.active_categories.reset_stats()
+
+        _, _, primero = self.get("event_form")
+        _, _, segundo = self.get("event_form")
+
+        self.assertEqual(segundo["pid"], os.getpid())
+        self.assertEqual(set(segundo["reference_data"]), {"categories", "venues"})
+        categorias = primero["reference_data"]["categories"]
+        self.assertEqual(sum(categorias.values()), 1)
+        self.assertEqual(segundo["reference_data"]["categories"]["local_hits"], categorias["local_hits"] + 1)
+
+    def test_detecta_consultas_repetidas(self):
+        _, log, record = self.get("refound_admin")
+
+        self.assertEqual(log.levelname, "WARNING")
+        self.assertTrue(record["duplicates"])
+        self.assertTrue(all(d["count"] >= 3 for d in record["duplicates"]))
+        self.assertTrue(any('FROM "app_ticket"' in d["sql"] for d in record["duplicates"]))
+
+    @override_settings(REQUEST_METRICS_QUERY_BUDGET=1, REQUEST_METRICS_LATENCY_BUDGET_MS=0)
+    def test_pedido_fuera_de_presupuesto(self):
+        _, log, record = self.get("categorias")
+
+        self.assertEqual(log.levelname, "WARNING")
+        self.assertEqual(record["over_budget"], ["queries", "latency"])
+
+    @override_settings(REQUEST_METRICS_SERVER_TIMING=False)
+    def test_server_timing_desactivado(self):
+        response, _, _ = self.get("categorias")
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_pedidos_no_muestreados(self):
+        with self.assertNoLogs("app.metrics"):
+            response = self.client.get(reverse("categorias"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class RequestMetricsTestSettingsTest(SimpleTestCase):
+    """El runner de tests desactiva el muestreo sin depender de la línea de comandos"""
+
+    def test_muestreo_desactivado_en_tests(self):
+        self.assertEqual(settings.REQUEST_METRICS_SAMPLE_RATE, 0)
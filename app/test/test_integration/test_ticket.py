@@ -1,11 +1,18 @@
 import datetime
+import threading
+from contextlib import nullcontext
+from unittest import mock
 
+from django.db import connection
 from django.db.models import Sum
-from django.test import Client, TestCase
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
+from app import ticket_codes
 from app.models import Event, Ticket, User
+from app.pagination import PAGE_SIZE
 
 
 class CompraTicketLimiteTest(TestCase):
@@ -137,3 +144,175 @@ class PruebaTicketInt(CompraTicketLimiteTest):
 
         total_tickets = Ticket.objects.filter(user=self.user, event=self.event2).aggregate(total=Sum('quantity'))['total']
         self.assertEqual(total_tickets, 3) 
+
+
+class CompraConcurrenteTest(TransactionTestCase):
+    """Compras simultáneas: el cupo y el límite por usuario se respetan bajo concurrencia"""
+
+    COMPRADORES = 200
+
+    def setUp(self):
+        self.organizer = User.objects.create(username="organizador", is_organizer=True)
+        User.objects.bulk_create(
+            User(username=f"comprador{i}") for i in range(self.COMPRADORES)
+        )
+        self.compradores = list(User.objects.filter(username__startswith="comprador"))
+        self.event = Event.objects.create(
+            title="Evento con preventa",
+            description="Descripción",
+            scheduled_at=timezone.now() + datetime.timedelta(days=10),
+            organizer=self.organizer,
+            capacity=50,
+        )
+
+    def _comprar_en_paralelo(self, compras):
+        barrera = threading.Barrier(len(compras))
+        resultados = []
+        errores = []
+
+        def comprar(user, quantity, code):
+            try:
+                barrera.wait()
+                ticket, _ = Ticket.reserve(code, quantity, user, self.event)
+                resultados.append(ticket)
+            except Exception as e:  # noqa: BLE001
+                errores.append(e)
+            finally:
+                connection.close()
+
+        hilos = [
+            threading.Thread(target=comprar, args=compra) for compra in compras
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        return [ticket for ticket in resultados if ticket is not None]
+
+    def test_no_hay_sobreventa_con_200_compradores(self):
+        compras = [(user, 1, f"CONC{i}") for i, user in enumerate(self.compradores)]
+
+        vendidos = self._comprar_en_paralelo(compras)
+
+        self.event.refresh_from_db()
+        total = Ticket.objects.filter(event=self.event).aggregate(total=Sum("quantity"))["total"]
+        self.assertEqual(len(vendidos), 50)
+        self.assertEqual(total, 50)
+        self.assertEqual(self.event.tickets_sold, 50)
+
+    def test_no_hay_sobreventa_sin_el_lock_del_proceso(self):
+        """Sin la fila en memoria compiten en la base, como procesos distintos: alcanza el UPDATE"""
+        compras = [(user, 1, f"SINLOCK{i}") for i, user in enumerate(self.compradores[:80])]
+
+        with mock.patch("app.models.reservation_lock", lambda event_id: nullcontext()):
+            vendidos = self._comprar_en_paralelo(compras)
+
+        self.event.refresh_from_db()
+        total = Ticket.objects.filter(event=self.event).aggregate(total=Sum("quantity"))["total"]
+        self.assertEqual(len(vendidos), 50)
+        self.assertEqual(total, 50)
+        self.assertEqual(self.event.tickets_sold, 50)
+
+    def test_limite_por_usuario_bajo_concurrencia(self):
+        user = self.compradores[0]
+        compras = [(user, 1, f"MISMO{i}") for i in range(10)]
+
+        vendidos = self._comprar_en_paralelo(compras)
+
+        self.event.refresh_from_db()
+        self.assertEqual(len(vendidos), Ticket.MAX_TICKETS_PER_USER)
+        self.assertEqual(self.event.tickets_sold, Ticket.MAX_TICKETS_PER_USER)
+
+
+class ListadoTicketsTest(TestCase):
+    """Los listados de tickets usan una cantidad fija de consultas y se paginan por cursor"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.user = User.objects.create_user(username="usuario", password="password123")
+        self.event = Event.objects.create(
+            title="Evento", description="Descripción", organizer=self.organizer,
+            scheduled_at=timezone.now() + datetime.timedelta(days=5), capacity=1000,
+        )
+        self.client = Client()
+
+    def crear_tickets(self, cantidad, start=0):
+        for i in range(start, start + cantidad):
+            event = Event.objects.create(
+                title=f"Evento {i}", description="Descripción", organizer=self.organizer,
+                scheduled_at=timezone.now() + datetime.timedelta(days=5),
+            )
+            Ticket.objects.create(user=self.user, event=event, ticket_code=f"mis-{i}", quantity=2,
+                                  type="vip" if i % 2 else "general")
+            buyer = User.objects.create_user(username=f"comprador{i}", password="password123")
+            Ticket.objects.create(user=buyer, event=self.event, ticket_code=f"org-{i}")
+
+    def contar_consultas(self, url):
+        # El primer pedido llena el cache del contador de notificaciones
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_mis_tickets_consultas_constantes(self):
+        self.client.force_login(self.user)
+        self.crear_tickets(2)
+        pocas = self.contar_consultas(reverse("Mis_tickets"))
+
+        self.crear_tickets(15, start=2)
+
+        self.assertEqual(self.contar_consultas(reverse("Mis_tickets")), pocas)
+
+    def test_tickets_del_evento_consultas_constantes(self):
+        self.client.force_login(self.organizer)
+        url = reverse("tickets", args=[self.event.pk])
+        self.crear_tickets(2)
+        pocas = self.contar_consultas(url)
+
+        self.crear_tickets(15, start=2)
+
+        self.assertEqual(self.contar_consultas(url), pocas)
+
+    def test_precios_calculados_en_la_consulta(self):
+        self.client.force_login(self.user)
+        self.crear_tickets(2)
+
+        response = self.client.get(reverse("Mis_tickets"))
+
+        precios = {ticket.ticket_code: (ticket.unit_price, ticket.total_price) for ticket in response.context["tickets"]}
+        self.assertEqual(precios, {"mis-0": (50, 100), "mis-1": (100, 200)})
+
+    def test_paginacion_por_cursor(self):
+        self.client.force_login(self.organizer)
+        self.crear_tickets(PAGE_SIZE + 5)
+        url = reverse("tickets", args=[self.event.pk])
+
+        primera = self.client.get(url)
+        self.assertEqual(len(primera.context["tickets"]), PAGE_SIZE)
+        self.assertTrue(primera.context["page"].has_next)
+
+        segunda = self.client.get(url, {"cursor": primera.context["page"].next_cursor})
+        self.assertEqual(len(segunda.context["tickets"]), 5)
+        self.assertFalse(segunda.context["page"].has_next)
+
+        codigos = [t.ticket_code for t in primera.context["tickets"]] + [t.ticket_code for t in segunda.context["tickets"]]
+        self.assertEqual(len(set(codigos)), PAGE_SIZE + 5)
+
+
+class CodigoTicketServidorTest(CompraTicketLimiteTest):
+    """El código del ticket lo genera el servidor, sin importar lo que envíe el formulario"""
+
+    def test_ignora_el_codigo_enviado(self):
+        Ticket.objects.create(ticket_code="REPETIDO", quantity=1, user=self.organizer, event=self.event2)
+
+        response = self.client.post(
+            self.ticket_url2, {"quantity": 1, "ticket_code": "REPETIDO", "type": "general", **self._get_payment_data()}
+        )
+
+        self.assertEqual(response.status_code, 302)
+        ticket = Ticket.objects.filter(user=self.user, event=self.event2).get()
+        self.assertNotEqual(ticket.ticket_code, "REPETIDO")
+        self.assertTrue(ticket_codes.is_valid(ticket.ticket_code))
@@ -0,0 +1,78 @@
+import csv
+import datetime
+import io
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app import exports
+from app.models import Event, Ticket, User
+
+
+class ExportarTicketsTest(TestCase):
+    """Pruebas de la exportación de tickets de un evento en CSV y NDJSON"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.event = Event.objects.create(
+            title="Evento", description="Descripción", organizer=self.organizer,
+            scheduled_at=timezone.now() + datetime.timedelta(days=5), capacity=100,
+        )
+        for i in range(5):
+            user = User.objects.create_user(
+                username=f"asistente{i}", email=f"asistente{i}@example.com", password="password123"
+            )
+            Ticket.objects.create(user=user, event=self.event, ticket_code=f"code-{i}", quantity=2,
+                                  type="vip" if i == 0 else "general")
+        self.url = reverse("tickets_export", args=[self.event.pk])
+        self.client = Client()
+        self.client.force_login(self.organizer)
+
+    def contenido(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_exporta_csv(self):
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn(f"tickets-evento-{self.event.pk}.csv", response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(self.contenido(response))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(
+            {key: rows[0][key] for key in ("ticket_code", "username", "email", "type", "unit_price", "total_price")},
+            {"ticket_code": "code-0", "username": "asistente0", "email": "asistente0@example.com",
+             "type": "vip", "unit_price": "100", "total_price": "200"},
+        )
+
+    def test_exporta_ndjson(self):
+        response = self.client.get(self.url, {"format": "ndjson"})
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [json.loads(line) for line in self.contenido(response).splitlines()]
+        self.assertEqual([row["ticket_code"] for row in rows], [f"code-{i}" for i in range(5)])
+        self.assertEqual(set(rows[0]), set(exports.TICKET_EXPORT_FIELDS))
+
+    def test_encabezado_antes_de_consultar(self):
+        response = self.client.get(self.url)
+        content = iter(response.streaming_content)
+
+        with self.assertNumQueries(0):
+            header = next(content)
+        self.assertEqual(header.decode().strip(), ",".join(exports.TICKET_EXPORT_FIELDS))
+
+    def test_fragmentos_acotados(self):
+        chunks = list(exports.stream_csv(exports.TICKET_EXPORT_FIELDS, exports.ticket_rows(self.event.pk), chunk_size=2))
+
+        # Encabezado y tres fragmentos de a lo sumo dos filas
+        self.assertEqual(len(chunks), 4)
+
+    def test_solo_el_organizador_del_evento(self):
+        otro = User.objects.create_user(username="otro", password="password123", is_organizer=True)
+        self.client.force_login(otro)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from app import benchmarks
+from app.models import Ticket
+
+
+def result(p95_ms=10.0, queries=5, memory_kb=100):
+    return {"p50_ms": p95_ms / 2, "p95_ms": p95_ms, "p99_ms": p95_ms, "queries": queries, "memory_kb": memory_kb}
+
+
+class CompareBaselineTest(SimpleTestCase):
+    """Pruebas de la comparación de resultados contra la línea base"""
+
+    def setUp(self):
+        self.baseline = {"routes": {"events": result()}}
+
+    def test_sin_cambios_no_hay_regresiones(self):
+        self.assertEqual(benchmarks.compare({"routes": {"events": result()}}, self.baseline), [])
+
+    def test_una_consulta_mas_es_regresion(self):
+        regressions = benchmarks.compare({"routes": {"events": result(queries=6)}}, self.baseline)
+        self.assertEqual(regressions, [("events", "queries", 5, 6)])
+
+    def test_latencia_dentro_de_la_tolerancia(self):
+        self.assertEqual(benchmarks.compare({"routes": {"events": result(p95_ms=11.5)}}, self.baseline), [])
+
+    def test_latencia_fuera_de_la_tolerancia(self):
+        regressions = benchmarks.compare({"routes": {"events": result(p95_ms=13.0)}}, self.baseline)
+        self.assertEqual(regressions, [("events", "p95_ms", 10.0, 13.0)])
+
+    def test_diferencias_minimas_de_latencia_son_ruido(self):
+        baseline = {"routes": {"events": result(p95_ms=1.0)}}
+        self.assertEqual(benchmarks.compare({"routes": {"events": result(p95_ms=1.8)}}, baseline), [])
+
+    def test_memoria_fuera_de_la_tolerancia(self):
+        regressions = benchmarks.compare({"routes": {"events": result(memory_kb=150)}}, self.baseline, threshold=0.2)
+        self.assertEqual(regressions, [("events", "memory_kb", 100, 150)])
+
+    def test_rutas_nuevas_no_se_comparan(self):
+        self.assertEqual(benchmarks.compare({"routes": {"categorias": result(queries=50)}}, self.baseline), [])
+
+
+class RunBenchmarksTest(TestCase):
+    """Las rutas se miden sobre datos de seed_perf sin dejar cambios en la base"""
+
+    def setUp(self):
+        call_command(
+            "seed_perf", stdout=StringIO(), users=20, organizers=2, categories=2, venues=2, events=40,
+            tickets=100, ratings=20, comments=20, favorites=20, refunds=5, notifications=3, deliveries=20,
+        )
+
+    def test_mide_todas_las_rutas(self):
+        tickets = Ticket.objects.count()
+
+        results = benchmarks.run(requests=2, warmup=1)
+
+        self.assertEqual(set(results["routes"]), {route.name for route in benchmarks.ROUTES})
+        for route in results["routes"].values():
+            self.assertEqual(route["requests"], 2)
+            self.assertGreater(route["queries"], 0)
+            self.assertGreater(route["memory_kb"], 0)
+            self.assertLessEqual(route["p50_ms"], route["p95_ms"])
+        # Las compras del benchmark se revierten
+        self.assertEqual(Ticket.objects.count(), tickets)
+
+    def test_prefijo_inexistente(self):
+        with self.assertRaises(ValueError):
+            benchmarks.run(prefix="otro")
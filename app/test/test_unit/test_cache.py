@@ -0,0 +1,81 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from app.cache import bump_version, get_or_compute, get_version, jittered, versioned_key
+
+
+class CacheApiTest(SimpleTestCase):
+    """Pruebas de la API de cache de la app"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_versioned_key_cambia_al_incrementar(self):
+        antes = versioned_key("eventos", 1)
+
+        bump_version("eventos")
+
+        self.assertNotEqual(versioned_key("eventos", 1), antes)
+        self.assertTrue(antes.startswith("eventos:"))
+
+    def test_version_perdida_no_se_reutiliza(self):
+        version = get_version("eventos")
+        cache.delete("version:eventos")
+
+        self.assertNotEqual(get_version("eventos"), version)
+
+    def test_version_sobrevive_a_miles_de_fragmentos(self):
+        version = get_version("eventos")
+
+        for i in range(2000):
+            cache.set(f"fragmento:{i}", i)
+
+        self.assertEqual(get_version("eventos"), version)
+
+    def test_get_or_compute_calcula_una_vez(self):
+        llamadas = []
+
+        def compute():
+            llamadas.append(1)
+            return None
+
+        self.assertIsNone(get_or_compute("clave", compute, 60))
+        self.assertIsNone(get_or_compute("clave", compute, 60))
+        self.assertEqual(len(llamadas), 1)
+
+    def test_single_flight_entre_hilos(self):
+        llamadas = []
+
+        def compute():
+            llamadas.append(1)
+            time.sleep(0.2)
+            return "valor"
+
+        resultados = []
+        hilos = [
+            threading.Thread(target=lambda: resultados.append(get_or_compute("lenta", compute, 60)))
+            for _ in range(10)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(resultados, ["valor"] * 10)
+
+    def test_espera_acotada_si_el_lock_no_se_libera(self):
+        cache.add("lock:trabada", 1, 60)
+
+        self.assertEqual(get_or_compute("trabada", lambda: "propio", 60, lock_timeout=0.1), "propio")
+
+    @override_settings(CACHE_TTL_JITTER=0.1)
+    def test_jitter_dentro_del_rango(self):
+        valores = {jittered(100) for _ in range(200)}
+
+        self.assertTrue(all(90 <= valor <= 110 for valor in valores))
+        self.assertGreater(len(valores), 1)
+        self.assertIsNone(jittered(None))
@@ -0,0 +1,122 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from app.models import Event, Rating, RatingSummary, User
+
+
+class RatingSummaryTest(TestCase):
+    """Pruebas del resumen persistido de calificaciones"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass", is_organizer=True)
+        self.users = [User.objects.create_user(username=f"user{i}", password="pass") for i in range(3)]
+        self.event = Event.objects.create(
+            title="Evento",
+            description="Descripción",
+            scheduled_at=timezone.now() + datetime.timedelta(days=1),
+            organizer=self.organizer,
+        )
+
+    def _summary(self):
+        return RatingSummary.objects.get(event=self.event)
+
+    def _calificar(self, user, valor):
+        return Rating.objects.create(user=user, event=self.event, rating=valor, title="Título", text="Texto")
+
+    def test_crear_calificaciones_actualiza_resumen(self):
+        self._calificar(self.users[0], 3)
+        self._calificar(self.users[1], 5)
+
+        summary = self._summary()
+        self.assertEqual((summary.count, summary.total), (2, 8))
+        self.assertEqual(summary.average, 4)
+        self.assertEqual(summary.percentage, 80)
+        self.assertEqual((summary.star_3, summary.star_5), (1, 1))
+
+    def test_editar_calificacion_mueve_el_histograma(self):
+        rating = self._calificar(self.users[0], 2)
+
+        rating.update(4, None, None)
+
+        summary = self._summary()
+        self.assertEqual((summary.count, summary.total, summary.star_2, summary.star_4), (1, 4, 0, 1))
+
+    def test_editar_calificacion_cargada_sin_puntaje(self):
+        self._calificar(self.users[0], 2)
+        rating = Rating.objects.defer("rating").get(event=self.event)
+
+        rating.rating = 5
+        rating.save()
+
+        self.assertEqual((self._summary().total, self._summary().star_5), (5, 1))
+
+    def test_borrar_calificacion(self):
+        self._calificar(self.users[0], 1)
+        rating = self._calificar(self.users[1], 5)
+
+        Rating.objects.get(pk=rating.pk).delete()
+
+        summary = self._summary()
+        self.assertEqual((summary.count, summary.total, summary.star_5), (1, 1, 0))
+
+    def test_borrar_usuario_quita_sus_calificaciones_del_resumen(self):
+        """El borrado en cascada no pasa por Rating.delete: igual ajusta el resumen"""
+        self._calificar(self.users[0], 1)
+        self._calificar(self.users[1], 5)
+
+        self.users[1].delete()
+
+        summary = self._summary()
+        self.assertEqual((summary.count, summary.total, summary.star_5), (1, 1, 0))
+        self.assertEqual(summary.average, 1)
+
+    def test_borrado_por_queryset_y_del_evento(self):
+        self._calificar(self.users[0], 4)
+        self._calificar(self.users[1], 2)
+
+        Rating.objects.filter(rating=4).delete()
+        self.assertEqual((self._summary().count, self._summary().star_4), (1, 0))
+
+        self.event.delete()
+        self.assertFalse(RatingSummary.objects.exists())
+
+    def test_histograma_de_mayor_a_menor(self):
+        self._calificar(self.users[0], 5)
+        self._calificar(self.users[1], 5)
+        self._calificar(self.users[2], 1)
+
+        histograma = self._summary().histogram
+
+        self.assertEqual([fila[0] for fila in histograma], [5, 4, 3, 2, 1])
+        self.assertEqual(histograma[0], (5, 2, 67))
+        self.assertEqual(histograma[-1], (1, 1, 33))
+
+    def test_evento_sin_calificaciones(self):
+        summary = RatingSummary.for_event(self.event)
+
+        self.assertEqual((summary.count, summary.average, summary.percentage), (0, 0, 0))
+        self.assertFalse(RatingSummary.objects.filter(event=self.event).exists())
+
+    def test_comando_rebuild_corrige_desfasajes(self):
+        self._calificar(self.users[0], 4)
+        # Un alta masiva no pasa por Rating.save
+        Rating.objects.bulk_create([Rating(user=self.users[1], event=self.event, rating=2, title="T", text="T")])
+        out = StringIO()
+
+        call_command("rebuild_rating_summaries", stdout=out)
+
+        summary = self._summary()
+        self.assertEqual((summary.count, summary.total, summary.star_2, summary.star_4), (2, 6, 1, 1))
+        self.assertIn("1 eventos revisados, 1 corregidos", out.getvalue())
+
+    def test_comando_rebuild_sin_cambios(self):
+        self._calificar(self.users[0], 4)
+        out = StringIO()
+
+        call_command("rebuild_rating_summaries", "--event", str(self.event.pk), stdout=out)
+
+        self.assertIn("1 eventos revisados, 0 corregidos", out.getvalue())
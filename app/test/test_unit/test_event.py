@@ -1,10 +1,14 @@
 import datetime
 from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from app.models import Event, Ticket, User
+from app.sweeper import start_configured_sweeper, sweep_event_status
 
 
 class EventModelTest(TestCase):
@@ -194,6 +198,24 @@ class EventModelTest(TestCase):
 
 
         self.assertEqual(event.status, "Cancelado")
+
+    def test_current_status_no_escribe(self):
+        event = Event.objects.create(
+            title="Evento Pasado",
+            capacity=10,
+            scheduled_at=timezone.now() - timedelta(days=1),
+            organizer=self.organizer
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(event.current_status, "Finalizado")
+
+        # La transición se guarda una sola vez
+        with self.assertNumQueries(1):
+            event.check_and_update_status()
+        with self.assertNumQueries(0):
+            event.check_and_update_status()
+
     def test_evento_agotado_si_llega_a_capacidad(self):
         event = Event.objects.create(
             title="Evento con Tickets",
@@ -273,3 +295,184 @@ class EventModelTest(TestCase):
             organizer=self.organizer,
         )
         self.assertTrue(event.es_pasado)
+
+
+class TicketsSoldCounterTest(TestCase):
+    """Tests del contador desnormalizado de entradas vendidas"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="org_contador", password="password123", is_organizer=True)
+        self.buyer = User.objects.create_user(username="comprador_contador", password="password123")
+        self.event = Event.objects.create(
+            title="Evento contador",
+            description="Descripción",
+            scheduled_at=timezone.now() + timedelta(days=5),
+            organizer=self.organizer,
+            capacity=10,
+        )
+
+    def _sold(self):
+        return Event.objects.values_list("tickets_sold", flat=True).get(pk=self.event.pk)
+
+    def test_contador_sigue_altas_modificaciones_y_bajas(self):
+        ticket = Ticket.objects.create(ticket_code="CNT1", quantity=2, user=self.buyer, event=self.event)
+        self.assertEqual(self._sold(), 2)
+
+        ticket.quantity = 4
+        ticket.save()
+        self.assertEqual(self._sold(), 4)
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.quantity = 1
+        ticket.save()
+        self.assertEqual(self._sold(), 1)
+
+        ticket.delete()
+        self.assertEqual(self._sold(), 0)
+
+    def test_agotar_no_pisa_una_edicion_concurrente(self):
+        """La copia en memoria del evento está vieja: el cambio de estado solo escribe el estado"""
+        Event.objects.filter(pk=self.event.pk).update(title="Título editado")
+        Ticket.objects.create(ticket_code="CNT9", quantity=10, user=self.buyer, event=self.event)
+
+        self.event.check_and_update_agotado()
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, "Agotado")
+        self.assertEqual(self.event.title, "Título editado")
+
+    def test_borrar_comprador_devuelve_los_asientos(self):
+        """El borrado en cascada no pasa por Ticket.delete: igual devuelve los asientos"""
+        Ticket.objects.create(ticket_code="CNT4", quantity=4, user=self.buyer, event=self.event)
+        otro = User.objects.create_user(username="otro_contador", password="password123")
+        Ticket.objects.create(ticket_code="CNT5", quantity=4, user=otro, event=self.event)
+        Ticket.objects.create(ticket_code="CNT6", quantity=2, user=otro, event=self.event)
+        self.event.check_and_update_agotado()
+        self.assertEqual(self.event.status, "Agotado")
+
+        self.buyer.delete()
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 6)
+        self.assertEqual(self.event.status, "Activo")
+
+    def test_borrado_por_queryset_devuelve_los_asientos(self):
+        Ticket.objects.create(ticket_code="CNT7", quantity=2, user=self.buyer, event=self.event)
+        Ticket.objects.create(ticket_code="CNT8", quantity=3, user=self.buyer, event=self.event)
+
+        Ticket.objects.filter(event=self.event).delete()
+
+        self.assertEqual(self._sold(), 0)
+
+    def test_guardar_evento_desactualizado_no_pisa_contador(self):
+        Ticket.objects.create(ticket_code="CNT2", quantity=3, user=self.buyer, event=self.event)
+
+        # self.event tiene tickets_sold=0 en memoria
+        self.event.title = "Nuevo título"
+        self.event.save()
+
+        self.assertEqual(self._sold(), 3)
+
+    def test_agotado_se_deriva_del_contador(self):
+        Ticket.objects.create(ticket_code="CNT3", quantity=10, user=self.buyer, event=self.event)
+
+        with self.assertNumQueries(2):  # lectura del contador + cambio de estado
+            self.event.check_and_update_agotado()
+
+        self.assertEqual(self.event.status, "Agotado")
+        self.assertEqual(self.event.tickets_disponibles, 0)
+
+    def test_reconcile_corrige_desfasajes(self):
+        Ticket.objects.create(ticket_code="CNT4", quantity=3, user=self.buyer, event=self.event)
+        Event.objects.filter(pk=self.event.pk).update(tickets_sold=7)
+
+        out = StringIO()
+        call_command("reconcile_tickets_sold", "--dry-run", stdout=out)
+        self.assertIn("1 eventos revisados, 1 a corregir", out.getvalue())
+        self.assertEqual(self._sold(), 7)
+
+        call_command("reconcile_tickets_sold", stdout=StringIO())
+        self.assertEqual(self._sold(), 3)
+
+
+
+class SweepEventStatusTest(TestCase):
+    """Tests del barrido por lotes de eventos vencidos"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="org_barrido", password="password123", is_organizer=True)
+        pasado = timezone.now() - timedelta(days=1)
+        Event.objects.bulk_create(
+            Event(title=f"Vencido {i}", description="d", scheduled_at=pasado, organizer=self.organizer)
+            for i in range(7)
+        )
+        self.cancelado = Event.objects.create(
+            title="Cancelado", description="d", scheduled_at=pasado,
+            organizer=self.organizer, status="Cancelado",
+        )
+        self.futuro = Event.objects.create(
+            title="Futuro", description="d", scheduled_at=timezone.now() + timedelta(days=1),
+            organizer=self.organizer,
+        )
+
+    def test_barrido_finaliza_por_lotes(self):
+        result = sweep_event_status(batch_size=3)
+
+        self.assertEqual(result["rows"], 7)
+        self.assertEqual(result["batches"], 3)
+        self.assertEqual(Event.objects.filter(status="Finalizado").count(), 7)
+        self.cancelado.refresh_from_db()
+        self.futuro.refresh_from_db()
+        self.assertEqual(self.cancelado.status, "Cancelado")
+        self.assertEqual(self.futuro.status, "Activo")
+
+    def test_un_update_por_lote(self):
+        with self.assertNumQueries(1):
+            Event.finalize_due_batch(100)
+
+    def test_dry_run_no_modifica(self):
+        out = StringIO()
+        call_command("sweep_event_status", "--dry-run", stdout=out)
+
+        self.assertIn("7 eventos para finalizar", out.getvalue())
+        self.assertFalse(Event.objects.filter(status="Finalizado").exists())
+
+    @override_settings(EVENT_STATUS_SWEEP_INTERVAL=60)
+    def test_el_barrido_en_proceso_se_inicia_desde_el_servidor(self):
+        # Cargar la app (migrate, shell, tests) no lo inicia; lo inicia wsgi.py/asgi.py
+        with mock.patch("app.sweeper.start_sweeper") as start:
+            start_configured_sweeper()
+        start.assert_called_once_with(60)
+
+    def test_barrido_en_proceso_desactivado_por_defecto(self):
+        with mock.patch("app.sweeper.start_sweeper") as start:
+            self.assertIsNone(start_configured_sweeper())
+        start.assert_not_called()
+
+
+class HotQueryIndexTest(TestCase):
+    """Las consultas más frecuentes usan los índices compuestos declarados en los modelos"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="org_indices", password="password123", is_organizer=True)
+        self.event = Event.objects.create(
+            title="Indexado", description="d", scheduled_at=timezone.now() + timedelta(days=1),
+            organizer=self.organizer,
+        )
+
+    def test_proximos_eventos_usan_indice_por_fecha(self):
+        plan = (
+            Event.objects.filter(scheduled_at__gte=timezone.now())
+            .exclude(status__in=["Cancelado", "Finalizado"])
+            .order_by("scheduled_at", "id")
+            .explain()
+        )
+        self.assertIn("event_schedule_status_idx", plan)
+
+    def test_eventos_del_organizador_usan_indice_compuesto(self):
+        plan = Event.objects.filter(organizer=self.organizer, scheduled_at__gte=timezone.now()).explain()
+        self.assertIn("event_organizer_schedule_idx", plan)
+
+    def test_tickets_por_usuario_y_evento_usan_indice_cubriente(self):
+        plan = Ticket.objects.filter(user=self.organizer, event=self.event).values("quantity").explain()
+        self.assertIn("ticket_user_event_idx", plan)
@@ -1,11 +1,15 @@
 from datetime import timedelta
+from unittest import mock
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
-from app.models import Event, Notification, Ticket, User, Venue
+from app.models import Event, Notification, NotificationUser, Ticket, User, Venue
 
 
+# Las notificaciones por cambio de evento se envían en el momento, sin el hilo de tareas
+@override_settings(TASKS_EAGER=True)
 class BaseTestSetup(TestCase):
     """
     Configuración base para pruebas que comparten usuarios, evento, lugar y ticket.
@@ -105,3 +109,161 @@ class TestEventUpdateTriggersNotification(BaseTestSetup):
         self.assertIn("Fecha/Hora", notif.message)
         self.assertIn("Lugar", notif.message)
         self.assertEqual(notif.users.count(), 2)
+
+
+class NotificationFanOutTest(BaseTestSetup):
+    """
+    Pruebas del alta de destinatarios por lotes.
+    """
+
+    def test_fan_out_por_lotes(self):
+        User.objects.bulk_create(User(username=f"asistente{i}") for i in range(25))
+        usuarios = User.objects.filter(username__startswith="asistente")
+        notif = Notification.objects.create(title="Aviso", message="Mensaje", priority="LOW")
+
+        # Una consulta para los ids y, por cada lote de 10, los ya existentes y un INSERT
+        with self.assertNumQueries(7):
+            total = notif.fan_out(usuarios, chunk_size=10)
+
+        self.assertEqual(total, 25)
+        self.assertEqual(notif.users.count(), 25)
+
+    def test_fan_out_ignora_destinatarios_repetidos(self):
+        notif = Notification.objects.create(title="Aviso", message="Mensaje", priority="LOW")
+        NotificationUser.objects.create(notification=notif, user=self.user1, read=True)
+
+        notif.fan_out([self.user1, self.user2])
+
+        self.assertEqual(notif.users.count(), 2)
+        # La fila existente conserva su estado de lectura
+        self.assertTrue(NotificationUser.objects.get(notification=notif, user=self.user1).read)
+
+    def test_new_con_queryset_vacio_no_crea_notificacion(self):
+        success, errors = Notification.new("Aviso", "Mensaje", "LOW", User.objects.none())
+
+        self.assertFalse(success)
+        self.assertIn("users", errors)
+        self.assertFalse(Notification.objects.exists())
+
+
+class NotificationUpdateRecipientsTest(BaseTestSetup):
+    """
+    Pruebas de la actualización de destinatarios por diferencia.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user3 = User.objects.create_user(username="usuario3", password="pass123")
+        self.notif = Notification.objects.create(title="Aviso", message="Mensaje", priority="LOW")
+        self.notif.fan_out([self.user1, self.user2])
+        NotificationUser.objects.filter(notification=self.notif, user=self.user1).update(
+            read=True, read_at=timezone.now()
+        )
+
+    def test_update_aplica_solo_la_diferencia(self):
+        self.notif.update(users=User.objects.filter(pk__in=[self.user1.pk, self.user3.pk]))
+
+        self.assertEqual(
+            set(self.notif.users.values_list("username", flat=True)),
+            {"usuario1", "usuario3"},
+        )
+
+    def test_update_conserva_estado_de_lectura(self):
+        self.notif.update(users=[self.user1, self.user3])
+
+        relacion = NotificationUser.objects.get(notification=self.notif, user=self.user1)
+        self.assertTrue(relacion.read)
+        self.assertIsNotNone(relacion.read_at)
+
+    def test_set_recipients_sin_cambios_no_escribe(self):
+        added, removed = self.notif.set_recipients([self.user1, self.user2])
+
+        self.assertEqual((added, removed), (0, 0))
+
+
+class UnreadCounterTest(BaseTestSetup):
+    """
+    Pruebas del contador cacheado de notificaciones no leídas.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.notif = Notification.objects.create(title="Aviso", message="Mensaje", priority="LOW")
+
+    def _real(self, user):
+        return NotificationUser.objects.filter(user=user, read=False).count()
+
+    def test_segunda_lectura_no_consulta(self):
+        self.notif.fan_out([self.user1])
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(NotificationUser.unread_count(self.user1.pk), 1)
+
+    def test_fan_out_incrementa_contador_cacheado(self):
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 0)
+
+        self.notif.fan_out([self.user1, self.user1, self.user2])
+
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 1)
+        self.assertEqual(NotificationUser.unread_count(self.user2.pk), 1)
+
+    def test_fan_out_repetido_no_infla_el_contador(self):
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 0)
+
+        self.assertEqual(self.notif.fan_out([self.user1]), 1)
+        self.assertEqual(self.notif.fan_out([self.user1]), 0)
+
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 1)
+        self.assertEqual(self._real(self.user1), 1)
+
+    def test_marcar_leida_decrementa_una_sola_vez(self):
+        self.notif.fan_out([self.user1])
+        NotificationUser.unread_count(self.user1.pk)
+        relacion = NotificationUser.objects.get(notification=self.notif, user=self.user1)
+
+        relacion.mark_read()
+        relacion.mark_read()
+
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 0)
+        self.assertEqual(self._real(self.user1), 0)
+
+    def test_marcar_todas_leidas(self):
+        otra = Notification.objects.create(title="Otro", message="Mensaje", priority="LOW")
+        self.notif.fan_out([self.user1])
+        otra.fan_out([self.user1])
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 2)
+
+        NotificationUser.mark_all_read(self.user1)
+
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 0)
+
+    def test_quitar_destinatarios_y_borrar_notificacion(self):
+        self.notif.fan_out([self.user1, self.user2])
+        NotificationUser.unread_count(self.user1.pk)
+        NotificationUser.unread_count(self.user2.pk)
+
+        self.notif.set_recipients([self.user1])
+        self.assertEqual(NotificationUser.unread_count(self.user2.pk), self._real(self.user2))
+
+        self.notif.delete()
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), self._real(self.user1))
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 0)
+
+    def test_ajuste_de_muchos_usuarios_en_una_llamada(self):
+        usuarios = [self.user1, self.user2]
+        for user in usuarios:
+            NotificationUser.unread_count(user.pk)
+
+        with mock.patch.object(cache, "incr") as incr, mock.patch.object(cache, "delete_many", wraps=cache.delete_many) as delete_many:
+            self.notif.fan_out(usuarios)
+
+        incr.assert_not_called()
+        delete_many.assert_called_once()
+        for user in usuarios:
+            self.assertEqual(NotificationUser.unread_count(user.pk), self._real(user))
+
+    def test_contador_negativo_se_recalcula(self):
+        cache.set(NotificationUser.unread_cache_key(self.user1.pk), -3)
+
+        self.assertEqual(NotificationUser.unread_count(self.user1.pk), 0)
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from app import reference_data
+from app.models import Category, Venue
+
+
+class ReferenceDataCacheTest(TestCase):
+    """Pruebas del cache de categorías y locaciones"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Música", description="Conciertos")
+        Category.objects.create(name="Inactiva", description="Oculta", is_active=False)
+        self.venue = Venue.objects.create(name="Estadio", capacity=100)
+        for store in (reference_data.active_categories, reference_data.venues):
+            store.reset_stats()
+
+    def test_lectura_en_estado_estable_sin_consultas(self):
+        reference_data.get_active_categories()
+        reference_data.get_venues()
+
+        with self.assertNumQueries(0):
+            categorias = reference_data.get_active_categories()
+            locaciones = reference_data.get_venues()
+
+        self.assertEqual([c.name for c in categorias], ["Música"])
+        self.assertEqual([v.name for v in locaciones], ["Estadio"])
+        self.assertEqual(reference_data.stats()["categories"], {"local_hits": 1, "shared_hits": 0, "misses": 1})
+
+    def test_guardar_categoria_invalida(self):
+        reference_data.get_active_categories()
+
+        Category.objects.create(name="Teatro", description="Obras")
+
+        self.assertEqual(
+            sorted(c.name for c in reference_data.get_active_categories()),
+            ["Música", "Teatro"],
+        )
+        self.assertEqual(reference_data.stats()["categories"]["misses"], 2)
+
+    def test_desactivar_y_borrar(self):
+        reference_data.get_active_categories()
+        reference_data.get_venues()
+
+        self.category.is_active = False
+        self.category.save()
+        self.venue.delete()
+
+        self.assertEqual(reference_data.get_active_categories(), [])
+        self.assertEqual(reference_data.get_venues(), [])
+
+    def test_otro_proceso_usa_el_cache_compartido(self):
+        reference_data.get_venues()
+        # Simula un proceso nuevo: sin copia en memoria, pero con el cache compartido
+        reference_data.venues._local = None
+
+        with self.assertNumQueries(0):
+            reference_data.get_venues()
+
+        self.assertEqual(reference_data.stats()["venues"]["shared_hits"], 1)
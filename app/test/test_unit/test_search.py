@@ -0,0 +1,93 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from app.models import Event, User
+from app.search import SimpleSearchBackend, SqliteFtsBackend, search_events, search_terms
+
+
+class EventSearchTest(TestCase):
+    """Pruebas de la búsqueda de texto completo de eventos"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizer", password="pass", is_organizer=True)
+        self.futuro = timezone.now() + datetime.timedelta(days=3)
+        self.en_titulo = self._evento("Festival de Jazz", "Música en vivo toda la noche")
+        self.en_descripcion = self._evento("Noche de bandas", "Un clásico festival con jazz y rock")
+        self.otro = self._evento("Feria del libro", "Autores y editoriales")
+
+    def _evento(self, title, description, **kwargs):
+        kwargs.setdefault("scheduled_at", self.futuro)
+        return Event.objects.create(title=title, description=description, organizer=self.organizer, **kwargs)
+
+    def test_titulo_rankea_antes_que_descripcion(self):
+        resultados = search_events(Event.objects.all(), "jazz festival")
+
+        self.assertEqual(resultados, [self.en_titulo, self.en_descripcion])
+
+    def test_prefijo_y_acentos(self):
+        self.assertEqual(search_events(Event.objects.all(), "musica"), [self.en_titulo])
+        self.assertEqual(search_events(Event.objects.all(), "edito"), [self.otro])
+
+    def test_respeta_los_filtros_del_queryset(self):
+        pasado = self._evento("Jazz de ayer", "Festival", scheduled_at=timezone.now() - datetime.timedelta(days=1))
+
+        resultados = search_events(Event.objects.filter(scheduled_at__gte=timezone.now()), "jazz")
+
+        self.assertNotIn(pasado, resultados)
+        self.assertEqual(len(resultados), 2)
+
+    def test_filtros_dentro_de_la_ventana_de_ranking(self):
+        """Las coincidencias no visibles no ocupan la ventana: el evento visible más viejo aparece"""
+        pasado = timezone.now() - datetime.timedelta(days=1)
+        Event.objects.bulk_create([
+            Event(title=f"Jazz pasado {i}", description="Festival", scheduled_at=pasado, organizer=self.organizer)
+            for i in range(5)
+        ])
+        call_command("rebuild_search_index", stdout=StringIO())
+        backend = SqliteFtsBackend()
+        backend.rank_window = 3
+
+        resultados = backend.search(Event.objects.filter(scheduled_at__gte=timezone.now()), "jazz", limit=10)
+
+        self.assertEqual(resultados, [self.en_titulo, self.en_descripcion])
+
+    def test_guardar_y_borrar_actualizan_el_indice(self):
+        self.otro.title = "Feria de vinilos"
+        self.otro.save()
+        self.assertEqual(search_events(Event.objects.all(), "vinilos"), [self.otro])
+        self.assertEqual(search_events(Event.objects.all(), "libro"), [])
+
+        self.otro.delete()
+        self.assertEqual(search_events(Event.objects.all(), "vinilos"), [])
+
+    def test_entrada_con_sintaxis_fts_no_falla(self):
+        self.assertEqual(search_events(Event.objects.all(), 'jazz" * (^'), [self.en_titulo, self.en_descripcion])
+        self.assertEqual(search_events(Event.objects.all(), "  ¿?  "), [])
+
+    def test_palabras_vacias(self):
+        self.assertEqual(search_terms("Festival de la Música"), ["festival", "música"])
+        self.assertEqual(search_terms("de la"), ["de", "la"])
+
+    def test_limite(self):
+        self.assertEqual(len(SqliteFtsBackend().search(Event.objects.all(), "jazz", limit=1)), 1)
+
+    def test_backend_simple(self):
+        resultados = SimpleSearchBackend().search(Event.objects.all(), "jazz", limit=10)
+
+        self.assertEqual(resultados, [self.en_titulo, self.en_descripcion])
+
+    def test_comando_rebuild(self):
+        Event.objects.bulk_create([
+            Event(title="Congreso de robótica", description="Charlas", scheduled_at=self.futuro, organizer=self.organizer)
+        ])
+        self.assertEqual(search_events(Event.objects.all(), "robotica"), [])
+        out = StringIO()
+
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertEqual(len(search_events(Event.objects.all(), "robotica")), 1)
+        self.assertIn("4 eventos indexados", out.getvalue())
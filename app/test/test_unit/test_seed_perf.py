@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, Sum
+from django.test import TestCase
+
+from app.models import Event, Rating, RatingSummary, RefoundRequest, RefoundStatus, Ticket, User
+from app.search import search_events
+
+VOLUMES = {
+    "users": 60, "organizers": 5, "categories": 3, "venues": 4, "events": 80, "tickets": 400,
+    "ratings": 120, "comments": 50, "favorites": 100, "refunds": 40, "notifications": 10, "deliveries": 150,
+}
+
+
+def seed(prefix="perf", seed=1):
+    call_command("seed_perf", prefix=prefix, seed=seed, stdout=StringIO(), **VOLUMES)
+
+
+class SeedPerfTest(TestCase):
+    """Pruebas del comando que genera datos sintéticos para pruebas de rendimiento"""
+
+    def test_genera_datos_consistentes(self):
+        seed()
+
+        self.assertEqual(User.objects.filter(is_organizer=True).count(), 5)
+        self.assertEqual(Event.objects.count(), 80)
+        self.assertGreater(Ticket.objects.count(), 0)
+
+        # El inventario coincide con los tickets y nunca supera la capacidad
+        for event in Event.objects.annotate(real=Sum("tickets__quantity")):
+            self.assertEqual(event.tickets_sold, event.real or 0)
+            self.assertLessEqual(event.tickets_sold, event.capacity)
+
+        # Respeta el máximo de entradas por usuario y evento
+        por_usuario = Ticket.objects.values("user", "event").annotate(total=Sum("quantity"))
+        self.assertLessEqual(max(row["total"] for row in por_usuario), Ticket.MAX_TICKETS_PER_USER)
+
+        # El resumen de calificaciones coincide con las calificaciones
+        for summary in RatingSummary.objects.all():
+            real = Rating.objects.filter(event_id=summary.event_id).aggregate(count=Count("id"), total=Sum("rating"))
+            self.assertEqual((summary.count, summary.total), (real["count"], real["total"]))
+
+        # A lo sumo una solicitud de reembolso pendiente por usuario
+        pendientes = RefoundRequest.objects.filter(status=RefoundStatus.PENDING).values("user").annotate(n=Count("id"))
+        self.assertTrue(all(row["n"] == 1 for row in pendientes))
+
+    def test_misma_semilla_mismos_datos(self):
+        seed(prefix="a")
+        seed(prefix="b")
+
+        def tickets(prefix):
+            return list(
+                Ticket.objects.filter(ticket_code__startswith=f"{prefix}-")
+                .order_by("ticket_code")
+                .values_list("quantity", "type", "buy_date", "event__title")
+            )
+
+        self.assertEqual(tickets("a"), tickets("b"))
+
+    def test_otra_semilla_otros_datos(self):
+        seed(prefix="a", seed=1)
+        seed(prefix="b", seed=2)
+
+        titles = {
+            prefix: list(Event.objects.filter(organizer__username__startswith=f"{prefix}_").order_by("pk")
+                         .values_list("title", flat=True))
+            for prefix in ("a", "b")
+        }
+        self.assertNotEqual(titles["a"], titles["b"])
+
+    def test_prefijo_existente_falla(self):
+        seed()
+
+        with self.assertRaises(CommandError):
+            seed()
+
+    def test_eventos_generados_se_pueden_buscar(self):
+        seed()
+        event = Event.objects.order_by("pk").first()
+
+        self.assertIn(event, search_events(Event.objects.all(), event.title))
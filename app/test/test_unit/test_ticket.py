@@ -92,3 +92,53 @@ class PruebaTicketUnit(TicketLimitTest):
         capacidad_evento = event.capacity if event.capacity is not None else 0
         entradas_disponibles = capacidad_evento - entradas_usadas
         self.assertEqual(entradas_disponibles, 8)
+
+
+class ReservaTicketUnit(TicketLimitTest):
+
+    def setUp(self):
+        super().setUp()
+        self.event.capacity = 3
+        self.event.save()
+
+    def test_reserva_crea_ticket_y_actualiza_inventario(self):
+        """La reserva crea el ticket con su tipo y suma al contador del evento"""
+        ticket, errors = Ticket.reserve("RES1", 2, self.user, self.event, type="vip")
+
+        self.assertIsNone(errors)
+        self.assertEqual(ticket.type, "vip")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 2)
+
+    def test_reserva_rechaza_sin_cupo_aunque_el_evento_este_desactualizado(self):
+        """El control de cupo se hace en la base, no con el objeto en memoria"""
+        otro = User.objects.create_user(username="otro", password="test123")
+        Ticket.objects.create(ticket_code="RES2", quantity=3, user=otro, event=self.event)
+
+        # self.event sigue con tickets_sold=0 en memoria
+        ticket, errors = Ticket.reserve("RES3", 1, self.user, self.event)
+
+        self.assertIsNone(ticket)
+        self.assertEqual(errors["capacity"], "No quedan entradas disponibles.")
+        self.assertFalse(Ticket.objects.filter(ticket_code="RES3").exists())
+
+    def test_reserva_rechazada_por_limite_no_consume_cupo(self):
+        """Si se supera el límite por usuario, el cupo reservado se revierte"""
+        self.event.capacity = 10
+        self.event.save()
+        Ticket.objects.create(ticket_code="RES4", quantity=4, user=self.user, event=self.event)
+
+        ticket, errors = Ticket.reserve("RES5", 1, self.user, self.event)
+
+        self.assertIsNone(ticket)
+        self.assertIn("max_tickets", errors)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 4)
+
+    def test_borrar_ticket_libera_cupo(self):
+        ticket, _ = Ticket.reserve("RES6", 3, self.user, self.event)
+
+        ticket.delete()
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 0)
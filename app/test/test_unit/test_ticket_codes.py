@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from app import ticket_codes
+from app.ticket_codes import ALPHABET, CODE_LENGTH, SEQUENCE_MAX, TicketCodeAllocator
+
+
+class TicketCodeAllocatorTest(SimpleTestCase):
+    """Pruebas del generador de códigos de ticket"""
+
+    def test_codigos_unicos_y_en_orden(self):
+        allocator = TicketCodeAllocator()
+
+        codes = [allocator.allocate() for _ in range(5000)] + allocator.allocate_many(5000)
+
+        self.assertEqual(len(set(codes)), len(codes))
+        self.assertEqual(codes, sorted(codes))
+        self.assertTrue(all(len(code) == CODE_LENGTH and ticket_codes.is_valid(code) for code in codes))
+
+    def test_secuencia_agotada_usa_el_milisegundo_siguiente(self):
+        allocator = TicketCodeAllocator(node=1)
+
+        with mock.patch("app.ticket_codes.time.time_ns", return_value=1_000_000_000_000):
+            codes = allocator.allocate_many(SEQUENCE_MAX + 2)
+            codes.append(allocator.allocate())
+
+        self.assertEqual(len(set(codes)), len(codes))
+        self.assertEqual(codes, sorted(codes))
+        # 10^12 ns = 1000 s; el último código cae en el milisegundo siguiente
+        self.assertEqual(ticket_codes.issued_at(codes[0]).timestamp(), 1000)
+        self.assertAlmostEqual(ticket_codes.issued_at(codes[-1]).timestamp(), 1000.001)
+
+    def test_reloj_que_retrocede(self):
+        allocator = TicketCodeAllocator(node=1)
+
+        with mock.patch("app.ticket_codes.time.time_ns", return_value=2_000_000_000_000):
+            primero = allocator.allocate()
+        with mock.patch("app.ticket_codes.time.time_ns", return_value=1_000_000_000_000):
+            segundo = allocator.allocate()
+
+        self.assertLess(primero, segundo)
+
+    def test_nodos_distintos_no_se_pisan(self):
+        with mock.patch("app.ticket_codes.time.time_ns", return_value=1_000_000_000_000):
+            a = TicketCodeAllocator(node=1).allocate_many(100)
+            b = TicketCodeAllocator(node=2).allocate_many(100)
+
+        self.assertFalse(set(a) & set(b))
+
+    def test_reset_elige_otro_nodo(self):
+        allocator = TicketCodeAllocator()
+        nodos = set()
+        for _ in range(5):
+            allocator.reset()
+            nodos.add(allocator.node)
+
+        self.assertGreater(len(nodos), 1)
+
+
+class TicketCodeValidationTest(SimpleTestCase):
+    """Pruebas de la verificación sin conexión de los códigos"""
+
+    def setUp(self):
+        self.code = ticket_codes.allocate()
+
+    def test_detecta_cualquier_caracter_cambiado(self):
+        for position in range(CODE_LENGTH):
+            for char in ALPHABET:
+                if char == self.code[position]:
+                    continue
+                wrong = self.code[:position] + char + self.code[position + 1:]
+                self.assertFalse(ticket_codes.is_valid(wrong), wrong)
+
+    def test_detecta_largo_o_simbolos_invalidos(self):
+        self.assertFalse(ticket_codes.is_valid(self.code[:-1]))
+        self.assertFalse(ticket_codes.is_valid(self.code + "0"))
+        self.assertFalse(ticket_codes.is_valid("U" + self.code[1:]))
+        self.assertFalse(ticket_codes.is_valid("TIX-ABC123"))
+
+    def test_normaliza_lo_que_tipea_una_persona(self):
+        code = self.code.lower()
+        grouped = "-".join(code[i:i + 4] for i in range(0, len(code), 4))
+
+        self.assertTrue(ticket_codes.is_valid(grouped))
+        self.assertEqual(ticket_codes.normalize("o1l-i"), "0111")
@@ -0,0 +1,161 @@
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+# Base32 de Crockford: sin I, L, O ni U, para que el código se pueda leer y dictar sin confusiones.
+# Está en orden ASCII, así que ordenar los códigos como texto los ordena por momento de emisión.
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+BASE = len(ALPHABET)
+_VALUES = {char: value for value, char in enumerate(ALPHABET)}
+# Lo que una persona puede tipear en lugar del símbolo correcto
+_ALIASES = str.maketrans({"I": "1", "L": "1", "O": "0"})
+
+# Código = milisegundos (48 bits) | nodo (32 bits) | secuencia (10 bits) | dígito verificador
+TIME_BITS = 48
+NODE_BITS = 32
+SEQUENCE_BITS = 10
+SEQUENCE_MAX = (1 << SEQUENCE_BITS) - 1
+PREFIX_LENGTH = (TIME_BITS + NODE_BITS) // 5
+DATA_LENGTH = PREFIX_LENGTH + SEQUENCE_BITS // 5
+CODE_LENGTH = DATA_LENGTH + 1
+
+
+def _encode(number, length):
+    chars = []
+    for _ in range(length):
+        chars.append(ALPHABET[number % BASE])
+        number //= BASE
+    return "".join(reversed(chars))
+
+
+def _addend(value, factor):
+    product = value * factor
+    return product // BASE + product % BASE
+
+
+def _luhn_sum(chars, end_distance):
+    """
+    Suma de Luhn mod 32 de `chars`, cuyo último carácter queda a `end_distance` posiciones
+    del final del código sin el verificador. Las posiciones pares desde el final se duplican.
+    """
+    total = 0
+    for offset, char in enumerate(reversed(chars)):
+        distance = end_distance + offset
+        total += _addend(_VALUES[char], 2 if distance % 2 == 0 else 1)
+    return total
+
+
+def _build_suffixes():
+    """
+    Sufijo (secuencia + verificador) precalculado para cada resto de la suma del prefijo:
+    emitir un código es concatenar dos cadenas.
+    """
+    table = []
+    for remainder in range(BASE):
+        row = []
+        for sequence in range(SEQUENCE_MAX + 1):
+            chars = _encode(sequence, DATA_LENGTH - PREFIX_LENGTH)
+            row.append(chars + ALPHABET[-(remainder + _luhn_sum(chars, 0)) % BASE])
+        table.append(row)
+    return table
+
+
+_SUFFIXES = _build_suffixes()
+
+
+class TicketCodeAllocator:
+    """
+    Genera códigos de ticket únicos sin consultar la base. Dentro de un proceso, el par
+    (milisegundo, secuencia) nunca se repite: si se agotan las 1024 secuencias de un
+    milisegundo se usa el siguiente, y si el reloj retrocede se sigue desde el último usado.
+    Entre procesos los distingue el nodo, elegido al azar (32 bits) al iniciar el proceso
+    y después de cada fork.
+    """
+
+    def __init__(self, node=None):
+        self.reset(node)
+
+    def reset(self, node=None):
+        self._lock = threading.Lock()
+        self.node = secrets.randbits(NODE_BITS) if node is None else node % (1 << NODE_BITS)
+        self._ms = -1
+        self._sequence = SEQUENCE_MAX
+        self._prefix = ""
+        self._suffixes = _SUFFIXES[0]
+
+    def _start(self, ms):
+        self._ms = ms
+        self._sequence = -1
+        self._prefix = _encode((ms << NODE_BITS) | self.node, PREFIX_LENGTH)
+        self._suffixes = _SUFFIXES[_luhn_sum(self._prefix, DATA_LENGTH - PREFIX_LENGTH) % BASE]
+
+    def _sync_clock(self):
+        now = time.time_ns() // 1_000_000
+        if now > self._ms:
+            self._start(now)
+
+    def allocate(self):
+        with self._lock:
+            now = time.time_ns() // 1_000_000
+            if now > self._ms:
+                self._start(now)
+            elif self._sequence == SEQUENCE_MAX:
+                self._start(self._ms + 1)
+            self._sequence += 1
+            return self._prefix + self._suffixes[self._sequence]
+
+    def allocate_many(self, count):
+        """Emite `count` códigos consecutivos tomando el lock una sola vez."""
+        codes = []
+        with self._lock:
+            self._sync_clock()
+            while len(codes) < count:
+                if self._sequence == SEQUENCE_MAX:
+                    self._start(self._ms + 1)
+                start = self._sequence + 1
+                stop = min(SEQUENCE_MAX + 1, start + count - len(codes))
+                prefix = self._prefix
+                codes.extend([prefix + suffix for suffix in self._suffixes[start:stop]])
+                self._sequence = stop - 1
+        return codes
+
+
+_allocator = TicketCodeAllocator()
+# Un proceso hijo no debe heredar el nodo ni el estado del padre
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_allocator.reset)
+
+
+def allocate():
+    return _allocator.allocate()
+
+
+def allocate_many(count):
+    return _allocator.allocate_many(count)
+
+
+def normalize(code):
+    """Mayúsculas, sin guiones ni espacios y con I/L/O leídos como 1/1/0."""
+    return code.strip().upper().replace("-", "").replace(" ", "").translate(_ALIASES)
+
+
+def is_valid(code):
+    """Verifica largo, alfabeto y dígito verificador sin consultar la base (lectores sin conexión)."""
+    code = normalize(code)
+    if len(code) != CODE_LENGTH or any(char not in _VALUES for char in code):
+        return False
+    # Con el verificador incluido, las posiciones pares desde el final ya no se duplican
+    return _luhn_sum(code, -1) % BASE == 0
+
+
+def issued_at(code):
+    """Momento de emisión del código, o None si no es un código válido."""
+    if not is_valid(code):
+        return None
+    prefix = normalize(code)[:PREFIX_LENGTH]
+    number = 0
+    for char in prefix:
+        number = number * BASE + _VALUES[char]
+    return datetime.fromtimestamp((number >> NODE_BITS) / 1000, tz=timezone.utc)
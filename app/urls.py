@@ -9,6 +9,7 @@ urlpatterns = [
     path("accounts/logout/", LogoutView.as_view(), name="logout"),
     path("accounts/login/", views.login_view, name="login"),
     path("events/", views.events, name="events"),
+    path("events/search/", views.event_search, name="event_search"),
     path("events/create/", views.event_form, name="event_form"),
     path("events/<int:id>/edit/", views.event_form, name="event_edit"),
     path("events/<int:id>/", views.event_detail, name="event_detail"),
@@ -20,6 +21,8 @@ urlpatterns = [
     path('categorias/<int:id>/delete/', views.category_delete, name='category_delete'),
     path('events/<int:event_id>/', views.event_detail, name='event_detail'),
     path('events/<int:event_id>/crear/', views.crear_comentario, name='crear_comentario'),
+    path('events/<int:event_id>/comments/', views.event_comments, name='event_comments'),
+    path('events/<int:event_id>/ratings/', views.event_ratings, name='event_ratings'),
     path('events/<int:event_id>/comments/<int:pk>/delete/', views.delete_comment, name='delete_comment'),
     path('organizer/comments/', views.organizer_comments, name='organizer_comments'),
     path('organizer/comments/delete/<int:pk>/', views.organizer_delete_comment, name='organizer_delete_comment'),
@@ -28,7 +31,11 @@ urlpatterns = [
     path('venues/<int:pk>/edit/', views.venue_edit, name='venue_edit'),
     path('venues/<int:pk>/delete/', views.venue_delete, name='venue_delete'),
     path('tickets/<int:event_id>/', views.tickets, name='tickets'),
+    path('tickets/<int:event_id>/export/', views.tickets_export, name='tickets_export'),
+    path('tickets/<int:event_id>/checkin/', views.ticket_checkin, name='ticket_checkin'),
+    path('tickets/<int:event_id>/checkin/batch/', views.ticket_checkin_batch, name='ticket_checkin_batch'),
     path('ticket_compra/<int:event_id>/', views.comprar_ticket, name='ticket_compra'),
+    path('orders/', views.order_create, name='order_create'),
     path('ticket_delete/<int:event_id>/<int:ticket_id>/', views.ticket_delete, name='ticket_delete'),
     path('Mis_tickets/', views.mis_tickets, name='Mis_tickets'),
     path('event/<int:event_id>/rating/create/', views.rating_create, name='rating_create'),
@@ -1,4 +1,5 @@
 import datetime
+import json
 import random
 import re
 
@@ -6,13 +7,23 @@ from django.contrib import messages
 from django.contrib.auth import authenticate, get_user_model, login
 from django.contrib.auth.decorators import login_required
 from django.db import IntegrityError
-from django.db.models import Avg, Count, Exists, OuterRef, Sum
-from django.http import HttpResponseForbidden, HttpResponseRedirect
+from django.db.models import Count, Exists, OuterRef, Sum
+from django.http import (
+    Http404,
+    HttpResponseForbidden,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import SimpleLazyObject
 from django.utils.timezone import now
 
+from . import checkin, exports, reference_data, ticket_codes
+from .cache import event_detail_namespace, get_version
 from .models import (
     Category,
     Comment,
@@ -20,7 +31,9 @@ from .models import (
     Favorite,
     Notification,
     NotificationUser,
+    Order,
     Rating,
+    RatingSummary,
     RefoundReason,
     RefoundRequest,
     RefoundStatus,
@@ -29,6 +42,13 @@ from .models import (
     User,
     Venue,
 )
+from .pagination import KeysetPage, keyset_paginate
+from .search import SEARCH_LIMIT, search_events
+
+# Comentarios y reseñas por página en el detalle del evento
+DETAIL_PAGE_SIZE = 10
+# Vida de los fragmentos cacheados del detalle; se invalidan antes por versión
+EVENT_DETAIL_CACHE_TIMEOUT = 60 * 5
 
 
 def register(request):
@@ -88,10 +108,15 @@ def home(request):
 
 @login_required
 def event_detail(request, id):
-    event = get_object_or_404(Event, pk=id)
+    event = get_object_or_404(Event.objects.select_related("rating_summary"), pk=id)
     event.check_and_update_status()
+    return render(request, "app/event_detail.html", _event_detail_context(request, event))
+
+
+def _event_detail_context(request, event, **extra):
+    """Contexto de la página de detalle; también lo usa el formulario de comentarios al fallar."""
     countdown = event.countdown
-    tickets_vendidos = Ticket.objects.filter(event=event).aggregate(total=Sum('quantity'))['total'] or 0
+    tickets_vendidos = event.tickets_sold
 
     if countdown is not None:
         total_seconds = int(countdown.total_seconds())
@@ -107,15 +132,90 @@ def event_detail(request, id):
         porcentaje_ocupado = 0
     else:
         porcentaje_ocupado = (tickets_vendidos / event.capacity) * 100
-    todos_los_comentarios = Comment.objects.filter(event=event).order_by('-created_at')
-    ratings = Rating.objects.filter(event=event).order_by('-created_at')
+    # Primeras páginas acotadas; el resto se pide con "Cargar más".
+    # Son perezosas: si el fragmento está en cache no se consultan.
+    comments_page = SimpleLazyObject(lambda: _comments_page(event))
+    ratings_page = SimpleLazyObject(lambda: _ratings_page(event))
+    todos_los_comentarios = SimpleLazyObject(lambda: comments_page.object_list)
+    ratings = SimpleLazyObject(lambda: ratings_page.object_list)
     tiene_ticket = Ticket.objects.filter(user=request.user, event=event).exists()
-    promedio_rating = Rating.objects.filter(event=event).aggregate(Avg('rating'))['rating__avg'] or 0
-    porcentaje_rating = round(promedio_rating * 20, 2)  # Escala de 0 a 100
+    # Resumen persistido: promedio, cantidad e histograma sin recorrer las calificaciones
+    rating_summary = RatingSummary.for_event(event)
+    promedio_rating = rating_summary.average
+    porcentaje_rating = rating_summary.percentage
     tiene_resena = Rating.objects.filter(user=request.user, event=event).exists()
 
-    return render(request, "app/event_detail.html", {"event": event, "todos_los_comentarios": todos_los_comentarios, "ratings": ratings, "user_is_organizer": request.user.is_organizer, "porcentaje_ocupado": porcentaje_ocupado, "tickets_vendidos": tickets_vendidos, "tiene_ticket": tiene_ticket, "promedio_rating": promedio_rating, "porcentaje_rating": porcentaje_rating, "tiene_resena": tiene_resena,"countdown": countdown,  "countdown_days": days,
-        "countdown_hours": hours,"countdown_minutes": minutes,})
+    return {"event": event, "todos_los_comentarios": todos_los_comentarios, "comments_page": comments_page, "ratings": ratings, "ratings_page": ratings_page, "user_is_organizer": request.user.is_organizer, "porcentaje_ocupado": porcentaje_ocupado, "tickets_vendidos": tickets_vendidos, "tiene_ticket": tiene_ticket, "rating_summary": rating_summary, "promedio_rating": promedio_rating, "porcentaje_rating": porcentaje_rating, "tiene_resena": tiene_resena,"countdown": countdown,  "countdown_days": days, "detail_version": get_version(event_detail_namespace(event.pk)), "detail_cache_timeout": EVENT_DETAIL_CACHE_TIMEOUT,
+        "countdown_hours": hours,"countdown_minutes": minutes, **extra}
+
+
+def _comments_page(event, cursor=None):
+    return keyset_paginate(
+        Comment.objects.filter(event=event).select_related("user"),
+        ["created_at", "id"],
+        cursor=cursor,
+        per_page=DETAIL_PAGE_SIZE,
+        descending=True,
+    )
+
+
+def _ratings_page(event, cursor=None):
+    return keyset_paginate(
+        Rating.objects.filter(event=event).select_related("user"),
+        ["created_at", "id"],
+        cursor=cursor,
+        per_page=DETAIL_PAGE_SIZE,
+        descending=True,
+    )
+
+
+@login_required
+def event_comments(request, event_id):
+    """Siguiente página de comentarios: fragmento HTML, o JSON con ?format=json."""
+    event = get_object_or_404(Event, pk=event_id)
+    page = _comments_page(event, request.GET.get("cursor"))
+
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "results": [
+                {
+                    "id": comment.id,
+                    "user": comment.user.username,
+                    "title": comment.title,
+                    "text": comment.text,
+                    "created_at": comment.created_at.isoformat(),
+                }
+                for comment in page
+            ],
+            "next_cursor": page.next_cursor,
+        })
+
+    return render(request, "app/partials/comment_list.html", {"event": event, "comments": page.object_list, "page": page})
+
+
+@login_required
+def event_ratings(request, event_id):
+    """Siguiente página de reseñas: fragmento HTML, o JSON con ?format=json."""
+    event = get_object_or_404(Event, pk=event_id)
+    page = _ratings_page(event, request.GET.get("cursor"))
+
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "results": [
+                {
+                    "id": rating.id,
+                    "user": rating.user.get_full_name() or rating.user.username,
+                    "rating": rating.rating,
+                    "title": rating.title,
+                    "text": rating.text,
+                    "created_at": rating.created_at.isoformat(),
+                }
+                for rating in page
+            ],
+            "next_cursor": page.next_cursor,
+        })
+
+    return render(request, "app/partials/rating_list.html", {"event": event, "ratings": page.object_list, "page": page})
 
 
 
@@ -163,8 +263,8 @@ def event_form(request, id=None):
         capacity = int(request.POST.get("capacity") or 0)
         #si la capacity es mayor a la capacidad del venue, se muestra un error
         if venue.capacity is not None and capacity > venue.capacity:
-            categories = Category.objects.filter(is_active=True)
-            venues = Venue.objects.all()
+            categories = reference_data.get_active_categories()
+            venues = reference_data.get_venues()
             error = f"La capacidad del evento ({capacity}) excede la del lugar ({venue.capacity})."
             return render(
                 request,
@@ -196,8 +296,8 @@ def event_form(request, id=None):
             "capacity":capacity,
         }
 
-        categories = Category.objects.filter(is_active=True)
-        venues = Venue.objects.all()
+        categories = reference_data.get_active_categories()
+        venues = reference_data.get_venues()
         return render(
             request,
             "app/event_form.html",
@@ -214,8 +314,8 @@ def event_form(request, id=None):
     if id is not None:
         event = get_object_or_404(Event, pk=id)
 
-    categories = Category.objects.filter(is_active=True)
-    venues = Venue.objects.all()
+    categories = reference_data.get_active_categories()
+    venues = reference_data.get_venues()
 
     return render(
         request,
@@ -223,6 +323,11 @@ def event_form(request, id=None):
         {"event": event, "user_is_organizer": request.user.is_organizer, "categories": categories, "venues": venues},
     )
 
+def _upcoming(events):
+    """Eventos por venir que siguen vigentes."""
+    return events.filter(scheduled_at__gte=timezone.now()).exclude(status__in=["Cancelado", "Finalizado"])
+
+
 @login_required
 def events(request):
     user = request.user
@@ -233,12 +338,14 @@ def events(request):
     ver_pasados = request.GET.get("ver_pasados") == "on"
 
 
+    # select_related evita una consulta por fila al mostrar categoría y locación
+    events = Event.objects.select_related("category", "venue")
     if user.is_organizer:
-        events = Event.objects.filter(organizer=user)
+        events = events.filter(organizer=user)
         if not ver_pasados:
-            events = events.filter(scheduled_at__gte=timezone.now()).exclude(status__in=["Cancelado", "Finalizado"])
+            events = _upcoming(events)
     else:
-        events = Event.objects.filter(scheduled_at__gte=timezone.now()).exclude(status__in=["Cancelado", "Finalizado"])
+        events = _upcoming(events)
 
     if category_id:
         events = events.filter(category_id=category_id)
@@ -248,28 +355,32 @@ def events(request):
 
     if favorites_only:
         events = events.filter(favorites__user=user)
-    else:
-        events = events.annotate(is_favorite=Exists(Favorite.objects.filter(user=user, event=OuterRef('pk'))))
 
-    if order == "desc":
-        events = events.order_by("-scheduled_at")
-    else:
-        events = events.order_by("scheduled_at")
+    # is_favorite se resuelve en la misma consulta de la página
+    events = events.annotate(is_favorite=Exists(Favorite.objects.filter(user=user, event=OuterRef('pk'))))
 
-    favorite_event_ids = set(
-        Favorite.objects.filter(user=user).values_list("event_id", flat=True)
-    )
-    for event in events:
-        event.is_favorite = event.pk in favorite_event_ids # type: ignore
+    search_query = request.GET.get("q", "").strip()
+    if search_query:
+        # Búsqueda de texto completo: los mejores resultados por relevancia, sin paginar por fecha
+        page = KeysetPage(search_events(events, search_query), has_next=False, next_cursor=None, is_first=True)
+    else:
+        # Paginación por cursor sobre (scheduled_at, id): solo se trae una página acotada
+        page = keyset_paginate(
+            events,
+            ["scheduled_at", "id"],
+            cursor=request.GET.get("cursor"),
+            descending=order == "desc",
+        )
 
-    categories = Category.objects.filter(is_active=True)
-    venues = Venue.objects.all()
+    categories = reference_data.get_active_categories()
+    venues = reference_data.get_venues()
 
     return render(
         request,
         "app/events.html",
         {
-            "events": events,
+            "events": page.object_list,
+            "page": page,
             "categories": categories,
             "venues": venues,
             "selected_category": category_id,
@@ -278,10 +389,37 @@ def events(request):
             "user_is_organizer": user.is_organizer,
             "favorites_only": favorites_only,
             "ver_pasados": ver_pasados,
+            "search_query": search_query,
         },
     )
 
 
+@login_required
+def event_search(request):
+    """Búsqueda de texto completo sobre los eventos por venir, en JSON y por relevancia."""
+    try:
+        limit = min(int(request.GET.get("limit", SEARCH_LIMIT)), SEARCH_LIMIT)
+    except ValueError:
+        limit = SEARCH_LIMIT
+
+    events = _upcoming(Event.objects.select_related("category", "venue"))
+    results = search_events(events, request.GET.get("q", ""), limit=max(limit, 1))
+
+    return JsonResponse({
+        "results": [
+            {
+                "id": event.id,
+                "title": event.title,
+                "scheduled_at": event.scheduled_at.isoformat(),
+                "category": event.category.name if event.category else None,
+                "venue": event.venue.name if event.venue else None,
+                "url": reverse("event_detail", args=[event.id]),
+            }
+            for event in results
+        ],
+    })
+
+
 
 
 def categorias(request):
@@ -340,7 +478,7 @@ def category_delete(request, id):
     return redirect("categorias")
 
 def crear_comentario(request, event_id):
-    evento = get_object_or_404(Event, id=event_id)
+    evento = get_object_or_404(Event.objects.select_related("rating_summary"), id=event_id)
 
     if request.method == 'POST':
         title = request.POST.get('title', '').strip()
@@ -350,12 +488,11 @@ def crear_comentario(request, event_id):
         errors = Comment.validate(title, text)
 
         if errors:
-            return render(request, "app/event_detail.html", {
-                "event": evento,
-                "errors": errors,
-                "title": title,
-                "text": text,
-            })
+            return render(
+                request,
+                "app/event_detail.html",
+                _event_detail_context(request, evento, errors=errors, title=title, text=text),
+            )
 
         if comentario_id:
             # Si hay comentario_id, es edición
@@ -563,29 +700,138 @@ def tickets(request, event_id):
     if not request.user.is_organizer:
         return redirect('events')
     #ocon el id del evento obtengo todos sus tickets
-    tickets = Ticket.objects.filter(event_id=event_id).order_by('-buy_date')
+    tickets = Ticket.with_prices(Ticket.objects.filter(event_id=event_id).select_related("event", "user"))
+
+    # Paginación por cursor sobre el índice (event, buy_date): la página cuesta lo mismo con 100k tickets
+    page = keyset_paginate(tickets, ["buy_date", "id"], cursor=request.GET.get("cursor"), descending=True)
 
     return render(
         request,
         "app/tickets.html",
-        {"events": events, "user_is_organizer": request.user.is_organizer, "tickets": tickets},
+        {"user_is_organizer": request.user.is_organizer, "tickets": page.object_list, "page": page, "event_id": event_id},
     )
 
 @login_required
-def comprar_ticket(request, event_id):
+def tickets_export(request, event_id):
+    """
+    Descarga los tickets del evento para el control de acceso (?format=csv o ndjson).
+    La respuesta se genera a medida que se leen las filas, así la memoria no depende del
+    tamaño del evento y el primer byte sale antes de que termine la consulta.
+    """
     event = get_object_or_404(Event, pk=event_id)
+    if event.organizer_id != request.user.pk:
+        return HttpResponseForbidden("No tenés permiso para exportar los tickets de este evento")
 
-    user = request.user
-    tickets_previos = Ticket.objects.filter(user=user, event=event).aggregate(
-        total=Sum('quantity')
-    )['total'] or 0
-    tickets_disponibles = max(0, Ticket.MAX_TICKETS_PER_USER - tickets_previos)
+    export_format = request.GET.get("format", "csv")
+    if export_format not in exports.FORMATS:
+        export_format = "csv"
+    stream, content_type = exports.FORMATS[export_format]
+
+    response = StreamingHttpResponse(
+        stream(exports.TICKET_EXPORT_FIELDS, exports.ticket_rows(event.pk)), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="tickets-evento-{event.pk}.{export_format}"'
+    return response
 
+def _checkin_index(request, event_id):
+    """Índice de códigos del evento si el usuario es su organizador, o None."""
+    try:
+        index = checkin.get_index(event_id)
+    except Event.DoesNotExist:
+        raise Http404("No existe el evento")
+    return index if index.organizer_id == request.user.pk else None
 
 
+def _scan_result(code, result, checked_in_at):
+    return {
+        "ticket_code": code,
+        "result": result,
+        "checked_in_at": checked_in_at.isoformat() if checked_in_at else None,
+    }
+
+
+@login_required
+def ticket_checkin(request, event_id):
+    """
+    Registra el ingreso de un ticket escaneado en la puerta (POST con ticket_code).
+    Re-escanear un ticket es seguro: responde already_checked_in con el primer ingreso.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Se espera un POST"}, status=405)
+    index = _checkin_index(request, event_id)
+    if index is None:
+        return JsonResponse({"error": "No tenés permiso para registrar ingresos de este evento"}, status=403)
+
+    raw_code = request.POST.get("ticket_code", "").strip()
+    if not raw_code:
+        return JsonResponse({"error": "El código de entrada es requerido"}, status=400)
+
+    code = index.resolve(raw_code)
+    if code is None:
+        return JsonResponse(
+            {**_scan_result(raw_code, checkin.MALFORMED, None), "error": "El código de entrada no es válido"},
+            status=400,
+        )
+    return JsonResponse(_scan_result(code, *index.scan(code)))
+
+
+@login_required
+def ticket_checkin_batch(request, event_id):
+    """
+    Sincroniza los escaneos de un lector sin conexión. Recibe JSON
+    {"scans": [{"ticket_code": ..., "scanned_at": ISO 8601 opcional}, ...]} y responde un
+    resultado por escaneo, en el mismo orden. Los códigos mal formados responden malformed
+    sin consultar la base.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Se espera un POST"}, status=405)
+    index = _checkin_index(request, event_id)
+    if index is None:
+        return JsonResponse({"error": "No tenés permiso para registrar ingresos de este evento"}, status=403)
+
+    try:
+        raw_scans = json.loads(request.body)["scans"]
+        if not isinstance(raw_scans, list) or len(raw_scans) > checkin.MAX_BATCH_SCANS:
+            raise ValueError
+        now = timezone.now()
+        scans = []
+        for scan in raw_scans:
+            code = str(scan["ticket_code"]).strip()
+            scanned_at = parse_datetime(scan["scanned_at"]) if scan.get("scanned_at") else now
+            if not code or scanned_at is None:
+                raise ValueError
+            if timezone.is_naive(scanned_at):
+                scanned_at = timezone.make_aware(scanned_at)
+            # Un reloj adelantado en el lector no registra ingresos en el futuro
+            scans.append((code, min(scanned_at, now)))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse(
+            {"error": f"Formato inválido: se esperan hasta {checkin.MAX_BATCH_SCANS} escaneos con ticket_code y scanned_at"},
+            status=400,
+        )
+
+    codes = [index.resolve(code) for code, _ in scans]
+    scanned = iter(index.scan_many(
+        [(code, scanned_at) for code, (_, scanned_at) in zip(codes, scans) if code is not None]
+    ))
+    results = []
+    summary = {checkin.CHECKED_IN: 0, checkin.ALREADY_CHECKED_IN: 0, checkin.INVALID: 0, checkin.MALFORMED: 0}
+    for code, (raw_code, _) in zip(codes, scans):
+        result = (checkin.MALFORMED, None) if code is None else next(scanned)
+        summary[result[0]] += 1
+        results.append(_scan_result(code or raw_code, *result))
+    return JsonResponse({"results": results, "summary": summary})
+
+@login_required
+def comprar_ticket(request, event_id):
+    event = get_object_or_404(Event, pk=event_id)
+
+    user = request.user
+
     if request.method == 'POST':
-        # Obtener datos del formulario
-        ticket_code = request.POST.get('ticket_code')
+        # Obtener datos del formulario. El código del ticket lo genera el servidor:
+        # es único sin consultar la base y los lectores lo pueden verificar sin conexión
+        ticket_code = ticket_codes.allocate()
         quantity = request.POST.get('quantity')
         type_entrada = request.POST.get('type')
         try:
@@ -607,31 +853,27 @@ def comprar_ticket(request, event_id):
                 'error': error
             })
         
-        # verificar limite de entradas por usuario usando la funcion del modelo
-        errores_limite = Ticket.validate_max_per_user(user, event, quantity)
-        if errores_limite:
-            return render(request, 'app/ticket_compra.html', {
-                'event': event,
-                'event_id': event_id,
-                'error': errores_limite.get("max_tickets")
-            })
-        
-        # verificar si hay cupo, si no hay cupo se muestra un error que diga no quedan entradas
-        if event.capacity is not None:
-            tickets_vendidos = Ticket.objects.filter(event=event).aggregate(total=Sum('quantity'))['total'] or 0
-            if tickets_vendidos + quantity > event.capacity:
-                # mostrar cantidad de entradas disponibles
-                tickets_disponibles = event.capacity - tickets_vendidos
-                if tickets_disponibles == 0:
-                    error = "No quedan entradas disponibles."
-                else:
-                    error = f"No quedan entradas disponibles. Solo quedan {tickets_disponibles} entradas."
+        # Reserva atómica: cupo, límite por usuario y alta del ticket en una sola transacción
+        try:
+            ticket, errors = Ticket.reserve(ticket_code, quantity, user, event, type=type_entrada)
+        except IntegrityError:
+            ticket, errors = None, {"ticket_code": "El código de entrada ya existe, intentá nuevamente."}
 
+        if ticket is None:
+            error = errors.get("max_tickets") or errors.get("capacity")
+            if error:
                 return render(request, 'app/ticket_compra.html', {
                     'event': event,
                     'event_id': event_id,
                     'error': error
                 })
+            messages.error(request, "Error en la validación del ticket.")
+            return render(request, 'app/ticket_compra.html', {
+                'errors': errors,
+                'event': event,
+                'event_id': event_id
+            })
+
         # Datos de pago (estos se enviarían a una API externa en un caso real)
         payment_data = {
             'card_number': request.POST.get('card_number'),
@@ -644,6 +886,8 @@ def comprar_ticket(request, event_id):
         payment_success = simular_procesamiento_pago(payment_data)
 
         if not payment_success:
+            # Se liberan los asientos reservados
+            ticket.delete()
             messages.error(request, "Error en el procesamiento del pago. Por favor, intenta nuevamente.")
             return render(request, 'app/ticket_compra.html', {
                 'event': event,
@@ -651,32 +895,64 @@ def comprar_ticket(request, event_id):
                 'error': "Error en el procesamiento del pago"
             })
 
-        success, errors = Ticket.new(ticket_code, quantity, user, event)
-
-        if not success:
-            messages.error(request, "Error en la validación del ticket.")
-            return render(request, 'app/ticket_compra.html', {
-                'errors': errors,
-                'event': event,
-                'event_id': event_id
-            })
-
-        user = request.user
-
-        ticket = Ticket.objects.get(ticket_code=ticket_code)  # Recuperar el ticket recién creado
-        ticket.type = type_entrada
-        ticket.save()
-
         event.check_and_update_agotado()
 
         messages.success(request, f"¡Compra exitosa! Tu código de ticket es: {ticket_code}")
         return redirect('satisfaction_survey', ticket_id=ticket.pk)
+
+    # Solo para mostrar el máximo en el formulario; al comprar lo valida la reserva atómica
+    tickets_previos = Ticket.objects.filter(user=user, event=event).aggregate(
+        total=Sum('quantity')
+    )['total'] or 0
+    tickets_disponibles = max(0, Ticket.MAX_TICKETS_PER_USER - tickets_previos)
     return render(request, 'app/ticket_compra.html', {
         'event': event,
         'event_id': event_id,
         'tickets_disponibles': tickets_disponibles
     })
 
+@login_required
+def order_create(request):
+    """
+    Compra grupal. Recibe JSON {"lines": [{"event": id, "type": "general"|"vip", "quantity": n}, ...],
+    "payment": {card_number, card_expiry, card_cvv, card_name}}, valida el carrito completo y crea
+    todos los tickets en una sola transacción. Si el pago falla se anula el pedido.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Se espera un POST"}, status=405)
+    try:
+        data = json.loads(request.body)
+        lines = data["lines"]
+        payment = data.get("payment") or {}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({"errors": {"lines": "Se espera un JSON con las líneas del pedido"}}, status=400)
+    if not isinstance(payment, dict):
+        return JsonResponse({"errors": {"payment": "Los datos de pago deben ser un objeto JSON"}}, status=400)
+    payment = {key: str(value) for key, value in payment.items()}
+
+    order, errors = Order.place(request.user, lines)
+    if order is None:
+        return JsonResponse({"errors": errors}, status=400)
+
+    if not simular_procesamiento_pago(payment):
+        # Se liberan los asientos reservados
+        order.cancel()
+        return JsonResponse({"errors": {"payment": "Error en el procesamiento del pago"}}, status=402)
+
+    return JsonResponse(
+        {
+            "order": order.pk,
+            "total": order.total,
+            "tickets": [
+                {"ticket_code": code, "event": event_id, "type": ticket_type, "quantity": quantity}
+                for code, event_id, ticket_type, quantity in order.tickets.order_by("pk").values_list(
+                    "ticket_code", "event_id", "type", "quantity"
+                )
+            ],
+        },
+        status=201,
+    )
+
 def simular_procesamiento_pago(payment_data):
     """
     Función para simular el procesamiento de pago con una pasarela externa.
@@ -716,20 +992,11 @@ def ticket_delete(request, event_id, ticket_id):
 
 @login_required
 def mis_tickets(request):
-    tickets = Ticket.objects.filter(user=request.user).order_by('-buy_date')
+    # Evento, usuario y precios salen de la misma consulta de la página
+    tickets = Ticket.with_prices(Ticket.objects.filter(user=request.user).select_related("event", "user"))
+    page = keyset_paginate(tickets, ["buy_date", "id"], cursor=request.GET.get("cursor"), descending=True)
 
-    for ticket in tickets:
-        if ticket.type == "general":
-            unit_price = 50
-        elif ticket.type == "vip":
-            unit_price = 100
-        else:
-            unit_price = 0
-
-        setattr(ticket, 'unit_price', unit_price)
-        setattr(ticket, 'total_price', unit_price * ticket.quantity)
-
-    return render(request, 'app/mis_tickets.html', {'tickets': tickets})
+    return render(request, 'app/mis_tickets.html', {'tickets': page.object_list, 'page': page})
 
 @login_required
 def update_ticket(request, ticket_id):
@@ -774,9 +1041,11 @@ def update_ticket(request, ticket_id):
                 )
                 return redirect('Mis_tickets')
 
+            # El contador del evento se ajusta solo con la diferencia de cantidad
             ticket.quantity = quantity
             ticket.type = type
             ticket.save()
+            ticket.event.check_and_update_agotado()
             return redirect('Mis_tickets')
 
     return render(request, 'app/Mis_tickets.html', {'ticket': ticket})
@@ -1137,19 +1406,32 @@ def notification_delete(request,id):
 def user_notifications(request):
 # Obtener relaciones usuario-notificación (NotificationUser) del usuario actual,
 # incluyendo los datos de la notificación asociada
+    unread_only = request.GET.get("unread") == "1"
     notification_users = NotificationUser.objects.filter(
         user=request.user
-    ).select_related('notification').order_by("-notification__created_at")
-    # Contar notificaciones no leídas
-    unread_count = notification_users.filter(read=False).count()
+    ).select_related('notification__event')
+    if unread_only:
+        notification_users = notification_users.filter(read=False)
+
+    # Paginación por cursor sobre los índices (user, [read,] created_at, id)
+    page = keyset_paginate(
+        notification_users,
+        ["created_at", "id"],
+        cursor=request.GET.get("cursor"),
+        descending=True,
+    )
+    # Contador de no leídas cacheado, compartido con el badge del navbar
+    unread_count = NotificationUser.unread_count(request.user.pk)
 
     return render(
         request,
         "app/user_notifications.html",
         {
-            "not_users": notification_users,
+            "not_users": page.object_list,
+            "page": page,
+            "unread_only": unread_only,
             "unread_count": unread_count,
-            "has_notifications": notification_users.exists(),
+            "has_notifications": bool(page.object_list),
         },
     )
 
@@ -1158,9 +1440,7 @@ def mark_notification_read(request, id=None):
         try:
             # Buscar la relación NotificationUser por notification_id, no por id
             notif_user = NotificationUser.objects.get(id=id)
-            notif_user.read = True
-            notif_user.read_at = timezone.now()
-            notif_user.save()
+            notif_user.mark_read()
         except NotificationUser.DoesNotExist:
             messages.error(request, "No se encontró la notificación o no te pertenece.")
     return redirect("user_notifications")
@@ -1168,7 +1448,7 @@ def mark_notification_read(request, id=None):
 # Marca todas las notificaciones del usuario como leídas
 def mark_all_notifications_read(request):
     if request.method == "POST":
-        NotificationUser.objects.filter(user=request.user, read=False).update(read=True, read_at=timezone.now())
+        NotificationUser.mark_all_read(request.user)
     return redirect("user_notifications")
 
 
@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "app.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -60,9 +61,11 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "eventhub.urls"
 
+TEST_RUNNER = "eventhub.test_runner.TestRunner"
+
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "app.metrics.InstrumentedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -71,6 +74,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "app.context_processors.unread_notifications",
             ],
         },
     },
@@ -89,6 +93,67 @@ DATABASES = {
     }
 }
 
+# Cache
+# CACHE_BACKEND: locmem (por defecto, por proceso), file (compartido entre procesos de
+# un mismo equipo) o redis (cualquier servidor que hable el protocolo de Redis; requiere
+# el paquete redis).
+
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "eventhub"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/0"),
+}
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND") or "locmem"
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ValueError(f"CACHE_BACKEND inválido: {CACHE_BACKEND} (opciones: {', '.join(CACHE_BACKENDS)})")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": os.getenv("CACHE_LOCATION") or CACHE_BACKENDS[CACHE_BACKEND][1],
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT") or 300),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "eventhub"),
+    }
+}
+if CACHE_BACKEND in ("locmem", "file"):
+    # El cache guarda versiones por evento (sin vencimiento), fragmentos del detalle, contadores
+    # de no leídas por usuario y datos de referencia: con el máximo de Django (300) descartaría
+    # un tercio de las claves todo el tiempo. Redis se limita con su propio maxmemory.
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES") or 50_000)}
+
+# Variación aleatoria de los TTL (fracción) para que las claves no expiren todas juntas
+CACHE_TTL_JITTER = float(os.getenv("CACHE_TTL_JITTER") or 0.1)
+
+# Backend de búsqueda de eventos; vacío elige FTS5 en SQLite y un respaldo simple en otros motores
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "")
+
+# Con un cache compartido se puede usar "django.contrib.sessions.backends.cached_db"
+SESSION_ENGINE = os.getenv("SESSION_ENGINE") or "django.contrib.sessions.backends.db"
+
+
+# Métricas por pedido (app/metrics.py)
+# Fracción de pedidos medidos (0 = desactivado); el runner de tests la pone en 0
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv("REQUEST_METRICS_SAMPLE_RATE") or 0.1)
+# Presupuestos por pedido: superarlos registra el pedido como WARNING
+REQUEST_METRICS_QUERY_BUDGET = int(os.getenv("REQUEST_METRICS_QUERY_BUDGET") or 50)
+REQUEST_METRICS_LATENCY_BUDGET_MS = float(os.getenv("REQUEST_METRICS_LATENCY_BUDGET_MS") or 500)
+# Veces que se tiene que repetir una misma consulta para considerarla N+1
+REQUEST_METRICS_DUPLICATE_THRESHOLD = int(os.getenv("REQUEST_METRICS_DUPLICATE_THRESHOLD") or 5)
+# Publicar las métricas en el header Server-Timing de la respuesta
+REQUEST_METRICS_SERVER_TIMING = os.getenv("REQUEST_METRICS_SERVER_TIMING", "True") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "app.metrics": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -142,3 +207,9 @@ LOGIN_REDIRECT_URL = os.getenv("LOGIN_REDIRECT_URL", "/events/")
 LOGIN_URL = os.getenv("LOGIN_URL", "/accounts/login/")
 
 LOGOUT_REDIRECT_URL = os.getenv("LOGOUT_REDIRECT_URL", "/accounts/login/")
+
+# Segundos entre barridos de estado de eventos en proceso (0 = desactivado)
+EVENT_STATUS_SWEEP_INTERVAL = int(os.getenv("EVENT_STATUS_SWEEP_INTERVAL") or 0)
+
+# Las tareas en segundo plano corren en el momento (los tests lo activan con override_settings)
+TASKS_EAGER = os.getenv("TASKS_EAGER") == "True"
@@ -0,0 +1,19 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Configuración propia de los tests, aplicada explícitamente en lugar de adivinarla
+TEST_SETTINGS = {
+    # Sin métricas muestreadas: los pedidos de los tests no agregan headers ni logs al azar
+    "REQUEST_METRICS_SAMPLE_RATE": 0,
+}
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**TEST_SETTINGS)
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eventhub.settings")
 
 application = get_wsgi_application()
+
+# Tareas en segundo plano del proceso web (desactivadas por defecto)
+from app.sweeper import start_configured_sweeper  # noqa: E402
+
+start_configured_sweeper()